@@ -7,6 +7,7 @@ from __future__ import absolute_import
 #Init has to be imported first because it has code to workaround the python bug where relative imports don't work if the module is imported as a main module.
 import __init__
 
+import cStringIO
 import os
 import sys
 import traceback
@@ -302,6 +303,13 @@ def getTextLines(text):
 			return []
 	return textLines
 
+def getTextLinesWithoutEmpty(text):
+	'Get an iterator over the lines of a text which have something, without building a list of all the lines.'
+	for line in cStringIO.StringIO(text.replace('\r', '\n')):
+		line = line.rstrip('\n')
+		if line != '':
+			yield line
+
 def getUntilDot(text):
 	'Get the text until the last dot, if any.'
 	dotIndex = text.rfind('.')
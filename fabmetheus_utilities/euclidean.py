@@ -33,6 +33,7 @@ import __init__
 from fabmetheus_utilities.vector3 import Vector3
 from fabmetheus_utilities import xml_simple_writer
 import cStringIO
+import heapq
 import math
 import random
 
@@ -171,15 +172,8 @@ def addSegmentToPixelTable( beginComplex, endComplex, pixelDictionary, shortenDi
 		print( shortenDistanceBegin )
 		print( shortenDistanceEnd )
 		print( width )
-	xBegin = int(round(beginComplex.real))
-	xEnd = int(round(endComplex.real))
-	yIntersection = beginComplex.imag - beginComplex.real * gradient
-	addPixelToPixelTableWithSteepness( isSteep, pixelDictionary, None, xBegin, int( round( beginComplex.imag ) ) )
-	addPixelToPixelTableWithSteepness( isSteep, pixelDictionary, None, xEnd, int( round( endComplex.imag ) ) )
-	for x in xrange( xBegin + 1, xEnd ):
-		y = int( math.floor( yIntersection + x * gradient ) )
-		addPixelToPixelTableWithSteepness( isSteep, pixelDictionary, None, x, y )
-		addPixelToPixelTableWithSteepness( isSteep, pixelDictionary, None, x, y + 1 )
+	for stepKey in getSegmentStepKeys(beginComplex, endComplex, gradient, isSteep):
+		pixelDictionary[stepKey] = None
 
 def addSquareTwoToPixelDictionary(pixelDictionary, point, value, width):
 	'Add square with two pixels around the center to pixel dictionary.'
@@ -241,15 +235,8 @@ def addValueSegmentToPixelTable( beginComplex, endComplex, pixelDictionary, valu
 		print(value)
 		print( endComplex )
 		print( width )
-	xBegin = int(round(beginComplex.real))
-	xEnd = int(round(endComplex.real))
-	yIntersection = beginComplex.imag - beginComplex.real * gradient
-	addPixelToPixelTableWithSteepness( isSteep, pixelDictionary, value, xBegin, int( round( beginComplex.imag ) ) )
-	addPixelToPixelTableWithSteepness( isSteep, pixelDictionary, value, xEnd, int( round( endComplex.imag ) ) )
-	for x in xrange( xBegin + 1, xEnd ):
-		y = int( math.floor( yIntersection + x * gradient ) )
-		addPixelToPixelTableWithSteepness( isSteep, pixelDictionary, value, x, y )
-		addPixelToPixelTableWithSteepness( isSteep, pixelDictionary, value, x, y + 1 )
+	for stepKey in getSegmentStepKeys(beginComplex, endComplex, gradient, isSteep):
+		pixelDictionary[stepKey] = value
 
 def addValueToOutput(depth, keyInput, output, value):
 	'Add value to the output.'
@@ -698,6 +685,10 @@ def getDictionaryString(dictionary):
 		addValueToOutput(0, key, output, dictionary[key])
 	return output.getvalue()
 
+def getDifferenceOfXIntersections(subtractFromXIntersections, subtractXIntersections):
+	'Get the x intersections of the subtract from x intersections minus the subtract x intersections, the same as getXIntersectionsFromIntersections would get them.'
+	return getMergedXIntersections(subtractFromXIntersections, True, subtractXIntersections)
+
 def getDistanceToLine(begin, end, point):
 	'Get the distance from a vector3 point to an infinite line.'
 	pointMinusBegin = point - begin
@@ -783,6 +774,10 @@ def getEndpointsFromSegmentTable( segmentTable ):
 				endpoints.append( endpoint )
 	return endpoints
 
+def getEndpointSegmentLength(endpoint):
+	'Get the segment length of the endpoint, to be used as a sort key.'
+	return endpoint.segmentLength
+
 def getEnumeratorKeys(enumerator, keys):
 	'Get enumerator keys.'
 	if len(keys) == 1:
@@ -932,16 +927,10 @@ def getHorizontallyBoundedPath(horizontalBegin, horizontalEnd, path):
 
 def getHorizontalSegmentListsFromLoopLists( alreadyFilledArounds, front, numberOfLines, rotatedFillLoops, width ):
 	'Get horizontal segment lists inside loops.'
-	xIntersectionIndexLists = []
-	yList = []
-	frontOverWidth = getFrontOverWidthAddXListYList( front, alreadyFilledArounds, numberOfLines, xIntersectionIndexLists, width, yList )
-	addXIntersectionIndexesFromLoops( frontOverWidth, rotatedFillLoops, - 1, xIntersectionIndexLists, width, yList )
-	horizontalSegmentLists = []
-	for xIntersectionIndexListIndex in xrange( len( xIntersectionIndexLists ) ):
-		xIntersectionIndexList = xIntersectionIndexLists[ xIntersectionIndexListIndex ]
-		lineSegments = getSegmentsFromXIntersectionIndexes( xIntersectionIndexList, yList[ xIntersectionIndexListIndex ] )
-		horizontalSegmentLists.append( lineSegments )
-	return horizontalSegmentLists
+	horizontalScanLines = HorizontalScanLines(front, numberOfLines, width)
+	horizontalScanLines.addLoopLists(alreadyFilledArounds)
+	horizontalScanLines.addLoops(rotatedFillLoops, - 1)
+	return horizontalScanLines.getHorizontalSegmentLists()
 
 def getIncrementFromRank( rank ):
 	'Get the increment from the rank which is 0 at 1 and increases by three every power of ten.'
@@ -971,7 +960,7 @@ def getIntersectionOfXIntersectionIndexes( totalSolidSurfaceThickness, xIntersec
 	xIntersectionList = []
 	solidTable = {}
 	solid = False
-	xIntersectionIndexList.sort()
+	xIntersectionIndexList.sort(key=getXOfXIntersectionIndex)
 	for xIntersectionIndex in xIntersectionIndexList:
 		toggleHashtable(solidTable, xIntersectionIndex.index, '')
 		oldSolid = solid
@@ -1027,7 +1016,7 @@ def getJoinOfXIntersectionIndexes( xIntersectionIndexList ):
 	xIntersections = []
 	solidTable = {}
 	solid = False
-	xIntersectionIndexList.sort()
+	xIntersectionIndexList.sort(key=getXOfXIntersectionIndex)
 	for xIntersectionIndex in xIntersectionIndexList:
 		toggleHashtable(solidTable, xIntersectionIndex.index, '')
 		oldSolid = solid
@@ -1036,6 +1025,10 @@ def getJoinOfXIntersectionIndexes( xIntersectionIndexList ):
 			xIntersections.append(xIntersectionIndex.x)
 	return xIntersections
 
+def getJoinOfXIntersections(intoXIntersections, fromXIntersections):
+	'Get the join of the x intersections, the same as getJoinOfXIntersectionIndexes would get it with the into x intersections indexed before the from x intersections.'
+	return getMergedXIntersections(intoXIntersections, False, fromXIntersections)
+
 def getLargestLoop(loops):
 	'Get largest loop from loops.'
 	if len(loops) == 1:
@@ -1220,6 +1213,36 @@ def getMaximumSpan(loop):
 	extent = getMaximumByComplexPath(loop) - getMinimumByComplexPath(loop)
 	return max(extent.real, extent.imag)
 
+def getMergedXIntersections(firstXIntersections, isDifference, secondXIntersections):
+	'Get the join or the difference of the x intersections by merging the sorted lists, with the first before the second at the same x like in a stable sort, without making XIntersectionIndex objects.'
+	firstXIntersections = sorted(firstXIntersections)
+	secondXIntersections = sorted(secondXIntersections)
+	firstIndex = 0
+	firstLength = len(firstXIntersections)
+	isFirstSolid = False
+	isSecondSolid = False
+	secondIndex = 0
+	secondLength = len(secondXIntersections)
+	solid = False
+	xIntersections = []
+	while firstIndex < firstLength or secondIndex < secondLength:
+		if secondIndex >= secondLength or (firstIndex < firstLength and firstXIntersections[firstIndex] <= secondXIntersections[secondIndex]):
+			x = firstXIntersections[firstIndex]
+			isFirstSolid = not isFirstSolid
+			firstIndex += 1
+		else:
+			x = secondXIntersections[secondIndex]
+			isSecondSolid = not isSecondSolid
+			secondIndex += 1
+		oldSolid = solid
+		if isDifference:
+			solid = isFirstSolid and not isSecondSolid
+		else:
+			solid = isFirstSolid or isSecondSolid
+		if oldSolid != solid:
+			xIntersections.append(x)
+	return xIntersections
+
 def getMinimum(firstComplex, secondComplex):
 	'Get a complex with each component the minimum of the respective components of a pair of complexes.'
 	return complex(min(firstComplex.real, secondComplex.real), min(firstComplex.imag, secondComplex.imag))
@@ -1277,6 +1300,15 @@ def getNearestDistanceIndex( point, loop ):
 			nearestDistanceIndex = DistanceIndex( distance, pointIndex )
 	return nearestDistanceIndex
 
+def getNearestEndpointFromList(point, endpoints, nearestEndpoint, smallestDistance):
+	'Get the endpoint nearest to the point, if it is nearer than the smallest distance, otherwise return the nearest endpoint.'
+	for endpoint in endpoints:
+		distance = abs(point - endpoint.point)
+		if distance < smallestDistance:
+			smallestDistance = distance
+			nearestEndpoint = endpoint
+	return nearestEndpoint
+
 def getNearestPointOnSegment( segmentBegin, segmentEnd, point ):
 	'Get the nearest point on the segment.'
 	segmentDifference = segmentEnd - segmentBegin
@@ -1390,38 +1422,27 @@ def getPathsFromEndpoints(endpoints, maximumConnectionLength, pixelDictionary, w
 			if abs(nextEndpoint.point - endpointFirst.point) < abs(nextEndpoint.point - otherEndpoint.point):
 				endpointFirst = endpointFirst.otherEndpoint
 				otherEndpoint = endpointFirst.otherEndpoint
+		# the grid cells keep insertion order, so sorting here keeps tie breaks the same
+		if nextEndpoint == None or nextEndpoint.segmentLength > 0.0:
+			endpoints.sort(key=getEndpointSegmentLength)
 	addPointToPath(path, pixelDictionary, endpointFirst.point, None, width)
 	addPointToPath(path, pixelDictionary, otherEndpoint.point, len(paths) - 1, width)
-	oneOverEndpointWidth = 1.0 / maximumConnectionLength
-	endpointTable = {}
-	for endpoint in endpoints:
-		addElementToPixelListFromPoint(endpoint, endpointTable, endpoint.point * oneOverEndpointWidth)
-	while len(endpointTable) > 0:
-		if len(endpointTable) == 1:
-			if len(endpointTable.values()[0]) < 2:
+	endpointGrid = EndpointGrid(endpoints, maximumConnectionLength)
+	while len(endpointGrid.cellTable) > 0:
+		if len(endpointGrid.cellTable) == 1:
+			if len(endpointGrid.cellTable.values()[0]) < 2:
 				return
-		endpoints = getSquareValuesFromPoint(endpointTable, otherEndpoint.point * oneOverEndpointWidth)
+		endpoints = endpointGrid.getSquareValues(otherEndpoint.point)
 		nextEndpoint = otherEndpoint.getNearestMiss(endpoints, path, pixelDictionary, width)
 		if nextEndpoint == None:
 			path = []
 			paths.append(path)
-			endpoints = getListTableElements(endpointTable)
-			nextEndpoint = otherEndpoint.getNearestEndpoint(endpoints)
-# this commented code should be faster than the getListTableElements code, but it isn't, someday a spiral algorithim could be tried
-#			endpoints = getSquareValuesFromPoint( endpointTable, otherEndpoint.point * oneOverEndpointWidth )
-#			nextEndpoint = otherEndpoint.getNearestEndpoint(endpoints)
-#			if nextEndpoint == None:
-#				endpoints = []
-#				for endpointTableValue in endpointTable.values():
-#					endpoints.append( endpointTableValue[0] )
-#				nextEndpoint = otherEndpoint.getNearestEndpoint(endpoints)
-#				endpoints = getSquareValuesFromPoint( endpointTable, nextEndpoint.point * oneOverEndpointWidth )
-#				nextEndpoint = otherEndpoint.getNearestEndpoint(endpoints)
+			nextEndpoint = endpointGrid.getNearestEndpoint(otherEndpoint.point)
 		addPointToPath(path, pixelDictionary, nextEndpoint.point, len(paths) - 1, width)
-		removeElementFromPixelListFromPoint(nextEndpoint, endpointTable, nextEndpoint.point * oneOverEndpointWidth)
+		endpointGrid.removeEndpoint(nextEndpoint)
 		otherEndpoint = nextEndpoint.otherEndpoint
 		addPointToPath(path, pixelDictionary, otherEndpoint.point, len(paths) - 1, width)
-		removeElementFromPixelListFromPoint(otherEndpoint, endpointTable, otherEndpoint.point * oneOverEndpointWidth)
+		endpointGrid.removeEndpoint(otherEndpoint)
 	return paths
 
 def getPlaneDot( vec3First, vec3Second ):
@@ -1470,6 +1491,21 @@ def getRandomComplex(begin, end):
 	endMinusBegin = end - begin
 	return begin + complex(random.random() * endMinusBegin.real, random.random() * endMinusBegin.imag)
 
+def getRingStepKeys(centerKey, ringIndex):
+	'Get the step keys of the square ring of cells at the ring index around the center key.'
+	if ringIndex == 0:
+		return [centerKey]
+	ringStepKeys = []
+	centerX = centerKey[0]
+	centerY = centerKey[1]
+	for x in xrange(centerX - ringIndex, centerX + ringIndex + 1):
+		ringStepKeys.append(getStepKey(x, centerY - ringIndex))
+		ringStepKeys.append(getStepKey(x, centerY + ringIndex))
+	for y in xrange(centerY - ringIndex + 1, centerY + ringIndex):
+		ringStepKeys.append(getStepKey(centerX - ringIndex, y))
+		ringStepKeys.append(getStepKey(centerX + ringIndex, y))
+	return ringStepKeys
+
 def getRank(width):
 	'Get the rank which is 0 at 1 and increases by three every power of ten.'
 	return int(math.floor(3.0 * math.log10(width)))
@@ -1518,6 +1554,21 @@ def getSegmentFromPoints( begin, end ):
 	endpointFirst.getFromOtherPoint( endpointSecond, begin )
 	return ( endpointFirst, endpointSecond )
 
+def getSegmentGridCellWidth(loops):
+	'Get the cell width of a segment grid for the loops, the greater of the mean segment length and the square root of the bounding area per segment.'
+	numberOfSegments = 0
+	totalLength = 0.0
+	for loop in loops:
+		numberOfSegments += len(loop)
+		totalLength += getLoopLength(loop)
+	if numberOfSegments == 0:
+		return 1.0
+	boundingSize = getMaximumByComplexPaths(loops) - getMinimumByComplexPaths(loops)
+	cellWidth = max(totalLength / float(numberOfSegments), math.sqrt(boundingSize.real * boundingSize.imag / float(numberOfSegments)))
+	if cellWidth <= 0.0:
+		return 1.0
+	return cellWidth
+
 def getSegmentsFromXIntersections( xIntersections, y ):
 	'Get endpoint segments from the x intersections.'
 	segments = []
@@ -1536,6 +1587,32 @@ def getSegmentsFromXIntersectionIndexes( xIntersectionIndexList, y ):
 	xIntersections = getXIntersectionsFromIntersections( xIntersectionIndexList )
 	return getSegmentsFromXIntersections( xIntersections, y )
 
+def getShortestSegmentEndpoints(endpoints, numberOfEndpoints):
+	'Get the endpoints with the shortest segment lengths in ascending order, without sorting all the endpoints.'
+	if len(endpoints) > numberOfEndpoints:
+		return heapq.nsmallest(numberOfEndpoints, endpoints, key=getEndpointSegmentLength)
+	return sorted(endpoints, key=getEndpointSegmentLength)
+
+def getSegmentStepKeys(beginComplex, endComplex, gradient, isSteep):
+	'Get the step keys of the pixels covered by the segment, with the x and y of the keys swapped if the segment is steep.'
+	xBegin = int(round(beginComplex.real))
+	xEnd = int(round(endComplex.real))
+	yIntersection = beginComplex.imag - beginComplex.real * gradient
+	floor = math.floor
+	if isSteep:
+		stepKeys = [(int(round(beginComplex.imag)), xBegin), (int(round(endComplex.imag)), xEnd)]
+		for x in xrange(xBegin + 1, xEnd):
+			y = int(floor(yIntersection + x * gradient))
+			stepKeys.append((y, x))
+			stepKeys.append((y + 1, x))
+		return stepKeys
+	stepKeys = [(xBegin, int(round(beginComplex.imag))), (xEnd, int(round(endComplex.imag)))]
+	for x in xrange(xBegin + 1, xEnd):
+		y = int(floor(yIntersection + x * gradient))
+		stepKeys.append((x, y))
+		stepKeys.append((x, y + 1))
+	return stepKeys
+
 def getSimplifiedLoop( loop, radius ):
 	'Get loop with points inside the channel removed.'
 	if len(loop) < 2:
@@ -1589,11 +1666,9 @@ def getSimplifiedPath( path, radius ):
 
 def getSquareIsOccupied( pixelDictionary, x, y ):
 	'Determine if a square around the x and y pixel coordinates is occupied.'
-	squareValues = []
 	for xStep in xrange(x - 1, x + 2):
 		for yStep in xrange(y - 1, y + 2):
-			stepKey = getStepKey(xStep, yStep)
-			if stepKey in pixelDictionary:
+			if (xStep, yStep) in pixelDictionary:
 				return True
 	return False
 
@@ -1608,9 +1683,9 @@ def getSquareValues( pixelDictionary, x, y ):
 	squareValues = []
 	for xStep in xrange(x - 1, x + 2):
 		for yStep in xrange(y - 1, y + 2):
-			stepKey = getStepKey(xStep, yStep)
+			stepKey = (xStep, yStep)
 			if stepKey in pixelDictionary:
-				squareValues += pixelDictionary[ stepKey ]
+				squareValues += pixelDictionary[stepKey]
 	return squareValues
 
 def getSquareValuesFromPoint( pixelDictionary, point ):
@@ -1722,7 +1797,7 @@ def getXIntersectionsFromIntersections( xIntersectionIndexList ):
 	fill = False
 	solid = False
 	solidTable = {}
-	xIntersectionIndexList.sort()
+	xIntersectionIndexList.sort(key=getXOfXIntersectionIndex)
 	for solidX in xIntersectionIndexList:
 		if solidX.index >= 0:
 			toggleHashtable( solidTable, solidX.index, '' )
@@ -1734,6 +1809,10 @@ def getXIntersectionsFromIntersections( xIntersectionIndexList ):
 			xIntersections.append( solidX.x )
 	return xIntersections
 
+def getXOfXIntersectionIndex(xIntersectionIndex):
+	'Get the x of the x intersection index, to be used as a sort key, which is much faster than sorting by comparison.'
+	return xIntersectionIndex.x
+
 def getXYComplexFromVector3(vector3):
 	'Get an xy complex from a vector3 if it exists, otherwise return None.'
 	if vector3 == None:
@@ -1811,12 +1890,9 @@ def isLoopIntersectingLoop( loop, otherLoop ):
 
 def isLoopIntersectingLoops( loop, otherLoops ):
 	'Determine if the loop is intersecting other loops.'
-	for pointIndex in xrange(len(loop)):
-		pointBegin = loop[pointIndex]
-		pointEnd = loop[(pointIndex + 1) % len(loop)]
-		if isLineIntersectingLoops( otherLoops, pointBegin, pointEnd ):
-			return True
-	return False
+	segmentGrid = SegmentGrid(getSegmentGridCellWidth(otherLoops))
+	segmentGrid.addLoops(otherLoops)
+	return segmentGrid.isLoopIntersecting(loop)
 
 def isLoopListIntersectingInsideXSegment( loopList, segmentFirstX, segmentSecondX, segmentYMirror, y ):
 	'Determine if the loop list is crossing inside the x segment.'
@@ -1827,9 +1903,10 @@ def isLoopListIntersectingInsideXSegment( loopList, segmentFirstX, segmentSecond
 
 def isLoopListIntersecting(loops):
 	'Determine if a loop in the list is intersecting the other loops.'
-	for loopIndex in xrange(len(loops) - 1):
-		loop = loops[loopIndex]
-		if isLoopIntersectingLoops(loop, loops[loopIndex + 1 :]):
+	segmentGrid = SegmentGrid(getSegmentGridCellWidth(loops))
+	for loopIndex in xrange(len(loops) - 1, 0, - 1):
+		segmentGrid.addLoop(loops[loopIndex])
+		if segmentGrid.isLoopIntersecting(loops[loopIndex - 1]):
 			return True
 	return False
 
@@ -1859,11 +1936,10 @@ def isPathInsideLoops(loops, path):
 	return False
 
 def isPixelTableIntersecting( bigTable, littleTable, maskTable = {} ):
-	'Add path to the pixel table.'
-	littleTableKeys = littleTable.keys()
-	for littleTableKey in littleTableKeys:
-		if littleTableKey not in maskTable:
-			if littleTableKey in bigTable:
+	'Determine if the little pixel table intersects the big pixel table, outside of the mask table.'
+	for littleTableKey in littleTable:
+		if littleTableKey in bigTable:
+			if littleTableKey not in maskTable:
 				return True
 	return False
 
@@ -1948,12 +2024,13 @@ def joinXIntersectionsTables( fromTable, intoTable ):
 	for concatenatedTableKey in concatenatedTableKeys:
 		joinedKeyTable[ concatenatedTableKey ] = None
 	for joinedKey in joinedKeyTable.keys():
-		xIntersectionIndexList = []
+		intoXIntersections = []
 		if joinedKey in intoTable:
-			addXIntersectionIndexesFromXIntersections( 0, xIntersectionIndexList, intoTable[ joinedKey ] )
+			intoXIntersections = intoTable[ joinedKey ]
+		fromXIntersections = []
 		if joinedKey in fromTable:
-			addXIntersectionIndexesFromXIntersections( 1, xIntersectionIndexList, fromTable[ joinedKey ] )
-		xIntersections = getJoinOfXIntersectionIndexes( xIntersectionIndexList )
+			fromXIntersections = fromTable[ joinedKey ]
+		xIntersections = getJoinOfXIntersections( intoXIntersections, fromXIntersections )
 		if len( xIntersections ) > 0:
 			intoTable[ joinedKey ] = xIntersections
 		else:
@@ -2017,11 +2094,10 @@ def subtractXIntersectionsTable( subtractFromTable, subtractTable ):
 	subtractFromTableKeys = subtractFromTable.keys()
 	subtractFromTableKeys.sort()
 	for subtractFromTableKey in subtractFromTableKeys:
-		xIntersectionIndexList = []
-		addXIntersectionIndexesFromXIntersections( - 1, xIntersectionIndexList, subtractFromTable[ subtractFromTableKey ] )
+		subtractXIntersections = []
 		if subtractFromTableKey in subtractTable:
-			addXIntersectionIndexesFromXIntersections( 0, xIntersectionIndexList, subtractTable[ subtractFromTableKey ] )
-		xIntersections = getXIntersectionsFromIntersections( xIntersectionIndexList )
+			subtractXIntersections = subtractTable[ subtractFromTableKey ]
+		xIntersections = getDifferenceOfXIntersections( subtractFromTable[ subtractFromTableKey ], subtractXIntersections )
 		if len( xIntersections ) > 0:
 			subtractFromTable[ subtractFromTableKey ] = xIntersections
 		else:
@@ -2124,14 +2200,7 @@ class Endpoint:
 
 	def getNearestEndpoint( self, endpoints ):
 		'Get nearest endpoint.'
-		smallestDistance = 987654321987654321.0
-		nearestEndpoint = None
-		for endpoint in endpoints:
-			distance = abs( self.point - endpoint.point )
-			if distance < smallestDistance:
-				smallestDistance = distance
-				nearestEndpoint = endpoint
-		return nearestEndpoint
+		return getNearestEndpointFromList(self.point, endpoints, None, 987654321987654321.0)
 
 	def getNearestMiss(self, endpoints, path, pixelDictionary, width):
 		'Get the nearest endpoint which the segment to that endpoint misses the other extrusions.'
@@ -2152,8 +2221,7 @@ class Endpoint:
 #				print( endpoint )
 #				print(path)
 				return endpoint
-		endpoints.sort(compareSegmentLength)
-		for endpoint in endpoints[: 15]: # increasing the number of searched endpoints increases the search time, with 20 fill took 600 seconds for cilinder.gts, with 10 fill took 533 seconds
+		for endpoint in getShortestSegmentEndpoints(endpoints, 15): # increasing the number of searched endpoints increases the search time, with 20 fill took 600 seconds for cilinder.gts, with 10 fill took 533 seconds
 			normalizedSegment = endpoint.segment / endpoint.segmentLength
 			isOverlappingSelf = getDotProduct(penultimateMinusPoint, normalizedSegment) > 0.9
 			if not isOverlappingSelf:
@@ -2164,11 +2232,12 @@ class Endpoint:
 					if isXSegmentIntersectingPath(path[max(0, len(path) - 21) : -1], pointRotated.real, endpointPointRotated.real, segmentYMirror, pointRotated.imag):
 						isOverlappingSelf = True
 			if not isOverlappingSelf:
-				totalMaskTable = pathMaskTable.copy()
-				addSegmentToPixelTable(endpoint.point, endpoint.otherEndpoint.point, totalMaskTable, 0, 0, width)
+				endpointMaskTable = {}
+				addSegmentToPixelTable(endpoint.point, endpoint.otherEndpoint.point, endpointMaskTable, 0, 0, width)
 				segmentTable = {}
 				addSegmentToPixelTable(self.point, endpoint.point, segmentTable, 0, 0, width)
-				if not isPixelTableIntersecting(pixelDictionary, segmentTable, totalMaskTable):
+				removePixelTableFromPixelTable(pathMaskTable, segmentTable)
+				if not isPixelTableIntersecting(pixelDictionary, segmentTable, endpointMaskTable):
 					return endpoint
 		return None
 
@@ -2191,8 +2260,7 @@ class Endpoint:
 #				print( endpoint )
 #				print(path)
 				return endpoint
-		endpoints.sort( compareSegmentLength )
-		for endpoint in endpoints[ : 15 ]: # increasing the number of searched endpoints increases the search time, with 20 fill took 600 seconds for cilinder.gts, with 10 fill took 533 seconds
+		for endpoint in getShortestSegmentEndpoints(endpoints, 15): # increasing the number of searched endpoints increases the search time, with 20 fill took 600 seconds for cilinder.gts, with 10 fill took 533 seconds
 			normalizedSegment = endpoint.segment / endpoint.segmentLength
 			isOverlappingSelf = getDotProduct( penultimateMinusPoint, normalizedSegment ) > 0.9
 			if not isOverlappingSelf:
@@ -2210,15 +2278,106 @@ class Endpoint:
 					if isXSegmentIntersectingPath( endpointPath, pointRotated.real, endpointPointRotated.real, segmentYMirror, pointRotated.imag ):
 						isOverlappingSelf = True
 			if not isOverlappingSelf:
-				totalMaskTable = pathMaskTable.copy()
-				addSegmentToPixelTable( endpoint.point, endpoint.otherEndpoint.point, totalMaskTable, 0, 0, width )
+				endpointMaskTable = {}
+				addSegmentToPixelTable(endpoint.point, endpoint.otherEndpoint.point, endpointMaskTable, 0, 0, width)
 				segmentTable = {}
-				addSegmentToPixelTable( self.point, endpoint.point, segmentTable, 0, 0, width )
-				if not isPixelTableIntersecting( pixelDictionary, segmentTable, totalMaskTable ):
+				addSegmentToPixelTable(self.point, endpoint.point, segmentTable, 0, 0, width)
+				removePixelTableFromPixelTable(pathMaskTable, segmentTable)
+				if not isPixelTableIntersecting(pixelDictionary, segmentTable, endpointMaskTable):
 					return endpoint
 		return None
 
 
+class EndpointGrid:
+	'A ring expanding grid of endpoints, which supports removal and nearest endpoint queries.'
+	def __init__(self, endpoints, cellWidth):
+		'Initialize.'
+		self.cellTable = {}
+		self.cellWidth = cellWidth
+		self.oneOverCellWidth = 1.0 / cellWidth
+		for endpoint in endpoints:
+			addElementToPixelListFromPoint(endpoint, self.cellTable, endpoint.point * self.oneOverCellWidth)
+		self.minimumKey = (0, 0)
+		self.maximumKey = (0, 0)
+		if len(self.cellTable) > 0:
+			cellKeys = self.cellTable.keys()
+			xKeys = [cellKey[0] for cellKey in cellKeys]
+			yKeys = [cellKey[1] for cellKey in cellKeys]
+			self.minimumKey = (min(xKeys), min(yKeys))
+			self.maximumKey = (max(xKeys), max(yKeys))
+
+	def __repr__(self):
+		'Get the string representation of this EndpointGrid.'
+		return 'EndpointGrid %s, %s' % (self.cellWidth, self.cellTable)
+
+	def getNearestEndpoint(self, point):
+		'Get the nearest endpoint by searching the rings of cells around the point, stopping when no further ring could hold a nearer endpoint.'
+		centerKey = getStepKeyFromPoint(point * self.oneOverCellWidth)
+		nearestEndpoint = None
+		smallestDistance = 987654321987654321.0
+		maximumRing = max(abs(centerKey[0] - self.minimumKey[0]), abs(centerKey[0] - self.maximumKey[0]))
+		maximumRing = max(maximumRing, abs(centerKey[1] - self.minimumKey[1]), abs(centerKey[1] - self.maximumKey[1]))
+		for ringIndex in xrange(maximumRing + 1):
+			if 8 * ringIndex > len(self.cellTable):
+				return getNearestEndpointFromList(point, getListTableElements(self.cellTable), nearestEndpoint, smallestDistance)
+			for cellKey in getRingStepKeys(centerKey, ringIndex):
+				if cellKey in self.cellTable:
+					for endpoint in self.cellTable[cellKey]:
+						distance = abs(point - endpoint.point)
+						if distance < smallestDistance:
+							smallestDistance = distance
+							nearestEndpoint = endpoint
+			if smallestDistance < (float(ringIndex) - 0.5) * self.cellWidth:
+				return nearestEndpoint
+		return nearestEndpoint
+
+	def getSquareValues(self, point):
+		'Get a list of the endpoints in the square of cells around the point.'
+		return getSquareValuesFromPoint(self.cellTable, point * self.oneOverCellWidth)
+
+	def removeEndpoint(self, endpoint):
+		'Remove the endpoint from the grid.'
+		removeElementFromPixelListFromPoint(endpoint, self.cellTable, endpoint.point * self.oneOverCellWidth)
+
+
+class HorizontalScanLines:
+	'A class to hold the x intersection indexes of loop edges with evenly spaced horizontal lines.'
+	def __init__(self, front, numberOfLines, width):
+		'Initialize.'
+		self.width = width
+		self.xIntersectionIndexLists = []
+		self.yList = []
+		self.frontOverWidth = getFrontOverWidthAddYList(front, numberOfLines, self.xIntersectionIndexLists, width, self.yList)
+
+	def __repr__(self):
+		'Get the string representation of these horizontal scan lines.'
+		return 'HorizontalScanLines %s, %s' % (self.yList, self.xIntersectionIndexLists)
+
+	def addLoopLists(self, loopLists):
+		'Add the x intersection indexes of the loop lists, each indexed by its place in the loop lists.'
+		for loopListIndex in xrange(len(loopLists)):
+			self.addLoops(loopLists[loopListIndex], loopListIndex)
+
+	def addLoops(self, loops, solidIndex):
+		'Add the x intersection indexes of the loops, each edge only to the lines within its y range.'
+		addXIntersectionIndexesFromLoops(self.frontOverWidth, loops, solidIndex, self.xIntersectionIndexLists, self.width, self.yList)
+
+	def getHorizontalSegmentLists(self):
+		'Get the horizontal segment lists inside the negative indexed loops and outside the others.'
+		horizontalSegmentLists = []
+		for xIntersectionIndexListIndex in xrange(len(self.xIntersectionIndexLists)):
+			xIntersectionIndexList = self.xIntersectionIndexLists[xIntersectionIndexListIndex]
+			horizontalSegmentLists.append(getSegmentsFromXIntersectionIndexes(xIntersectionIndexList, self.yList[xIntersectionIndexListIndex]))
+		return horizontalSegmentLists
+
+	def getIntersectionLists(self, totalSolidSurfaceThickness):
+		'Get the x intersection lists where at least the total solid surface thickness of loop lists overlap.'
+		intersectionLists = []
+		for xIntersectionIndexList in self.xIntersectionIndexLists:
+			intersectionLists.append(getIntersectionOfXIntersectionIndexes(totalSolidSurfaceThickness, xIntersectionIndexList))
+		return intersectionLists
+
+
 class LoopLayer:
 	'Loops with a z.'
 	def __init__(self, z):
@@ -2529,6 +2688,84 @@ def getFlattenedNestedRings(nestedRings):
 	return flattenedNestedRings
 
 
+class SegmentGrid:
+	'A uniform grid of segments, to check a line against only the segments near it.'
+	def __init__(self, cellWidth):
+		'Initialize.'
+		self.cellTable = {}
+		self.cellWidth = cellWidth
+		self.oneOverCellWidth = 1.0 / cellWidth
+		self.padding = 0.0001 * cellWidth
+		self.segments = []
+
+	def __repr__(self):
+		'Get the string representation of this SegmentGrid.'
+		return 'SegmentGrid %s, %s' % (self.cellWidth, self.segments)
+
+	def addLoop(self, loop):
+		'Add the segments of the loop.'
+		for pointIndex in xrange(len(loop)):
+			self.addSegment(loop[pointIndex], loop[(pointIndex + 1) % len(loop)])
+
+	def addLoops(self, loops):
+		'Add the segments of the loops.'
+		for loop in loops:
+			self.addLoop(loop)
+
+	def addSegment(self, pointBegin, pointEnd):
+		'Add the segment to the cells its bounding box overlaps.'
+		segmentIndex = len(self.segments)
+		self.segments.append((pointBegin, pointEnd))
+		for stepKey in self.getStepKeys(pointBegin, pointEnd):
+			addElementToListDictionary(segmentIndex, stepKey, self.cellTable)
+
+	def getSegmentIndexes(self, pointBegin, pointEnd):
+		'Get the indexes of the segments which could intersect the line, or all the indexes if the line covers more cells than there are segments.'
+		stepKeys = self.getStepKeys(pointBegin, pointEnd)
+		if len(stepKeys) > len(self.segments):
+			return xrange(len(self.segments))
+		segmentIndexSet = set()
+		for stepKey in stepKeys:
+			if stepKey in self.cellTable:
+				segmentIndexSet.update(self.cellTable[stepKey])
+		return segmentIndexSet
+
+	def getStepKeys(self, pointBegin, pointEnd):
+		'Get the step keys of the cells overlapping the padded bounding box of the segment.'
+		xBegin = int(math.floor((min(pointBegin.real, pointEnd.real) - self.padding) * self.oneOverCellWidth))
+		xEnd = int(math.floor((max(pointBegin.real, pointEnd.real) + self.padding) * self.oneOverCellWidth))
+		yBegin = int(math.floor((min(pointBegin.imag, pointEnd.imag) - self.padding) * self.oneOverCellWidth))
+		yEnd = int(math.floor((max(pointBegin.imag, pointEnd.imag) + self.padding) * self.oneOverCellWidth))
+		stepKeys = []
+		for x in xrange(xBegin, xEnd + 1):
+			for y in xrange(yBegin, yEnd + 1):
+				stepKeys.append((x, y))
+		return stepKeys
+
+	def isLineIntersecting(self, pointBegin, pointEnd):
+		'Determine if the line is intersecting the segments, with the same test as isLineIntersectingLoops.'
+		normalizedSegment = pointEnd - pointBegin
+		normalizedSegmentLength = abs(normalizedSegment)
+		if normalizedSegmentLength <= 0.0:
+			return False
+		normalizedSegment /= normalizedSegmentLength
+		segmentYMirror = complex(normalizedSegment.real, -normalizedSegment.imag)
+		pointBeginRotated = segmentYMirror * pointBegin
+		pointEndRotated = segmentYMirror * pointEnd
+		for segmentIndex in self.getSegmentIndexes(pointBegin, pointEnd):
+			segmentBegin, segmentEnd = self.segments[segmentIndex]
+			if isLineIntersectingInsideXSegment(segmentYMirror * segmentBegin, segmentYMirror * segmentEnd, pointBeginRotated.real, pointEndRotated.real, pointBeginRotated.imag):
+				return True
+		return False
+
+	def isLoopIntersecting(self, loop):
+		'Determine if the loop is intersecting the segments.'
+		for pointIndex in xrange(len(loop)):
+			if self.isLineIntersecting(loop[pointIndex], loop[(pointIndex + 1) % len(loop)]):
+				return True
+		return False
+
+
 class XIntersectionIndex:
 	'A class to hold the x intersection position and the index of the loop which intersected.'
 	def __init__( self, index, x ):
@@ -185,6 +185,10 @@ class SLCCarving:
 		"Set the is correct mesh flag."
 		pass
 
+	def setCarveNumberOfWorkers( self, numberOfWorkers ):
+		"Set the number of worker processes."
+		pass
+
 
 def main():
 	"Display the inset dialog."
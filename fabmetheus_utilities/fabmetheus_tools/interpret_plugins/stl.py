@@ -24,7 +24,7 @@ from fabmetheus_utilities.geometry.solids import triangle_mesh
 from fabmetheus_utilities.vector3 import Vector3
 from fabmetheus_utilities import archive
 from fabmetheus_utilities import gcodec
-from struct import unpack
+from struct import Struct
 
 __author__ = 'Enrique Perez (perez_enrique@yahoo.com)'
 __credits__ = 'Nophead <http://hydraraptor.blogspot.com/>\nArt of Illusion <http://www.artofillusion.org/>'
@@ -32,16 +32,29 @@ __date__ = '$Date: 2008/21/04 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+globalFaceRecordStruct = Struct('<12x12s12s12s2x')
+globalVertexStruct = Struct('<fff')
+
+
 def addFacesGivenBinary( stlData, triangleMesh, vertexIndexTable ):
-	"Add faces given stl binary."
-	numberOfVertexes = ( len( stlData ) - 84 ) / 50
-	vertexes = []
-	for vertexIndex in xrange( numberOfVertexes ):
-		byteIndex = 84 + vertexIndex * 50
-		vertexes.append( getVertexGivenBinary( byteIndex + 12, stlData ) )
-		vertexes.append( getVertexGivenBinary( byteIndex + 24, stlData ) )
-		vertexes.append( getVertexGivenBinary( byteIndex + 36, stlData ) )
-	addFacesGivenVertexes( triangleMesh, vertexIndexTable, vertexes )
+	"Add faces given stl binary, welding the vertexes by their twelve bytes so that each unique vertex is only unpacked once."
+	numberOfFaces = ( len( stlData ) - 84 ) / 50
+	faces = triangleMesh.faces
+	vertexes = triangleMesh.vertexes
+	unpackFaceRecord = globalFaceRecordStruct.unpack_from
+	unpackVertex = globalVertexStruct.unpack
+	for byteIndex in xrange( 84, 84 + numberOfFaces * 50, 50 ):
+		faceGivenBinary = face.Face()
+		faceGivenBinary.index = len(faces)
+		for vertexBytes in unpackFaceRecord( stlData, byteIndex ):
+			if vertexBytes in vertexIndexTable:
+				vertexUniqueIndex = vertexIndexTable[vertexBytes]
+			else:
+				vertexUniqueIndex = len(vertexIndexTable)
+				vertexIndexTable[vertexBytes] = vertexUniqueIndex
+				vertexes.append( Vector3( *unpackVertex(vertexBytes) ) )
+			faceGivenBinary.vertexIndexes.append(vertexUniqueIndex)
+		faces.append(faceGivenBinary)
 
 def addFacesGivenText( stlText, triangleMesh, vertexIndexTable ):
 	"Add faces given stl text."
@@ -97,13 +110,9 @@ def getFloat(floatString):
 	except:
 		return float( floatString.replace(',', '.') )
 
-def getFloatGivenBinary( byteIndex, stlData ):
-	"Get vertex given stl vertex line."
-	return unpack('f', stlData[ byteIndex : byteIndex + 4 ] )[0]
-
 def getVertexGivenBinary( byteIndex, stlData ):
-	"Get vertex given stl vertex line."
-	return Vector3( getFloatGivenBinary( byteIndex, stlData ), getFloatGivenBinary( byteIndex + 4, stlData ), getFloatGivenBinary( byteIndex + 8, stlData ) )
+	"Get vertex given stl vertex bytes."
+	return Vector3( *globalVertexStruct.unpack_from( stlData, byteIndex ) )
 
 def getVertexGivenLine(line):
 	"Get vertex given stl vertex line."
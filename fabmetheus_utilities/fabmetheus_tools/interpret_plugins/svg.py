@@ -111,3 +111,7 @@ class SVGCarving:
 	def setCarveIsCorrectMesh(self, isCorrectMesh):
 		'Set the is correct mesh flag.'
 		pass
+
+	def setCarveNumberOfWorkers(self, numberOfWorkers):
+		'Set the number of worker processes.'
+		pass
@@ -23,6 +23,7 @@ import __init__
 from fabmetheus_utilities.vector3 import Vector3
 from fabmetheus_utilities import archive
 from fabmetheus_utilities import euclidean
+import bisect
 import cStringIO
 import math
 import os
@@ -117,6 +118,18 @@ def getGcodeFileText(fileName, gcodeText):
 		return archive.getFileText(fileName)
 	return ''
 
+def getGcodeText(gcode):
+	'Get the text of the gcode, which is either a text or gcode lines, so gcode lines are only joined where a text is needed, as at the end of the craft chain and for a checkpoint.'
+	if isinstance(gcode, GcodeLines):
+		return gcode.getvalue()
+	return gcode
+
+def getGcodeTextLines(gcode):
+	'Get the lines of the gcode, which is either a text or gcode lines, as archive.getTextLines would get them from the text.'
+	if isinstance(gcode, GcodeLines):
+		return gcode.getTextLines()
+	return archive.getTextLines(gcode)
+
 def getIndexOfStartingWithSecond(letter, splitLine):
 	'Get index of the first occurence of the given letter in the split line, starting with the second word.  Return - 1 if letter is not found'
 	for wordIndex in xrange( 1, len(splitLine) ):
@@ -166,11 +179,22 @@ def getWithoutBracketsEqualTab(line):
 	line = line.replace('>', '')
 	return line.replace('\t', '')
 
+def getHeaderText(text):
+	'Get the text before the crafting, before the end of the svg metadata or before the end of the binary slice header, which is where the procedure names are.'
+	for headerEndTag in ['(<crafting>)', '</metadata>', '(</sliceBinaryHeader>)']:
+		headerEndIndex = text.find(headerEndTag)
+		if headerEndIndex > -1:
+			return text[: headerEndIndex]
+	return text
+
 def isProcedureDone(gcodeText, procedure):
-	'Determine if the procedure has been done on the gcode text.'
+	'Determine if the procedure has been done on the gcode text or gcode lines.'
 	if gcodeText == '':
 		return False
-	lines = archive.getTextLines(gcodeText)
+	if isinstance(gcodeText, GcodeLines):
+		lines = gcodeText.getHeaderLines()
+	else:
+		lines = archive.getTextLines(getHeaderText(gcodeText))
 	for line in lines:
 		withoutBracketsEqualTabQuotes = getWithoutBracketsEqualTab(line).replace('"', '').replace("'", '')
 		splitLine = getWithoutBracketsEqualTab( withoutBracketsEqualTabQuotes ).split()
@@ -250,7 +274,7 @@ class DistanceFeedRate:
 	def __init__(self):
 		'Initialize.'
 		self.decimalPlacesCarried = 3
-		self.output = cStringIO.StringIO()
+		self.output = GcodeLines()
 
 	def addGcodeFromFeedRateThreadZ(self, feedRateMinute, thread, travelFeedRateMinute, z):
 		'Add a thread to the output.'
@@ -353,6 +377,12 @@ class DistanceFeedRate:
 		'Get boundary gcode line.'
 		return '(<boundaryPoint> X%s Y%s Z%s </boundaryPoint>)' % (self.getRounded(location.x), self.getRounded(location.y), self.getRounded(location.z))
 
+	def getCraftedGcode(self):
+		'Get the output gcode lines, or an empty text if nothing was added.'
+		if self.output.isEmpty():
+			return ''
+		return self.output
+
 	def getFirstWordMovement(self, firstWord, location):
 		'Get the start of the arc line.'
 		return '%s X%s Y%s Z%s' % (firstWord, self.getRounded(location.x), self.getRounded(location.y), self.getRounded(location.z))
@@ -393,3 +423,128 @@ class DistanceFeedRate:
 		firstWord = getWithoutBracketsEqualTab(firstWord)
 		if firstWord == 'decimalPlacesCarried':
 			self.decimalPlacesCarried = int(splitLine[1])
+
+
+class GcodeLines:
+	'A class to hold the lines written by a craft procedure, which is passed to the next procedure instead of a text, so that the next procedure gets the lines from getGcodeTextLines without the text being joined and split again.'
+	def __init__(self):
+		'Initialize.'
+		self.isRegular = True
+		self.lines = []
+		self.partialLine = ''
+
+	def getHeaderLines(self):
+		'Get the lines before the crafting, which is where the procedure names are.'
+		headerLines = []
+		for line in self.lines:
+			if line == '(<crafting>)':
+				return headerLines
+			headerLines.append(line)
+		return self.getTextLines()
+
+	def getTextLines(self):
+		'Get the lines as archive.getTextLines would get them from the text.'
+		if not self.isRegular:
+			return archive.getTextLines(self.getvalue())
+		return self.lines + [self.partialLine]
+
+	def getvalue(self):
+		'Get the text of the lines, like cStringIO.getvalue.'
+		if len(self.lines) == 0:
+			return self.partialLine
+		return '\n'.join(self.lines) + '\n' + self.partialLine
+
+	def isEmpty(self):
+		'Determine if nothing has been written.'
+		return len(self.lines) == 0 and self.partialLine == ''
+
+	def write(self, text):
+		'Write the text, like cStringIO.write.'
+		if self.partialLine == '' and text.find('\n') == len(text) - 1 > 0 and text.find('\r') < 0:
+			self.lines.append(text[: -1])
+			return
+		splitLines = (self.partialLine + text).split('\n')
+		self.partialLine = splitLines.pop()
+		if '' in splitLines or text.find('\r') >= 0:
+			self.isRegular = False
+		self.lines += splitLines
+
+
+class ThreadIndex:
+	'A class to index the first words, move locations, cumulative path lengths and times of gcode lines in one pass.'
+	def __init__(self, lines, feedRateMinute=960.0):
+		'Index the lines.'
+		self.firstWordIndexesDictionary = {}
+		self.firstWords = []
+		self.lines = lines
+		self.locations = []
+		self.pathLengths = []
+		self.pathTimes = []
+		location = None
+		pathLength = 0.0
+		pathTime = 0.0
+		for lineIndex, line in enumerate(lines):
+			splitLine = getSplitLineBeforeBracketSemicolon(line)
+			firstWord = getFirstWord(splitLine)
+			if firstWord == 'G1':
+				nextLocation = Vector3()
+				if location != None:
+					nextLocation = location.copy()
+				for word in reversed(splitLine[1 :]):
+					firstLetter = word[0]
+					if firstLetter == 'X':
+						nextLocation.x = float(word[1 :])
+					elif firstLetter == 'Y':
+						nextLocation.y = float(word[1 :])
+					elif firstLetter == 'Z':
+						nextLocation.z = float(word[1 :])
+					elif firstLetter == 'F':
+						feedRateMinute = float(word[1 :])
+				if location != None:
+					segmentLength = nextLocation.distance(location)
+					pathLength += segmentLength
+					pathTime += segmentLength / (feedRateMinute / 60.0)
+				location = nextLocation
+			if firstWord in self.firstWordIndexesDictionary:
+				self.firstWordIndexesDictionary[firstWord].append(lineIndex)
+			else:
+				self.firstWordIndexesDictionary[firstWord] = [lineIndex]
+			self.firstWords.append(firstWord)
+			self.locations.append(location)
+			self.pathLengths.append(pathLength)
+			self.pathTimes.append(pathTime)
+
+	def getNextIndex(self, firstWord, lineIndex):
+		'Get the index of the first line after the line index which starts with the first word, or None if there is none.'
+		if firstWord not in self.firstWordIndexesDictionary:
+			return None
+		firstWordIndexes = self.firstWordIndexesDictionary[firstWord]
+		nextIndex = bisect.bisect_right(firstWordIndexes, lineIndex)
+		if nextIndex >= len(firstWordIndexes):
+			return None
+		return firstWordIndexes[nextIndex]
+
+	def getPathLength(self, beginIndex, endIndex):
+		'Get the length of the moves after the begin index, up to and including the end index.'
+		return self.pathLengths[endIndex] - self.pathLengths[beginIndex]
+
+	def getPathTime(self, beginIndex, endIndex):
+		'Get the time of the moves after the begin index, up to and including the end index.'
+		return self.pathTimes[endIndex] - self.pathTimes[beginIndex]
+
+	def getPreviousIndex(self, firstWord, lineIndex):
+		'Get the index of the last line before the line index which starts with the first word, or None if there is none.'
+		if firstWord not in self.firstWordIndexesDictionary:
+			return None
+		firstWordIndexes = self.firstWordIndexesDictionary[firstWord]
+		previousIndex = bisect.bisect_left(firstWordIndexes, lineIndex) - 1
+		if previousIndex < 0:
+			return None
+		return firstWordIndexes[previousIndex]
+
+	def isFirstWordBetween(self, firstWord, beginIndex, endIndex):
+		'Determine if there is a line between the begin and end indexes which starts with the first word.'
+		nextIndex = self.getNextIndex(firstWord, beginIndex)
+		if nextIndex == None:
+			return False
+		return nextIndex < endIndex
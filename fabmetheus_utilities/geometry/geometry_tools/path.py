@@ -206,3 +206,7 @@ class SVGFabricationCarving:
 	def setCarveIsCorrectMesh( self, isCorrectMesh ):
 		'Set the is correct mesh flag.'
 		pass
+
+	def setCarveNumberOfWorkers( self, numberOfWorkers ):
+		'Set the number of worker processes.'
+		pass
@@ -201,3 +201,7 @@ class BooleanGeometry:
 	def setCarveIsCorrectMesh( self, isCorrectMesh ):
 		'Set the is correct mesh flag.'
 		self.isCorrectMesh = isCorrectMesh
+
+	def setCarveNumberOfWorkers( self, numberOfWorkers ):
+		'Set the number of worker processes.'
+		pass
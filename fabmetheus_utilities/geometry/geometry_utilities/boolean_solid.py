@@ -16,6 +16,7 @@ from __future__ import absolute_import
 import __init__
 
 from fabmetheus_utilities.geometry.geometry_utilities.evaluate_elements import setting
+from fabmetheus_utilities.geometry.geometry_utilities import boolean_sweep
 from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 from fabmetheus_utilities.geometry.solids import group
 from fabmetheus_utilities.geometry.solids import triangle_mesh
@@ -24,6 +25,7 @@ from fabmetheus_utilities import euclidean
 from fabmetheus_utilities import gcodec
 from fabmetheus_utilities import intercircle
 import math
+import time
 
 
 __author__ = 'Enrique Perez (perez_enrique@yahoo.com)'
@@ -202,10 +204,14 @@ class BooleanSolid( group.Group ):
 	'A boolean solid object.'
 	def getDifference(self, importRadius, visibleObjectLoopsList):
 		'Get subtracted loops sliced through shape.'
+		if setting.getExactBoolean(self.xmlElement):
+			return boolean_sweep.getLoopsDifference(visibleObjectLoopsList)
 		return getLoopsDifference(importRadius, visibleObjectLoopsList)
 
 	def getIntersection(self, importRadius, visibleObjectLoopsList):
 		'Get intersected loops sliced through shape.'
+		if setting.getExactBoolean(self.xmlElement):
+			return boolean_sweep.getLoopsIntersection(visibleObjectLoopsList)
 		return getLoopsIntersection(importRadius, visibleObjectLoopsList)
 
 	def getLoops(self, importRadius, z):
@@ -229,8 +235,33 @@ class BooleanSolid( group.Group ):
 
 	def getUnion(self, importRadius, visibleObjectLoopsList):
 		'Get joined loops sliced through shape.'
+		if setting.getExactBoolean(self.xmlElement):
+			return boolean_sweep.getLoopsUnified(visibleObjectLoopsList)
 		return getLoopsUnified(importRadius, visibleObjectLoopsList)
 
 	def getXMLClassName(self):
 		'Get xml class name.'
 		return self.operationFunction.__name__.lower()[ len('get') : ]
+
+
+def main():
+	'Benchmark the point cloud against the sweep clipper on overlapping circles and squares.'
+	circleLoop = euclidean.getComplexPolygon(complex(5.0, 5.0), 7.0, 360)
+	squareLoop = [complex(0.0, 0.0), complex(10.0, 0.0), complex(10.0, 10.0), complex(0.0, 10.0)]
+	loopLists = [[circleLoop], [squareLoop]]
+	importRadius = 0.1
+	for operationName, pointCloudFunction, sweepFunction in [
+		('difference', getLoopsDifference, boolean_sweep.getLoopsDifference),
+		('intersection', getLoopsIntersection, boolean_sweep.getLoopsIntersection),
+		('union', getLoopsUnified, boolean_sweep.getLoopsUnified)]:
+		startTime = time.time()
+		pointCloudLoops = pointCloudFunction(importRadius, loopLists)
+		pointCloudSeconds = time.time() - startTime
+		startTime = time.time()
+		sweepLoops = sweepFunction(loopLists)
+		sweepSeconds = time.time() - startTime
+		print('%s point cloud %s seconds, area %s' % (operationName, pointCloudSeconds, euclidean.getAreaLoops(pointCloudLoops)))
+		print('%s sweep %s seconds, area %s' % (operationName, sweepSeconds, euclidean.getAreaLoops(sweepLoops)))
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,312 @@
+"""
+Boolean sweep is an exact polygon clipper for the union, intersection and difference of loop lists.
+
+The edges of both operands are swept from left to right, and each edge is split where it crosses or touches an edge of the other operand.  Each split edge is then kept or dropped depending on whether it is inside the other operand, and the kept edges are linked into loops.  The new vertexes are only the intersection points, so unlike the point cloud boolean of boolean_solid the result does not depend on the import radius.
+
+The filled region of each operand is determined by the even odd rule, like euclidean.getIsInFilledRegion.
+
+"""
+
+from __future__ import absolute_import
+#Init has to be imported first because it has code to workaround the python bug where relative imports don't work if the module is imported as a main module.
+import __init__
+
+from fabmetheus_utilities import euclidean
+import math
+
+
+__author__ = 'Enrique Perez (perez_enrique@yahoo.com)'
+__credits__ = 'Nophead <http://hydraraptor.blogspot.com/>\nArt of Illusion <http://www.artofillusion.org/>'
+__date__ = '$Date: 2008/21/04 $'
+__license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
+
+
+globalSnapRatio = 1.0e-10
+
+
+def addCollinearSplits(edgeFirst, edgeSecond):
+	'Add the endpoints of each collinear edge which are inside the other edge to the splits of the other edge.'
+	for point in (edgeSecond.begin, edgeSecond.end):
+		edgeFirst.addSplitIfInside(point)
+	for point in (edgeFirst.begin, edgeFirst.end):
+		edgeSecond.addSplitIfInside(point)
+
+def addEdgeSplits(edges):
+	'Sweep the edges from left to right and add the splits where they cross or touch each other.'
+	activeEdges = []
+	for edge in sorted(edges, key=getEdgeMinimumX):
+		activeEdges = [activeEdge for activeEdge in activeEdges if activeEdge.maximumX >= edge.minimumX]
+		for activeEdge in activeEdges:
+			if activeEdge.maximumY >= edge.minimumY and activeEdge.minimumY <= edge.maximumY:
+				addIntersectionSplits(activeEdge, edge)
+		activeEdges.append(edge)
+
+def addEdgesFromLoops(edges, loops, operandIndex):
+	'Add the edges of the loops.'
+	for loop in loops:
+		for pointIndex, begin in enumerate(loop):
+			end = loop[(pointIndex + 1) % len(loop)]
+			if begin != end:
+				edges.append(Edge(begin, end, operandIndex))
+
+def addIntersectionSplits(edgeFirst, edgeSecond):
+	'Add the split where the edges cross or touch each other.'
+	beginFirst = edgeFirst.begin
+	segmentFirst = edgeFirst.end - beginFirst
+	segmentSecond = edgeSecond.end - edgeSecond.begin
+	beginDifference = edgeSecond.begin - beginFirst
+	denominator = segmentFirst.real * segmentSecond.imag - segmentFirst.imag * segmentSecond.real
+	crossFirst = beginDifference.real * segmentFirst.imag - beginDifference.imag * segmentFirst.real
+	if denominator == 0.0:
+		if crossFirst == 0.0:
+			addCollinearSplits(edgeFirst, edgeSecond)
+		return
+	alongFirst = (beginDifference.real * segmentSecond.imag - beginDifference.imag * segmentSecond.real) / denominator
+	alongSecond = crossFirst / denominator
+	if alongFirst < -globalSnapRatio or alongFirst > 1.0 + globalSnapRatio:
+		return
+	if alongSecond < -globalSnapRatio or alongSecond > 1.0 + globalSnapRatio:
+		return
+	point = getSnappedPoint(alongFirst, edgeFirst)
+	if point == None:
+		point = getSnappedPoint(alongSecond, edgeSecond)
+	if point == None:
+		point = beginFirst + alongFirst * segmentFirst
+	edgeFirst.addSplitIfInside(point)
+	edgeSecond.addSplitIfInside(point)
+
+def getEdgeMinimumX(edge):
+	'Get the minimum x of the edge, which is the sweep key.'
+	return edge.minimumX
+
+def getKeptEdges(edges, isInsideKeptByOperand, isSameDirectionKept, isOppositeDirectionKept):
+	'Get the split edges which are kept, with the edges of the second operand reversed if they are inside the first operand and the operation is a difference.'
+	coincidentTable = {}
+	for edge in edges:
+		euclidean.addElementToListDictionary(edge, edge.getUndirectedKey(), coincidentTable)
+	keptEdges = []
+	for coincidentEdges in coincidentTable.values():
+		operandEdges = [None, None]
+		for coincidentEdge in coincidentEdges:
+			if operandEdges[coincidentEdge.operandIndex] == None:
+				operandEdges[coincidentEdge.operandIndex] = coincidentEdge
+		if operandEdges[0] != None and operandEdges[1] != None:
+			if operandEdges[0].begin == operandEdges[1].begin:
+				if isSameDirectionKept:
+					keptEdges.append(operandEdges[0])
+			elif isOppositeDirectionKept:
+				keptEdges.append(operandEdges[0])
+			continue
+		for coincidentEdge in coincidentEdges:
+			if coincidentEdge.isInsideOther == isInsideKeptByOperand[coincidentEdge.operandIndex]:
+				keptEdges.append(coincidentEdge)
+	return keptEdges
+
+def getLoopsByOperation(loopsFirst, loopsSecond, operationName):
+	'Get the loops of the union, intersection or difference of the first and second loops.'
+	loopsFirst = getNestedOrientedLoops(loopsFirst)
+	loopsSecond = getNestedOrientedLoops(loopsSecond)
+	edges = []
+	addEdgesFromLoops(edges, loopsFirst, 0)
+	addEdgesFromLoops(edges, loopsSecond, 1)
+	addEdgeSplits(edges)
+	splitEdges = []
+	for edge in edges:
+		splitEdges += edge.getSplitEdges()
+	crossingBands = [HorizontalCrossingBands(loopsFirst), HorizontalCrossingBands(loopsSecond)]
+	for splitEdge in splitEdges:
+		otherCrossingBands = crossingBands[1 - splitEdge.operandIndex]
+		splitEdge.isInsideOther = otherCrossingBands.getIsInFilledRegion(0.5 * (splitEdge.begin + splitEdge.end))
+	if operationName == 'difference':
+		keptEdges = getKeptEdges(splitEdges, [False, True], False, True)
+		for keptEdge in keptEdges:
+			if keptEdge.operandIndex == 1:
+				keptEdge.reverse()
+	elif operationName == 'intersection':
+		keptEdges = getKeptEdges(splitEdges, [True, True], True, False)
+	else:
+		keptEdges = getKeptEdges(splitEdges, [False, False], True, False)
+	loops = getLoopsFromEdges(keptEdges)
+	loops.sort(key=euclidean.getAreaLoopAbsolute, reverse=True)
+	return loops
+
+def getLoopsDifference(loopLists):
+	'Get the loops of the first loop list minus the other loop lists.'
+	if len(loopLists) < 1:
+		return []
+	return getLoopsByOperation(loopLists[0], getLoopsUnified(loopLists[1 :]), 'difference')
+
+def getLoopsFromEdges(edges):
+	'Link the edges into loops, turning as far widdershins as possible where several edges leave the same point.'
+	outgoingTable = {}
+	for edge in edges:
+		euclidean.addElementToListDictionary(edge, edge.begin, outgoingTable)
+	loops = []
+	for edge in edges:
+		if edge.isLinked:
+			continue
+		loop = []
+		while edge != None:
+			edge.isLinked = True
+			loop.append(edge.begin)
+			edge = edge.getNextEdge(outgoingTable)
+		if len(loop) > 2:
+			loops.append(loop)
+	return loops
+
+def getLoopsIntersection(loopLists):
+	'Get the loops of the intersection of the loop lists.'
+	if len(loopLists) < 1:
+		return []
+	loopsIntersection = getNestedOrientedLoops(loopLists[0])
+	for loopList in loopLists[1 :]:
+		loopsIntersection = getLoopsByOperation(loopsIntersection, loopList, 'intersection')
+	return loopsIntersection
+
+def getLoopsUnified(loopLists):
+	'Get the loops of the union of the loop lists.'
+	if len(loopLists) < 1:
+		return []
+	loopsUnified = getNestedOrientedLoops(loopLists[0])
+	for loopList in loopLists[1 :]:
+		loopsUnified = getLoopsByOperation(loopsUnified, loopList, 'union')
+	return loopsUnified
+
+def getNestedOrientedLoops(loops):
+	'Get copies of the loops, clockwise if they are in the filled region of the other loops and widdershins otherwise.'
+	nestedOrientedLoops = []
+	for loopIndex, loop in enumerate(loops):
+		if len(loop) > 2:
+			otherLoops = loops[: loopIndex] + loops[loopIndex + 1 :]
+			nestedOrientedLoop = loop[:]
+			if euclidean.getIsInFilledRegion(otherLoops, euclidean.getLeftPoint(loop)) == euclidean.isWiddershins(loop):
+				nestedOrientedLoop.reverse()
+			nestedOrientedLoops.append(nestedOrientedLoop)
+	return nestedOrientedLoops
+
+def getSnappedPoint(along, edge):
+	'Get the begin or end of the edge if the along ratio is close to zero or one, otherwise return None.'
+	if abs(along) <= globalSnapRatio:
+		return edge.begin
+	if abs(along - 1.0) <= globalSnapRatio:
+		return edge.end
+	return None
+
+
+class Edge:
+	'A directed edge of an operand loop.'
+	def __init__(self, begin, end, operandIndex):
+		'Initialize.'
+		self.begin = begin
+		self.end = end
+		self.isInsideOther = False
+		self.isLinked = False
+		self.maximumX = max(begin.real, end.real)
+		self.maximumY = max(begin.imag, end.imag)
+		self.minimumX = min(begin.real, end.real)
+		self.minimumY = min(begin.imag, end.imag)
+		self.operandIndex = operandIndex
+		self.splits = []
+
+	def __repr__(self):
+		'Get the string representation of this Edge.'
+		return '%s, %s, %s, %s' % (self.begin, self.end, self.operandIndex, self.splits)
+
+	def addSplitIfInside(self, point):
+		'Add the point to the splits if it is between the begin and the end.'
+		if point == self.begin or point == self.end:
+			return
+		segment = self.end - self.begin
+		along = euclidean.getDotProduct(point - self.begin, segment) / euclidean.getDotProduct(segment, segment)
+		if along > 0.0 and along < 1.0:
+			self.splits.append((along, point))
+
+	def getNextEdge(self, outgoingTable):
+		'Get the unlinked edge leaving the end of this edge which turns furthest widdershins, or None if there is none.'
+		if self.end not in outgoingTable:
+			return None
+		direction = self.end - self.begin
+		nextEdge = None
+		largestTurn = -987654321.0
+		for outgoingEdge in outgoingTable[self.end]:
+			if not outgoingEdge.isLinked:
+				outgoingDirection = outgoingEdge.end - outgoingEdge.begin
+				turn = math.atan2(euclidean.getCrossProduct(direction, outgoingDirection), euclidean.getDotProduct(direction, outgoingDirection))
+				if turn > largestTurn:
+					largestTurn = turn
+					nextEdge = outgoingEdge
+		return nextEdge
+
+	def getSplitEdges(self):
+		'Get the edges between the splits.'
+		if len(self.splits) < 1:
+			return [self]
+		self.splits.sort()
+		splitEdges = []
+		begin = self.begin
+		for along, point in self.splits + [(1.0, self.end)]:
+			if point != begin:
+				splitEdges.append(Edge(begin, point, self.operandIndex))
+				begin = point
+		return splitEdges
+
+	def getUndirectedKey(self):
+		'Get the key which is the same for this edge and an edge going the other way.'
+		beginKey = (self.begin.real, self.begin.imag)
+		endKey = (self.end.real, self.end.imag)
+		if beginKey < endKey:
+			return (beginKey, endKey)
+		return (endKey, beginKey)
+
+	def reverse(self):
+		'Reverse the direction of the edge.'
+		self.begin, self.end = self.end, self.begin
+
+
+class HorizontalCrossingBands:
+	'A class to count the loop crossings to the left of a point, with the segments held in horizontal bands.'
+	def __init__(self, loops):
+		'Initialize.'
+		self.bands = []
+		self.minimumY = 0.0
+		self.oneOverBandHeight = 0.0
+		segments = []
+		for loop in loops:
+			for pointIndex, begin in enumerate(loop):
+				end = loop[(pointIndex + 1) % len(loop)]
+				if begin.imag != end.imag:
+					segments.append((begin, end))
+		if len(segments) < 1:
+			return
+		self.minimumY = min([min(begin.imag, end.imag) for begin, end in segments])
+		maximumY = max([max(begin.imag, end.imag) for begin, end in segments])
+		numberOfBands = int(math.ceil(math.sqrt(len(segments))))
+		self.oneOverBandHeight = float(numberOfBands) / (maximumY - self.minimumY)
+		self.bands = [[] for bandIndex in xrange(numberOfBands + 1)]
+		for begin, end in segments:
+			beginBandIndex = self.getBandIndex(min(begin.imag, end.imag))
+			endBandIndex = self.getBandIndex(max(begin.imag, end.imag))
+			for bandIndex in xrange(beginBandIndex, endBandIndex + 1):
+				self.bands[bandIndex].append((begin, end))
+
+	def __repr__(self):
+		'Get the string representation of this HorizontalCrossingBands.'
+		return '%s, %s' % (self.minimumY, len(self.bands))
+
+	def getBandIndex(self, y):
+		'Get the index of the band which the y is in, clamped to the bands.'
+		bandIndex = int(math.floor((y - self.minimumY) * self.oneOverBandHeight))
+		return max(0, min(bandIndex, len(self.bands) - 1))
+
+	def getIsInFilledRegion(self, point):
+		'Determine if the point is in the filled region of the loops.'
+		if len(self.bands) < 1:
+			return False
+		numberOfIntersectionsToLeft = 0
+		y = point.imag
+		for begin, end in self.bands[self.getBandIndex(y)]:
+			if (begin.imag > y) != (end.imag > y):
+				xIntersection = begin.real + (y - begin.imag) * (end.real - begin.real) / (end.imag - begin.imag)
+				if xIntersection < point.real:
+					numberOfIntersectionsToLeft += 1
+		return numberOfIntersectionsToLeft % 2 == 1
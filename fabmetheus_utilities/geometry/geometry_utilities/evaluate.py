@@ -13,6 +13,7 @@ from fabmetheus_utilities import archive
 from fabmetheus_utilities import euclidean
 from fabmetheus_utilities import gcodec
 from fabmetheus_utilities import settings
+import copy
 import math
 import os
 import sys
@@ -25,6 +26,9 @@ __date__ = '$Date: 2008/02/05 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+globalConstantExpressionValueDictionary = {}
+globalEvaluatorSplitWordsDictionary = {}
+globalExpressionCacheMaximumLength = 10000
 globalModuleFunctionsDictionary = {}
 
 
@@ -250,9 +254,17 @@ def getEvaluatedDictionaryByEvaluationKeys(evaluationKeys, xmlElement):
 	return evaluatedDictionary
 
 def getEvaluatedExpressionValue(value, xmlElement):
-	'Evaluate the expression value.'
+	'Evaluate the expression value, the value of an expression without names is evaluated only once.'
 	try:
-		return getEvaluatedExpressionValueBySplitLine( getEvaluatorSplitWords(value), xmlElement )
+		if value in globalConstantExpressionValueDictionary:
+			return copy.deepcopy(globalConstantExpressionValueDictionary[value])
+		evaluatorSplitWords = getEvaluatorSplitWords(value)
+		expressionValue = getEvaluatedExpressionValueBySplitLine(evaluatorSplitWords, xmlElement)
+		if expressionValue != None and getIsConstantSplitWords(evaluatorSplitWords):
+			if len(globalConstantExpressionValueDictionary) > globalExpressionCacheMaximumLength:
+				globalConstantExpressionValueDictionary.clear()
+			globalConstantExpressionValueDictionary[value] = copy.deepcopy(expressionValue)
+		return expressionValue
 	except:
 		print('Warning, in getEvaluatedExpressionValue in evaluate could not get a value for:')
 		print(value)
@@ -371,8 +383,9 @@ def getEvaluator(evaluators, nextWord, word, xmlElement):
 				return EvaluatorValue(word[1 : -1])
 	if firstCharacter == '$':
 		return EvaluatorValue(word[1 :])
+	if firstCharacter.isdigit():
+		return EvaluatorNumeric(word, xmlElement)
 	dotIndex = word.find('.')
-	functions = xmlElement.getXMLProcessor().functions
 	if dotIndex > -1 and len(word) > 1:
 		if dotIndex == 0 and word[1].isalpha():
 			return EvaluatorAttribute(word, xmlElement)
@@ -380,10 +393,12 @@ def getEvaluator(evaluators, nextWord, word, xmlElement):
 			untilDot = word[: dotIndex]
 			if untilDot in globalModuleEvaluatorDictionary:
 				return globalModuleEvaluatorDictionary[untilDot](word, xmlElement)
+		functions = xmlElement.getXMLProcessor().functions
 		if len(functions) > 0:
 			if untilDot in functions[-1].localDictionary:
 				return EvaluatorLocal(word, xmlElement)
 	if firstCharacter.isalpha() or firstCharacter == '_':
+		functions = xmlElement.getXMLProcessor().functions
 		if len(functions) > 0:
 			if word in functions[-1].localDictionary:
 				return EvaluatorLocal(word, xmlElement)
@@ -397,7 +412,15 @@ def getEvaluator(evaluators, nextWord, word, xmlElement):
 	return EvaluatorNumeric(word, xmlElement)
 
 def getEvaluatorSplitWords(value):
-	'Get split words for evaluators.'
+	'Get split words for evaluators, each value is only split once.'
+	if value not in globalEvaluatorSplitWordsDictionary:
+		if len(globalEvaluatorSplitWordsDictionary) > globalExpressionCacheMaximumLength:
+			globalEvaluatorSplitWordsDictionary.clear()
+		globalEvaluatorSplitWordsDictionary[value] = getEvaluatorSplitWordsWithoutCache(value)
+	return globalEvaluatorSplitWordsDictionary[value][:]
+
+def getEvaluatorSplitWordsWithoutCache(value):
+	'Get split words for evaluators without looking in the split words cache.'
 	if value.startswith('='):
 		value = value[len('=') :]
 	if len(value) < 1:
@@ -499,6 +522,20 @@ def getIsBracketed(word):
 		return True
 	return firstCharacter == '[' and lastCharacter == ']'
 
+def getIsConstantSplitWords(evaluatorSplitWords):
+	'Determine if the split words are only operators, quoted strings and numbers, so the value does not depend on the xml element.'
+	for word in evaluatorSplitWords:
+		if word in globalSplitDictionary:
+			continue
+		firstCharacter = word[: 1]
+		if firstCharacter == '$' or firstCharacter.isdigit():
+			continue
+		if firstCharacter != "'" and firstCharacter != '"':
+			return False
+		if len(word) < 2 or firstCharacter != word[-1]:
+			return False
+	return True
+
 def getIsQuoted(word):
 	'Determine if the word is quoted.'
 	if len(word) < 2:
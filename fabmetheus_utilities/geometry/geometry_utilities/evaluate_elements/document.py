@@ -39,6 +39,10 @@ class Document:
 		'Get element by name.'
 		return self.getElementsByName(nameKey)
 
+	def getCascadeBoolean(self, defaultBoolean, key):
+		'Get cascade boolean.'
+		return self.xmlElement.getCascadeBoolean(defaultBoolean, key)
+
 	def getCascadeFloat(self, defaultFloat, key):
 		'Get cascade float.'
 		return self.xmlElement.getCascadeFloat(defaultFloat, key)
@@ -107,7 +111,7 @@ class Document:
 		return self.xmlElement
 
 
-globalAccessibleAttributes = 'getByID getByName getCascadeFloat getElementByID getElementsByName getElementsByTag'.split()
+globalAccessibleAttributes = 'getByID getByName getCascadeBoolean getCascadeFloat getElementByID getElementsByName getElementsByTag'.split()
 globalAccessibleAttributes += 'getParent getParentElement getPrevious getPreviousElement getPreviousVertex getRoot'.split()
 globalAccessibleAttributes += 'getRootElement getSelf getSelfElement'.split()
 globalGetAccessibleAttributeSet = set(globalAccessibleAttributes)
@@ -34,6 +34,12 @@ def getCascadeFloatWithoutSelf(defaultFloat, key, xmlElement):
 				xmlElement = xmlElement.parent
 	return xmlElement.getCascadeFloat(defaultFloat, key)
 
+def getExactBoolean(xmlElement):
+	'Get the exact boolean, which selects the sweep clipper instead of the point cloud for boolean solids.'
+	if xmlElement == None:
+		return False
+	return xmlElement.getCascadeBoolean(False, 'exactBoolean')
+
 def getImportRadius(xmlElement):
 	'Get the importRadius.'
 	if xmlElement == None:
@@ -93,6 +99,10 @@ class Setting:
 		'Get the string representation of this Setting.'
 		return self.xmlElement
 
+	def getExactBoolean(self):
+		'Get the exact boolean.'
+		return getExactBoolean(self.xmlElement)
+
 	def getImportRadius(self):
 		'Get the importRadius.'
 		return getImportRadius(self.xmlElement)
@@ -138,7 +148,7 @@ class Setting:
 		return getTwistPrecisionRadians(self.xmlElement)
 
 
-globalAccessibleAttributes = 'getImportRadius getInteriorOverhangAngle getInteriorOverhangRadians'.split()
+globalAccessibleAttributes = 'getExactBoolean getImportRadius getInteriorOverhangAngle getInteriorOverhangRadians'.split()
 globalAccessibleAttributes += 'getLayerThickness getOverhangSpan getOverhangAngle getOverhangRadians'.split()
 globalAccessibleAttributes += 'getPrecision getSheetThickness getTwistPrecision getTwistPrecisionRadians'.split()
 globalGetAccessibleAttributeSet = set(globalAccessibleAttributes)
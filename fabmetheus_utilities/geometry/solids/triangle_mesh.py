@@ -19,7 +19,9 @@ from fabmetheus_utilities.vector3index import Vector3Index
 from fabmetheus_utilities import euclidean
 from fabmetheus_utilities import intercircle
 from fabmetheus_utilities import settings
+from fabmetheus_utilities import worker_pool
 import cmath
+import heapq
 import math
 
 
@@ -29,6 +31,9 @@ __date__ = '$Date: 2008/02/05 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+globalCarvingMesh = None
+
+
 def addEdgePair( edgePairTable, edges, faceEdgeIndex, remainingEdgeIndex, remainingEdgeTable ):
 	'Add edge pair to the edge pair table.'
 	if faceEdgeIndex == remainingEdgeIndex:
@@ -263,10 +268,14 @@ def getBridgeDirection( belowLoops, layerLoops, layerThickness ):
 			if intercircle.isLargeSameDirection( outset, center, overhangInset ):
 				belowOutsetLoops.append( outset )
 	bridgeRotation = complex()
+	outsetLoopGrid = OutsetLoopGrid(belowOutsetLoops, 0.1 * layerThickness, 4.0 * overhangInset)
 	for loop in layerLoops:
 		for pointIndex in xrange(len(loop)):
 			previousIndex = ( pointIndex + len(loop) - 1 ) % len(loop)
-			bridgeRotation += getOverhangDirection( belowOutsetLoops, loop[ previousIndex ], loop[pointIndex] )
+			segmentBegin = loop[previousIndex]
+			segmentEnd = loop[pointIndex]
+			belowLoopIndexes = outsetLoopGrid.getLoopIndexes(segmentBegin, segmentEnd)
+			bridgeRotation += getOverhangDirection( belowOutsetLoops, segmentBegin, segmentEnd, belowLoopIndexes )
 	if abs( bridgeRotation ) < 0.75 * layerThickness:
 		return None
 	else:
@@ -287,6 +296,13 @@ def getBridgeLoops( layerThickness, loop ):
 				extrudateLoops.append( extrudateLoop )
 	return extrudateLoops
 
+def getBridgeLoopsFromLoops(layerThickness, loops):
+	'Get the inset bridge loops from all the loops of a layer.'
+	allExtrudateLoops = []
+	for loop in loops:
+		allExtrudateLoops += getBridgeLoops(layerThickness, loop)
+	return allExtrudateLoops
+
 def getCarveIntersectionFromEdge(edge, vertexes, z):
 	'Get the complex where the carve intersects the edge.'
 	firstVertex = vertexes[ edge.vertexIndexes[0] ]
@@ -297,6 +313,20 @@ def getCarveIntersectionFromEdge(edge, vertexes, z):
 	up = secondVertex.z - firstVertex.z
 	return zMinusFirst * ( secondVertexComplex - firstVertexComplex ) / up + firstVertexComplex
 
+def getCarvingBridgeDirection(layerIndex):
+	'Get the bridge direction of a layer of the carving mesh from its bridge loops and the bridge loops below, in a worker process.'
+	belowLoops = globalCarvingMesh.belowLoops
+	if layerIndex > 0:
+		belowLoops = globalCarvingMesh.bridgeLoopLists[layerIndex - 1]
+	return getBridgeDirection(belowLoops, globalCarvingMesh.bridgeLoopLists[layerIndex], globalCarvingMesh.layerThickness)
+
+def getCarvingLoopsBridgeLoops(z):
+	'Get the loops of the carving mesh at z and their bridge loops, in a worker process.'
+	loops = globalCarvingMesh.getLoopsFromMesh(globalCarvingMesh.zoneArrangement.getEmptyZ(z))
+	if not globalCarvingMesh.infillInDirectionOfBridge:
+		return loops, []
+	return loops, getBridgeLoopsFromLoops(globalCarvingMesh.layerThickness, loops)
+
 def getDescendingAreaLoops(allPoints, corners, importRadius):
 	'Get descending area loops which include most of the points.'
 	loops = intercircle.getCentersFromPoints(allPoints, importRadius)
@@ -413,7 +443,10 @@ def getIsPathEntirelyOutsideTriangle(begin, center, end, vector3Path):
 
 def getLoopsFromCorrectMesh( edges, faces, vertexes, z ):
 	'Get loops from a carve of a correct mesh.'
-	remainingEdgeTable = getRemainingEdgeTable(edges, vertexes, z)
+	return getLoopsFromCorrectRemainingEdgeTable(edges, faces, getRemainingEdgeTable(edges, vertexes, z), vertexes, z)
+
+def getLoopsFromCorrectRemainingEdgeTable(edges, faces, remainingEdgeTable, vertexes, z):
+	'Get loops from a carve of a correct mesh, given the edges which cross the z plane.'
 	remainingValues = remainingEdgeTable.values()
 	for edge in remainingValues:
 		if len( edge.faceIndexes ) < 2:
@@ -448,10 +481,12 @@ def getLoopsFromCorrectMesh( edges, faces, vertexes, z ):
 
 def getLoopsFromUnprovenMesh(edges, faces, importRadius, vertexes, z):
 	'Get loops from a carve of an unproven mesh.'
+	return getLoopsFromUnprovenRemainingEdgeTable(edges, faces, importRadius, getRemainingEdgeTable(edges, vertexes, z), vertexes, z)
+
+def getLoopsFromUnprovenRemainingEdgeTable(edges, faces, importRadius, remainingEdgeTable, vertexes, z):
+	'Get loops from a carve of an unproven mesh, given the edges which cross the z plane.'
 	edgePairTable = {}
 	corners = []
-	remainingEdgeTable = getRemainingEdgeTable(edges, vertexes, z)
-	remainingEdgeTableKeys = remainingEdgeTable.keys()
 	for remainingEdgeIndexKey in remainingEdgeTable:
 		edge = remainingEdgeTable[remainingEdgeIndexKey]
 		carveIntersection = getCarveIntersectionFromEdge(edge, vertexes, z)
@@ -492,8 +527,10 @@ def getOrientedLoops(loops):
 			loop.reverse()
 	return loops
 
-def getOverhangDirection( belowOutsetLoops, segmentBegin, segmentEnd ):
-	'Add to span direction from the endpoint segments which overhang the layer below.'
+def getOverhangDirection( belowOutsetLoops, segmentBegin, segmentEnd, belowLoopIndexes=None ):
+	'Add to span direction from the endpoint segments which overhang the layer below, only checking the below loops of the indexes if there are any.'
+	if belowLoopIndexes == None:
+		belowLoopIndexes = xrange( len( belowOutsetLoops ) )
 	segment = segmentEnd - segmentBegin
 	normalizedSegment = euclidean.getNormalized( complex( segment.real, segment.imag ) )
 	segmentYMirror = complex(normalizedSegment.real, -normalizedSegment.imag)
@@ -503,7 +540,7 @@ def getOverhangDirection( belowOutsetLoops, segmentBegin, segmentEnd ):
 	y = segmentBegin.imag
 	solidXIntersectionList.append( euclidean.XIntersectionIndex( - 1.0, segmentBegin.real ) )
 	solidXIntersectionList.append( euclidean.XIntersectionIndex( - 1.0, segmentEnd.real ) )
-	for belowLoopIndex in xrange( len( belowOutsetLoops ) ):
+	for belowLoopIndex in belowLoopIndexes:
 		belowLoop = belowOutsetLoops[ belowLoopIndex ]
 		rotatedOutset = euclidean.getPointsRoundZAxis( segmentYMirror, belowLoop )
 		euclidean.addXIntersectionIndexesFromLoopY( rotatedOutset, belowLoopIndex, solidXIntersectionList, y )
@@ -654,9 +691,7 @@ def getZAddExtruderPathsBySolidCarving(rotatedLoopLayer, solidCarving, z):
 	nextZ = z + solidCarving.layerThickness
 	if not solidCarving.infillInDirectionOfBridge:
 		return nextZ
-	allExtrudateLoops = []
-	for loop in rotatedLoopLayer.loops:
-		allExtrudateLoops += getBridgeLoops(solidCarving.layerThickness, loop)
+	allExtrudateLoops = getBridgeLoopsFromLoops(solidCarving.layerThickness, rotatedLoopLayer.loops)
 	rotatedLoopLayer.rotation = getBridgeDirection(solidCarving.belowLoops, allExtrudateLoops, solidCarving.layerThickness)
 	solidCarving.belowLoops = allExtrudateLoops
 	return nextZ
@@ -736,17 +771,117 @@ class EdgePair:
 		return self
 
 
+class EdgeSweep:
+	'A z sorted edge interval index, which holds the active edges crossing a rising z plane.'
+	def __init__(self, edges, vertexes):
+		'Set the edge maximum and minimum and sort the edge indexes by minimum z.'
+		self.edges = edges
+		for edge in edges:
+			setEdgeMaximumMinimum(edge, vertexes)
+		self.zMinimumEdgeIndexes = range(len(edges))
+		self.zMinimumEdgeIndexes.sort(key=lambda edgeIndex: edges[edgeIndex].zMinimum)
+		self.reset()
+
+	def __repr__(self):
+		'Get the string representation of this EdgeSweep.'
+		return '%s, %s, %s' % (self.z, len(self.activeEdgeIndexSet), len(self.edges))
+
+	def getRemainingEdgeTable(self, z):
+		'Get the remaining edge hashtable of the edges which cross the z plane.'
+		if self.z != None and z < self.z:
+			self.reset()
+		self.z = z
+		while self.zMinimumIndex < len(self.zMinimumEdgeIndexes):
+			edgeIndex = self.zMinimumEdgeIndexes[self.zMinimumIndex]
+			edge = self.edges[edgeIndex]
+			if edge.zMinimum >= z:
+				break
+			self.activeEdgeIndexSet.add(edgeIndex)
+			heapq.heappush(self.zMaximumHeap, (edge.zMaximum, edgeIndex))
+			self.zMinimumIndex += 1
+		while len(self.zMaximumHeap) > 0 and self.zMaximumHeap[0][0] <= z:
+			self.activeEdgeIndexSet.discard(heapq.heappop(self.zMaximumHeap)[1])
+		remainingEdgeTable = {}
+		for edgeIndex in sorted(self.activeEdgeIndexSet):
+			remainingEdgeTable[edgeIndex] = self.edges[edgeIndex]
+		return remainingEdgeTable
+
+	def reset(self):
+		'Empty the active edges and move the sweep plane below the mesh.'
+		self.activeEdgeIndexSet = set()
+		self.z = None
+		self.zMaximumHeap = []
+		self.zMinimumIndex = 0
+
+
+class OutsetLoopGrid:
+	'A grid of the bounding boxes of the outset loops, so that an overhang query only checks the loops near the segment.'
+	def __init__(self, loops, margin, width):
+		'Add the index of each loop to the grid cells which its bounding box, widened by the margin, covers.'
+		self.cornerMaximums = []
+		self.cornerMinimums = []
+		self.gridDictionary = {}
+		self.width = width
+		marginComplex = complex(margin, margin)
+		for loopIndex, loop in enumerate(loops):
+			cornerMaximum = euclidean.getMaximumByComplexPath(loop) + marginComplex
+			cornerMinimum = euclidean.getMinimumByComplexPath(loop) - marginComplex
+			self.cornerMaximums.append(cornerMaximum)
+			self.cornerMinimums.append(cornerMinimum)
+			xSteps, ySteps = self.getStepRanges(cornerMaximum, cornerMinimum)
+			for xStep in xSteps:
+				for yStep in ySteps:
+					euclidean.addElementToListDictionary(loopIndex, (xStep, yStep), self.gridDictionary)
+
+	def __repr__(self):
+		'Get the string representation of this OutsetLoopGrid.'
+		return '%s, %s, %s' % (self.width, len(self.cornerMaximums), len(self.gridDictionary))
+
+	def getLoopIndexes(self, segmentBegin, segmentEnd):
+		'Get the indexes, in ascending order, of the loops whose bounding boxes intersect the bounding box of the segment.'
+		cornerMaximum = euclidean.getMaximum(segmentBegin, segmentEnd)
+		cornerMinimum = euclidean.getMinimum(segmentBegin, segmentEnd)
+		loopIndexSet = set()
+		xSteps, ySteps = self.getStepRanges(cornerMaximum, cornerMinimum)
+		if len(xSteps) * len(ySteps) > len(self.cornerMaximums):
+			loopIndexSet = xrange(len(self.cornerMaximums))
+		else:
+			for xStep in xSteps:
+				for yStep in ySteps:
+					stepKey = (xStep, yStep)
+					if stepKey in self.gridDictionary:
+						loopIndexSet.update(self.gridDictionary[stepKey])
+		loopIndexes = []
+		for loopIndex in loopIndexSet:
+			loopMaximum = self.cornerMaximums[loopIndex]
+			loopMinimum = self.cornerMinimums[loopIndex]
+			if loopMinimum.real <= cornerMaximum.real and loopMaximum.real >= cornerMinimum.real:
+				if loopMinimum.imag <= cornerMaximum.imag and loopMaximum.imag >= cornerMinimum.imag:
+					loopIndexes.append(loopIndex)
+		loopIndexes.sort()
+		return loopIndexes
+
+	def getStepRanges(self, cornerMaximum, cornerMinimum):
+		'Get the x and y step ranges of the grid cells which the bounding box covers.'
+		xSteps = xrange(int(math.floor(cornerMinimum.real / self.width)), int(math.floor(cornerMaximum.real / self.width)) + 1)
+		ySteps = xrange(int(math.floor(cornerMinimum.imag / self.width)), int(math.floor(cornerMaximum.imag / self.width)) + 1)
+		return xSteps, ySteps
+
+
 class TriangleMesh( group.Group ):
 	'A triangle mesh.'
 	def __init__(self):
 		'Add empty lists.'
 		group.Group.__init__(self)
 		self.belowLoops = []
+		self.bridgeLoopLists = []
+		self.edgeSweep = None
 		self.infillInDirectionOfBridge = False
 		self.edges = []
 		self.faces = []
 		self.importCoarseness = 1.0
 		self.isCorrectMesh = True
+		self.numberOfWorkers = 1
 		self.oldChainTetragrid = None
 		self.rotatedLoopLayers = []
 		self.transformedVertexes = None
@@ -770,15 +905,38 @@ class TriangleMesh( group.Group ):
 		return self.layerThickness
 
 	def getCarveRotatedBoundaryLayers(self):
-		'Get the rotated boundary layers.'
+		'Get the rotated boundary layers, carving the layers in worker processes and then getting the bridge directions from the bridge loops of each layer and the layer below.'
+		global globalCarvingMesh
 		if self.getMinimumZ() == None:
 			return []
 		halfHeight = 0.5 * self.layerThickness
 		self.zoneArrangement = ZoneArrangement(self.layerThickness, self.getTransformedVertexes())
+		self.setEdgesForAllFaces()
+		self.edgeSweep = EdgeSweep(self.edges, self.getTransformedVertexes())
 		layerTop = self.cornerMaximum.z - halfHeight * 0.5
 		z = self.cornerMinimum.z + halfHeight
+		zs = []
 		while z < layerTop:
-			z = self.getZAddExtruderPaths(z)
+			zs.append(z)
+			z += self.layerThickness
+		globalCarvingMesh = self
+		self.bridgeLoopLists = []
+		newRotatedLoopLayers = []
+		for loops, bridgeLoops in worker_pool.getWorkerResults(getCarvingLoopsBridgeLoops, zs, self.numberOfWorkers):
+			settings.printProgress(len(self.rotatedLoopLayers) + len(newRotatedLoopLayers), 'slice')
+			rotatedLoopLayer = euclidean.RotatedLoopLayer(zs[len(newRotatedLoopLayers)])
+			rotatedLoopLayer.loops = loops
+			newRotatedLoopLayers.append(rotatedLoopLayer)
+			self.bridgeLoopLists.append(bridgeLoops)
+		if self.infillInDirectionOfBridge and len(newRotatedLoopLayers) > 0:
+			layerIndexes = range(len(newRotatedLoopLayers))
+			for layerIndex, bridgeDirection in enumerate(worker_pool.getWorkerResults(getCarvingBridgeDirection, layerIndexes, self.numberOfWorkers)):
+				newRotatedLoopLayers[layerIndex].rotation = bridgeDirection
+			self.belowLoops = self.bridgeLoopLists[-1]
+		globalCarvingMesh = None
+		self.bridgeLoopLists = []
+		self.edgeSweep = None
+		self.rotatedLoopLayers += newRotatedLoopLayers
 		return self.rotatedLoopLayers
 
 	def getFabmetheusXML(self):
@@ -801,11 +959,15 @@ class TriangleMesh( group.Group ):
 	def getLoopsFromMesh( self, z ):
 		'Get loops from a carve of a mesh.'
 		originalLoops = []
-		self.setEdgesForAllFaces()
+		if self.edgeSweep == None:
+			self.setEdgesForAllFaces()
+		transformedVertexes = self.getTransformedVertexes()
 		if self.isCorrectMesh:
-			originalLoops = getLoopsFromCorrectMesh( self.edges, self.faces, self.getTransformedVertexes(), z )
+			remainingEdgeTable = self.getRemainingEdgeTable(z)
+			originalLoops = getLoopsFromCorrectRemainingEdgeTable(self.edges, self.faces, remainingEdgeTable, transformedVertexes, z)
 		if len( originalLoops ) < 1:
-			originalLoops = getLoopsFromUnprovenMesh( self.edges, self.faces, self.importRadius, self.getTransformedVertexes(), z )
+			remainingEdgeTable = self.getRemainingEdgeTable(z)
+			originalLoops = getLoopsFromUnprovenRemainingEdgeTable(self.edges, self.faces, self.importRadius, remainingEdgeTable, transformedVertexes, z)
 		loops = euclidean.getSimplifiedLoops(originalLoops, self.importRadius)
 		sortLoopsInOrderOfArea(True, loops)
 		return getOrientedLoops(loops)
@@ -822,6 +984,12 @@ class TriangleMesh( group.Group ):
 			self.cornerMinimum.minimize(point)
 		return self.cornerMinimum.z
 
+	def getRemainingEdgeTable(self, z):
+		'Get the remaining edge hashtable, from the edge sweep if the mesh is being carved.'
+		if self.edgeSweep == None:
+			return getRemainingEdgeTable(self.edges, self.getTransformedVertexes(), z)
+		return self.edgeSweep.getRemainingEdgeTable(z)
+
 	def getTransformedVertexes(self):
 		'Get all transformed vertexes.'
 		if self.xmlElement == None:
@@ -845,13 +1013,6 @@ class TriangleMesh( group.Group ):
 		self.transformedVertexes = None
 		return self.vertexes
 
-	def getZAddExtruderPaths(self, z):
-		'Get next z and add extruder loops.'
-		settings.printProgress(len(self.rotatedLoopLayers), 'slice')
-		rotatedLoopLayer = euclidean.RotatedLoopLayer(z)
-		rotatedLoopLayer.loops = self.getLoopsFromMesh(self.zoneArrangement.getEmptyZ(z))
-		return getZAddExtruderPathsBySolidCarving(rotatedLoopLayer, self, z)
-
 	def liftByMinimumZ(self, minimumZ):
 		'Lift the triangle mesh to the altitude.'
 		altitude = evaluate.getEvaluatedFloat(None, 'altitude', self.xmlElement)
@@ -877,6 +1038,10 @@ class TriangleMesh( group.Group ):
 		'Set the is correct mesh flag.'
 		self.isCorrectMesh = isCorrectMesh
 
+	def setCarveNumberOfWorkers(self, numberOfWorkers):
+		'Set the number of worker processes, zero means one for each cpu.'
+		self.numberOfWorkers = numberOfWorkers
+
 	def setEdgesForAllFaces(self):
 		'Set the face edges of all the faces.'
 		edgeTable = {}
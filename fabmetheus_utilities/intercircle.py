@@ -217,29 +217,18 @@ def getCircleIntersectionsFromCircleNodes(circleNodes):
 	if len( circleNodes ) < 1:
 		return []
 	circleIntersections = []
-	index = 0
-	pixelTable = {}
-	for circleNode in circleNodes:
-		euclidean.addElementToPixelListFromPoint(circleNode, pixelTable, circleNode.dividedPoint)
-	accumulatedCircleNodeTable = {}
-	for circleNodeIndex in xrange(len(circleNodes)):
-		circleNodeBehind = circleNodes[circleNodeIndex]
-		circleNodeIndexMinusOne = circleNodeIndex - 1
-		if circleNodeIndexMinusOne >= 0:
-			circleNodeAdditional = circleNodes[circleNodeIndexMinusOne]
-			euclidean.addElementToPixelListFromPoint(circleNodeAdditional, accumulatedCircleNodeTable, 0.5 * circleNodeAdditional.dividedPoint)
-		withinNodes = circleNodeBehind.getWithinNodes(accumulatedCircleNodeTable)
+	circleNodeGrid = CircleNodeGrid(circleNodes)
+	for circleNodeIndex, circleNodeBehind in enumerate(circleNodes):
+		nearNodes, withinNodes = circleNodeGrid.getNearWithinNodes(circleNodeIndex, circleNodeBehind)
 		for circleNodeAhead in withinNodes:
-			circleIntersectionForward = CircleIntersection(circleNodeAhead, index, circleNodeBehind)
-			if not circleIntersectionForward.isWithinCircles(pixelTable):
+			circleIntersectionForward = CircleIntersection(circleNodeAhead, len(circleIntersections), circleNodeBehind)
+			if not circleIntersectionForward.isWithinNearCircles(nearNodes):
 				circleIntersections.append(circleIntersectionForward)
 				circleNodeBehind.circleIntersections.append(circleIntersectionForward)
-				index += 1
-			circleIntersectionBackward = CircleIntersection(circleNodeBehind, index, circleNodeAhead)
-			if not circleIntersectionBackward.isWithinCircles(pixelTable):
+			circleIntersectionBackward = CircleIntersection(circleNodeBehind, len(circleIntersections), circleNodeAhead)
+			if not circleIntersectionBackward.isWithinNearCircles(nearNodes):
 				circleIntersections.append(circleIntersectionBackward)
 				circleNodeAhead.circleIntersections.append(circleIntersectionBackward)
-				index += 1
 	return circleIntersections
 
 def getCircleIntersectionLoops( circleIntersections ):
@@ -614,11 +603,17 @@ class CircleIntersection:
 		'Get the first circle intersection on the circle node ahead.'
 		circleIntersections = self.circleNodeAhead.circleIntersections
 		circleIntersectionAhead = None
+		aheadMinusBehind = self.aheadMinusBehind
+		demichordReal = self.demichord.real
+		demichordImag = self.demichord.imag
 		largestDot = -912345678.0
 		for circleIntersection in circleIntersections:
 			if not circleIntersection.steppedOn:
-				circleIntersectionRelativeToMidpoint = euclidean.getNormalized(circleIntersection.positionRelativeToBehind + self.aheadMinusBehind)
-				dot = euclidean.getDotProduct(self.demichord, circleIntersectionRelativeToMidpoint)
+				circleIntersectionRelativeToMidpoint = circleIntersection.positionRelativeToBehind + aheadMinusBehind
+				relativeLength = abs(circleIntersectionRelativeToMidpoint)
+				if relativeLength > 0.0:
+					circleIntersectionRelativeToMidpoint /= relativeLength
+				dot = demichordReal * circleIntersectionRelativeToMidpoint.real + demichordImag * circleIntersectionRelativeToMidpoint.imag
 				if dot > largestDot:
 					largestDot = dot
 					circleIntersectionAhead = circleIntersection
@@ -635,13 +630,12 @@ class CircleIntersection:
 			print('If this is a problem, you may as well send a bug report, even though I probably can not fix this particular problem.')
 		return circleIntersectionAhead
 
-	def isWithinCircles(self, pixelTable):
-		'Determine if this circle intersection is within the circle node circles.'
-		absolutePosition = self.getAbsolutePosition()
-		squareValues = euclidean.getSquareValuesFromPoint(pixelTable, absolutePosition)
-		for squareValue in squareValues:
-			if abs(squareValue.dividedPoint - absolutePosition) < 1.0:
-				if squareValue != self.circleNodeAhead and squareValue != self.circleNodeBehind:
+	def isWithinNearCircles(self, nearNodes):
+		'Determine if this circle intersection is within the circles of the near nodes, other than the nodes ahead and behind.'
+		absolutePosition = self.positionRelativeToBehind + self.circleNodeBehind.dividedPoint
+		for nearNode in nearNodes:
+			if abs(nearNode.dividedPoint - absolutePosition) < 1.0:
+				if nearNode != self.circleNodeAhead and nearNode != self.circleNodeBehind:
 					return True
 		return False
 
@@ -659,11 +653,37 @@ class CircleNode:
 #		return '%s, %s, %s' % (self.index, self.dividedPoint, len(self.circleIntersections)) # when debugging bring back index
 		return '%s, %s' % (self.dividedPoint, len(self.circleIntersections))
 
-	def getWithinNodes(self, pixelTable):
-		'Get the nodes this circle node is within.'
+
+class CircleNodeGrid:
+	'A grid of circle nodes, with cells twice the circle radius wide.'
+	def __init__(self, circleNodes):
+		'Initialize.'
+		self.cellTable = {}
+		for circleNodeIndex, circleNode in enumerate(circleNodes):
+			halfPoint = 0.5 * circleNode.dividedPoint
+			euclidean.addElementToPixelList((circleNodeIndex, circleNode), self.cellTable, int(round(halfPoint.real)), int(round(halfPoint.imag)))
+
+	def __repr__(self):
+		'Get the string representation of this CircleNodeGrid.'
+		return str(len(self.cellTable))
+
+	def getNearWithinNodes(self, circleNodeIndex, circleNode):
+		'Get the other nodes whose circles intersect the circle of the node, and those of them which come before the node.'
+		dividedPoint = circleNode.dividedPoint
+		halfPoint = 0.5 * dividedPoint
+		x = int(round(halfPoint.real))
+		y = int(round(halfPoint.imag))
+		nearNodes = []
 		withinNodes = []
-		squareValues = euclidean.getSquareValuesFromPoint(pixelTable, 0.5 * self.dividedPoint)
-		for squareValue in squareValues:
-			if abs(self.dividedPoint - squareValue.dividedPoint) < 2.0:
-				withinNodes.append(squareValue)
-		return withinNodes
+		for xStep in xrange(x - 1, x + 2):
+			for yStep in xrange(y - 1, y + 2):
+				stepKey = (xStep, yStep)
+				if stepKey in self.cellTable:
+					for otherIndex, otherNode in self.cellTable[stepKey]:
+						if abs(dividedPoint - otherNode.dividedPoint) < 2.0:
+							if otherIndex < circleNodeIndex:
+								withinNodes.append(otherNode)
+								nearNodes.append(otherNode)
+							elif otherIndex > circleNodeIndex:
+								nearNodes.append(otherNode)
+		return nearNodes, withinNodes
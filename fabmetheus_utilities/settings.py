@@ -29,6 +29,7 @@ __date__ = "$Date: 2008/23/04 $"
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+globalRepositoryCache = {}
 globalRepositoryDialogListTable = {}
 globalProfileSaveListenerListTable = {}
 globalCloseListTables = [ globalRepositoryDialogListTable, globalProfileSaveListenerListTable ]
@@ -81,6 +82,17 @@ def addListsToRepositoryByFunction(fileNameHelp, getProfileDirectory, repository
 	for setting in repository.preferences:
 		setting.repository = repository
 
+def addRepositoryToCache(profileFileKey, profilePath, repository):
+	"Add the setting values read from the profile to the repository cache."
+	if profileFileKey == None:
+		return
+	settingNames = []
+	settingValues = []
+	for setting in repository.preferences:
+		settingNames.append(setting.name)
+		settingValues.append(getattr(setting, 'value', None))
+	globalRepositoryCache[profilePath] = (profileFileKey, settingNames, settingValues)
+
 def addMenuEntitiesToMenu( menu, menuEntities ):
 	"Add the menu entities to the menu."
 	for menuEntity in menuEntities:
@@ -245,6 +257,14 @@ def getProfileBaseNameSynonym(repository):
 		return repository.baseNameSynonym
 	return os.path.join(repository.getProfileDirectory(), repository.baseNameSynonym)
 
+def getProfileFileKey(profilePath):
+	"Get the modification time and size of the profile file, or None if the file does not exist."
+	try:
+		profileStat = os.stat(profilePath)
+	except OSError:
+		return None
+	return (profileStat.st_mtime, profileStat.st_size)
+
 def getProfilesDirectoryInAboveDirectory(subName=''):
 	"Get the profiles directory path in the above directory."
 	aboveProfilesDirectory = archive.getSkeinforgePath('profiles')
@@ -266,10 +286,19 @@ def getRadioPluginsAddPluginFrame( directoryPath, importantFileNames, names, rep
 
 def getReadRepository(repository):
 	"Read and return settings from a file."
-	text = archive.getFileText(archive.getProfilesPath(getProfileBaseName(repository)), False)
-	if text == '':
-		if repository.baseNameSynonym != None:
-			text = archive.getFileText(archive.getProfilesPath(getProfileBaseNameSynonym(repository)), False)
+	profilePath = archive.getProfilesPath(getProfileBaseName(repository))
+	profileFileKey = getProfileFileKey(profilePath)
+	if setRepositoryToCache(profileFileKey, profilePath, repository):
+		temporaryApplyOverrides(repository)
+		return repository
+	text = archive.getFileText(profilePath, False)
+	if text != '':
+		readSettingsFromText(repository, text)
+		addRepositoryToCache(profileFileKey, profilePath, repository)
+		temporaryApplyOverrides(repository)
+		return repository
+	if repository.baseNameSynonym != None:
+		text = archive.getFileText(archive.getProfilesPath(getProfileBaseNameSynonym(repository)), False)
 	if text == '':
 		print('The default %s will be written in the .skeinforge folder in the home directory.' % repository.title.lower() )
 		text = archive.getFileText(getProfilesDirectoryInAboveDirectory(getProfileBaseName(repository)), False)
@@ -505,6 +534,24 @@ def setRepositoryToLine(lineIndex, lines, shortDictionary):
 			shortDictionary[shortDictionaryKey].setValueToSplitLine(lineIndex, lines, splitLine)
 			return
 
+def setRepositoryToCache(profileFileKey, profilePath, repository):
+	"Set the repository to the cached setting values and return True if the profile is unchanged since it was cached."
+	if profileFileKey == None or profilePath not in globalRepositoryCache:
+		return False
+	cachedFileKey, settingNames, settingValues = globalRepositoryCache[profilePath]
+	if cachedFileKey != profileFileKey or len(settingNames) != len(repository.preferences):
+		return False
+	for settingIndex, setting in enumerate(repository.preferences):
+		if setting.name != settingNames[settingIndex]:
+			return False
+	for settingIndex, setting in enumerate(repository.preferences):
+		if hasattr(setting, 'value'):
+			settingValue = settingValues[settingIndex]
+			if settingValue.__class__ == list:
+				settingValue = settingValue[:]
+			setting.value = settingValue
+	return True
+
 def setSpinColor( setting ):
 	"Set the spin box color to the value, yellow if it is lower than the default and blue if it is higher."
 	if setting.entry == None:
@@ -561,7 +608,7 @@ def temporaryApplyOverrides(repository):
 		settingTable = {}
 		for setting in repository.preferences:
 			settingTable[ setting.name ] = setting
-		for (name, value) in overrides[repository.baseName].items():
+		for (name, value) in globalTemporaryOverrides[repository.baseName].items():
 			if name in settingTable:
 				settingTable[name].setValueToString(value)
 			else:
@@ -579,6 +626,8 @@ def writeValueListToRepositoryWriter( repositoryWriter, setting ):
 def writeSettings(repository):
 	"Write the settings to a file."
 	profilesDirectoryPath = archive.getProfilesPath(getProfileBaseName(repository))
+	if profilesDirectoryPath in globalRepositoryCache:
+		del globalRepositoryCache[profilesDirectoryPath]
 	archive.makeDirectory(os.path.dirname(profilesDirectoryPath))
 	archive.writeFileText(profilesDirectoryPath, getRepositoryText(repository))
 	for setting in repository.preferences:
@@ -0,0 +1,170 @@
+"""
+Slice_binary is a collection of utilities to write and read the binary slice text, which is a compact alternative to the svg text passed from carve, chop or cleave to preface.
+
+The binary slice text starts with a header of tag lines, like the header of a gcode file, so the procedure names can be found the same way.  After the header end line there is a table of the layer offsets followed by the layers, each with its z, rotation and loop point arrays.  Because of the offset table, a layer can be read without reading the layers before it, so the text can also be read from a memory mapped file.
+
+"""
+
+from __future__ import absolute_import
+#Init has to be imported first because it has code to workaround the python bug where relative imports don't work if the module is imported as a main module.
+import __init__
+
+from fabmetheus_utilities import archive
+from fabmetheus_utilities import euclidean
+from fabmetheus_utilities import xml_simple_reader
+import array
+import cStringIO
+import mmap
+import struct
+import sys
+
+
+__author__ = 'Enrique Perez (perez_enrique@yahoo.com)'
+__date__ = '$Date: 2008/02/05 $'
+__license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
+
+
+globalHeaderBeginTag = '(<sliceBinaryHeader>'
+globalHeaderEndLine = '(</sliceBinaryHeader>)'
+globalLayerFormat = '<dBddI'
+globalVersion = '1'
+
+
+def getLayerString(decimalPlacesCarried, rotatedLoopLayer):
+	'Get the binary string of the rotated loop layer.'
+	hasRotation = 0
+	rotation = complex()
+	if rotatedLoopLayer.rotation != None:
+		hasRotation = 1
+		# the rotation goes through str like in the bridgeRotation attribute of the svg text, so both texts give the same gcode
+		rotation = complex(str(rotatedLoopLayer.rotation).replace('(', '').replace(')', ''))
+	z = getRoundedFloat(decimalPlacesCarried, rotatedLoopLayer.z)
+	loopLengths = []
+	pointArray = array.array('d')
+	for loop in rotatedLoopLayer.loops:
+		if len(loop) > 0:
+			loopLengths.append(len(loop))
+			for point in loop:
+				pointArray.append(getRoundedFloat(decimalPlacesCarried, point.real))
+				pointArray.append(getRoundedFloat(decimalPlacesCarried, point.imag))
+	layerHeader = struct.pack(globalLayerFormat, z, hasRotation, rotation.real, rotation.imag, len(loopLengths))
+	return layerHeader + struct.pack('<%sI' % len(loopLengths), *loopLengths) + getPointString(pointArray)
+
+def getPointArray(pointString):
+	'Get the little endian point string as an array of floats.'
+	pointArray = array.array('d')
+	pointArray.fromstring(pointString)
+	if sys.byteorder != 'little':
+		pointArray.byteswap()
+	return pointArray
+
+def getPointString(pointArray):
+	'Get the array of floats as a little endian point string.'
+	if sys.byteorder != 'little':
+		pointArray.byteswap()
+	return pointArray.tostring()
+
+def getRoundedFloat(decimalPlaces, number):
+	'Get number rounded the same way as in the svg text.'
+	return float(euclidean.getRoundedToPlacesString(decimalPlaces, number))
+
+def getSliceBinaryTextFromFile(fileName):
+	'Get the binary slice text of a file memory mapped, so that only the layers which are read are loaded, or None if the file does not hold a binary slice text.'
+	binaryFile = open(fileName, 'rb')
+	if binaryFile.read(len(globalHeaderBeginTag)) != globalHeaderBeginTag:
+		binaryFile.close()
+		return None
+	sliceBinaryText = mmap.mmap(binaryFile.fileno(), 0, access=mmap.ACCESS_READ)
+	binaryFile.close()
+	return sliceBinaryText
+
+def getSliceBinaryText(commentText, decimalPlacesCarried, rotatedLoopLayers, sliceDictionary):
+	'Get the binary slice text, with the points rounded to the decimal places carried like in the svg text.'
+	layerStrings = []
+	for rotatedLoopLayer in rotatedLoopLayers:
+		layerStrings.append(getLayerString(decimalPlacesCarried, rotatedLoopLayer))
+	layerOffsets = []
+	layerOffset = 8 * (len(layerStrings) + 1)
+	for layerString in layerStrings:
+		layerOffsets.append(layerOffset)
+		layerOffset += len(layerString)
+	layerOffsets.append(layerOffset)
+	output = cStringIO.StringIO()
+	output.write('%s %s )\n' % (globalHeaderBeginTag, globalVersion))
+	sliceDictionary['numberOfLayers'] = str(len(rotatedLoopLayers))
+	for key in sorted(sliceDictionary.keys()):
+		output.write('(<%s> %s )\n' % (key, sliceDictionary[key]))
+	output.write(globalHeaderEndLine + '\n')
+	output.write(struct.pack('<%sQ' % len(layerOffsets), *layerOffsets))
+	for layerString in layerStrings:
+		output.write(layerString)
+	output.write(commentText)
+	return output.getvalue()
+
+def isSliceBinaryText(text):
+	'Determine if the text is a binary slice text.'
+	return text[: len(globalHeaderBeginTag)] == globalHeaderBeginTag
+
+
+class SliceBinaryReader:
+	'A class to read the layers of a binary slice text one at a time.'
+	def __init__(self, sliceBinaryText):
+		'Read the header and the layer offsets.'
+		self.sliceBinaryText = sliceBinaryText
+		self.sliceDictionary = {}
+		headerEndIndex = sliceBinaryText.find(globalHeaderEndLine)
+		for line in archive.getTextLines(sliceBinaryText[: headerEndIndex]):
+			splitLine = line.replace('(<', ' ').replace('>', ' ').split()
+			if len(splitLine) > 2:
+				self.sliceDictionary[splitLine[0]] = splitLine[1]
+		self.bodyIndex = headerEndIndex + len(globalHeaderEndLine) + 1
+		self.numberOfLayers = int(self.sliceDictionary['numberOfLayers'])
+		self.layerOffsets = struct.unpack_from('<%sQ' % (self.numberOfLayers + 1), sliceBinaryText, self.bodyIndex)
+
+	def __repr__(self):
+		'Get the string representation of this binary slice reader.'
+		return '%s, %s' % (self.numberOfLayers, self.sliceDictionary)
+
+	def getCommentText(self):
+		'Get the original xml comment text.'
+		return self.sliceBinaryText[self.bodyIndex + self.layerOffsets[-1] :]
+
+	def getRoot(self):
+		'Get an svg root element which only has the original xml comment, if there is one.'
+		root = xml_simple_reader.XMLElement()
+		root.className = 'svg'
+		commentText = self.getCommentText()
+		if commentText != '':
+			commentElement = xml_simple_reader.XMLElement()
+			commentElement.className = 'comment'
+			commentElement.text = commentText
+			commentElement.setParentAddToChildren(root)
+		return root
+
+	def getRotatedLoopLayer(self, layerIndex):
+		'Get the rotated loop layer at the layer index.'
+		byteIndex = self.bodyIndex + self.layerOffsets[layerIndex]
+		z, hasRotation, rotationReal, rotationImag, numberOfLoops = struct.unpack_from(globalLayerFormat, self.sliceBinaryText, byteIndex)
+		rotatedLoopLayer = euclidean.RotatedLoopLayer(z)
+		if hasRotation == 1:
+			rotatedLoopLayer.rotation = complex(rotationReal, rotationImag)
+		byteIndex += struct.calcsize(globalLayerFormat)
+		loopLengths = struct.unpack_from('<%sI' % numberOfLoops, self.sliceBinaryText, byteIndex)
+		byteIndex += 4 * numberOfLoops
+		pointArray = getPointArray(self.sliceBinaryText[byteIndex : byteIndex + 16 * sum(loopLengths)])
+		pointBeginIndex = 0
+		for loopLength in loopLengths:
+			pointEndIndex = pointBeginIndex + loopLength + loopLength
+			loop = []
+			for pointIndex in xrange(pointBeginIndex, pointEndIndex, 2):
+				loop.append(complex(pointArray[pointIndex], pointArray[pointIndex + 1]))
+			rotatedLoopLayer.loops.append(loop)
+			pointBeginIndex = pointEndIndex
+		return rotatedLoopLayer
+
+	def getRotatedLoopLayers(self):
+		'Get all the rotated loop layers.'
+		rotatedLoopLayers = []
+		for layerIndex in xrange(self.numberOfLayers):
+			rotatedLoopLayers.append(self.getRotatedLoopLayer(layerIndex))
+		return rotatedLoopLayers
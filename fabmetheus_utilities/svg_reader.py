@@ -15,7 +15,10 @@ from fabmetheus_utilities import euclidean
 from fabmetheus_utilities import gcodec
 from fabmetheus_utilities import intercircle
 from fabmetheus_utilities import settings
+from fabmetheus_utilities import slice_binary
 from fabmetheus_utilities import svg_writer
+from fabmetheus_utilities import xml_simple_reader
+import itertools
 import math
 import os
 import sys
@@ -871,9 +874,59 @@ class SVGReader:
 			self.z = None
 		return self.rotatedLoopLayers[-1]
 
+	def getRotatedLoopLayersFromSliceBinaryReader(self, sliceBinaryReader):
+		"Get an iterator over the rotated loop layers of a binary slice reader."
+		for layerIndex in xrange(sliceBinaryReader.numberOfLayers):
+			yield sliceBinaryReader.getRotatedLoopLayer(layerIndex)
+
+	def getRotatedLoopLayersFromXMLElements(self, closedXMLElements, firstXMLElements):
+		"Get an iterator over the rotated loop layers of the slice elements, starting with the first xml elements."
+		for gXMLElement in itertools.chain(firstXMLElements, closedXMLElements):
+			if not svg_writer.getIsSliceXMLElement(gXMLElement):
+				continue
+			self.rotatedLoopLayers = self.rotatedLoopLayers[-1 :]
+			numberOfOldLayers = len(self.rotatedLoopLayers)
+			self.processXMLElement(gXMLElement)
+			gXMLElement.removeFromIDNameParent()
+			for rotatedLoopLayer in self.rotatedLoopLayers[numberOfOldLayers :]:
+				if not self.yAxisPointingUpward:
+					self.flipDirectLayer(rotatedLoopLayer)
+				yield rotatedLoopLayer
+
+	def getRotatedLoopLayersIncrementally(self, fileName, svgText):
+		"Read the slice dictionary from the metadata, then get an iterator over the rotated loop layers of a carving, which parses and then drops one slice element at a time."
+		self.fileName = fileName
+		if slice_binary.isSliceBinaryText(svgText):
+			return self.getRotatedLoopLayersFromSliceBinaryReader(self.getSliceBinaryReader(svgText))
+		closedXMLElements = xml_simple_reader.getClosedXMLElementsIncrementally(['g', 'metadata'], fileName, svgText)
+		for closedXMLElement in closedXMLElements:
+			firstXMLElements = []
+			if closedXMLElement.className == 'g':
+				if not svg_writer.getIsSliceXMLElement(closedXMLElement):
+					continue
+				firstXMLElements.append(closedXMLElement)
+			self.root = closedXMLElement.getRoot()
+			sliceDictionary = svg_writer.getSliceDictionary(self.root)
+			if len(firstXMLElements) > 0 or len(sliceDictionary) > 0:
+				self.sliceDictionary = sliceDictionary
+				self.yAxisPointingUpward = euclidean.getBooleanFromDictionary(False, self.sliceDictionary, 'yAxisPointingUpward')
+				return self.getRotatedLoopLayersFromXMLElements(closedXMLElements, firstXMLElements)
+		return self.getRotatedLoopLayersFromXMLElements(closedXMLElements, [])
+
+	def getSliceBinaryReader(self, sliceBinaryText):
+		"Get the binary slice reader and set the root and slice dictionary from it."
+		sliceBinaryReader = slice_binary.SliceBinaryReader(sliceBinaryText)
+		self.root = sliceBinaryReader.getRoot()
+		self.sliceDictionary = sliceBinaryReader.sliceDictionary
+		self.yAxisPointingUpward = True
+		return sliceBinaryReader
+
 	def parseSVG(self, fileName, svgText):
 		"Parse SVG text and store the layers."
 		self.fileName = fileName
+		if slice_binary.isSliceBinaryText(svgText):
+			self.rotatedLoopLayers = self.getSliceBinaryReader(svgText).getRotatedLoopLayers()
+			return
 		xmlParser = XMLSimpleReader(fileName, None, svgText)
 		self.root = xmlParser.getRoot()
 		if self.root == None:
@@ -15,6 +15,7 @@ from fabmetheus_utilities.xml_simple_reader import XMLSimpleReader
 from fabmetheus_utilities import archive
 from fabmetheus_utilities import euclidean
 from fabmetheus_utilities import gcodec
+from fabmetheus_utilities import slice_binary
 from fabmetheus_utilities import xml_simple_reader
 from fabmetheus_utilities import xml_simple_writer
 import cStringIO
@@ -45,6 +46,34 @@ def getCommentElement(xmlElement):
 				return child
 	return None
 
+def getIsSliceXMLElement(xmlElement):
+	'Determine if the xml element is a slice g element, which has an id starting with z:.'
+	if xmlElement.className != 'g' or 'id' not in xmlElement.attributeDictionary:
+		return False
+	return xmlElement.attributeDictionary['id'].strip().startswith('z:')
+
+def getOriginalCommentText(xmlElement):
+	'Get the text of the comment which holds the original xml, without the comments in the original xml.'
+	if xmlElement == None:
+		return ''
+	if xmlElement.className == 'comment':
+		return xmlElement.text
+	xmlElementOutput = cStringIO.StringIO()
+	xmlElement.addXML(0, xmlElementOutput)
+	textLines = archive.getTextLines(xmlElementOutput.getvalue())
+	commentElementOutput = cStringIO.StringIO()
+	isComment = False
+	for textLine in textLines:
+		lineStripped = textLine.strip()
+		if lineStripped[: len('<!--')] == '<!--':
+			isComment = True
+		if not isComment:
+			if len(textLine) > 0:
+				commentElementOutput.write(textLine + '\n')
+		if '-->' in lineStripped:
+			isComment = False
+	return '%s%s-->\n' % (globalOriginalTextString, commentElementOutput.getvalue())
+
 def getSliceDictionary(xmlElement):
 	'Get the metadata slice attribute dictionary.'
 	for metadataElement in xmlElement.getChildrenWithClassName('metadata'):
@@ -58,10 +87,8 @@ def getSliceXMLElements(xmlElement):
 	gXMLElements = xmlElement.getChildrenWithClassNameRecursively('g')
 	sliceXMLElements = []
 	for gXMLElement in gXMLElements:
-		if 'id' in gXMLElement.attributeDictionary:
-			idValue = gXMLElement.attributeDictionary['id'].strip()
-			if idValue.startswith('z:'):
-				sliceXMLElements.append(gXMLElement)
+		if getIsSliceXMLElement(gXMLElement):
+			sliceXMLElements.append(gXMLElement)
 	return sliceXMLElements
 
 def getSVGByLoopLayers(addLayerTemplateToSVG, carving, rotatedLoopLayers):
@@ -77,6 +104,22 @@ def getSVGByLoopLayers(addLayerTemplateToSVG, carving, rotatedLoopLayers):
 		carving.getCarveLayerThickness())
 	return svgWriter.getReplacedSVGTemplate(carving.fileName, 'basic', rotatedLoopLayers, carving.getFabmetheusXML())
 
+def getSVGTextIfSliceBinary(fileName, text):
+	'Get the svg text from the text if it is a binary slice text, otherwise return the text.'
+	if not slice_binary.isSliceBinaryText(text):
+		return text
+	sliceBinaryReader = slice_binary.SliceBinaryReader(text)
+	sliceDictionary = sliceBinaryReader.sliceDictionary
+	svgWriter = SVGWriter(
+		sliceDictionary['addLayerTemplateToSVG'] == 'True',
+		Vector3(float(sliceDictionary['maxX']), float(sliceDictionary['maxY']), float(sliceDictionary['maxZ'])),
+		Vector3(float(sliceDictionary['minX']), float(sliceDictionary['minY']), float(sliceDictionary['minZ'])),
+		int(sliceDictionary['decimalPlacesCarried']),
+		float(sliceDictionary['layerThickness']),
+		euclidean.getFloatDefaultByDictionary(None, sliceDictionary, 'perimeterWidth'))
+	commentElement = getCommentElement(sliceBinaryReader.getRoot())
+	return svgWriter.getReplacedSVGTemplate(fileName, sliceDictionary['procedureName'], sliceBinaryReader.getRotatedLoopLayers(), commentElement)
+
 def getTruncatedRotatedBoundaryLayers(repository, rotatedLoopLayers):
 	'Get the truncated rotated boundary layers.'
 	return rotatedLoopLayers[repository.layersFrom.value : repository.layersTo.value]
@@ -139,21 +182,7 @@ class SVGWriter:
 			return
 		commentElement = xml_simple_reader.XMLElement()
 		commentElement.className = 'comment'
-		xmlElementOutput = cStringIO.StringIO()
-		xmlElement.addXML(0, xmlElementOutput)
-		textLines = archive.getTextLines(xmlElementOutput.getvalue())
-		commentElementOutput = cStringIO.StringIO()
-		isComment = False
-		for textLine in textLines:
-			lineStripped = textLine.strip()
-			if lineStripped[: len('<!--')] == '<!--':
-				isComment = True
-			if not isComment:
-				if len(textLine) > 0:
-					commentElementOutput.write(textLine + '\n')
-			if '-->' in lineStripped:
-				isComment = False
-		commentElement.text = '%s%s-->\n' % (globalOriginalTextString, commentElementOutput.getvalue())
+		commentElement.text = getOriginalCommentText(xmlElement)
 		commentElement.setParentAddToChildren(self.svgElement)
 
 	def addRotatedLoopLayerToOutput(self, layerIndex, rotatedLoopLayer):
@@ -241,6 +270,25 @@ class SVGWriter:
 		'Get the rounded complex string.'
 		return self.getRounded( point.real ) + ' ' + self.getRounded( point.imag )
 
+	def getSliceText(self, fileName, isBinary, procedureName, rotatedLoopLayers, xmlElement=None):
+		'Get the binary slice text if is binary is true, otherwise get the svg text.'
+		if not isBinary:
+			return self.getReplacedSVGTemplate(fileName, procedureName, rotatedLoopLayers, xmlElement)
+		cornerMaximum = self.cornerMaximum
+		cornerMinimum = self.cornerMinimum
+		# the corners are not rounded so that the svg text from getSVGTextIfSliceBinary is the same as the svg text written directly
+		sliceDictionary = {
+			'addLayerTemplateToSVG' : str(self.addLayerTemplateToSVG),
+			'decimalPlacesCarried' : str(self.decimalPlacesCarried),
+			'layerThickness' : self.getRounded(self.layerThickness),
+			'maxX' : repr(cornerMaximum.x), 'maxY' : repr(cornerMaximum.y), 'maxZ' : repr(cornerMaximum.z),
+			'minX' : repr(cornerMinimum.x), 'minY' : repr(cornerMinimum.y), 'minZ' : repr(cornerMinimum.z),
+			'procedureName' : procedureName,
+			'yAxisPointingUpward' : 'true'}
+		if self.perimeterWidth != None:
+			sliceDictionary['perimeterWidth'] = self.getRounded(self.perimeterWidth)
+		return slice_binary.getSliceBinaryText(getOriginalCommentText(xmlElement), self.decimalPlacesCarried, rotatedLoopLayers, sliceDictionary)
+
 	def getSVGStringForLoop( self, loop ):
 		'Get the svg loop string.'
 		if len(loop) < 1:
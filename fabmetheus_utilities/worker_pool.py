@@ -0,0 +1,36 @@
+"""
+Worker_pool is a script to map a function over a list of arguments in a pool of forked worker processes, like carve does with the layers of a triangle mesh and fill does with the carve layers.
+
+The results are handed out in the order of the arguments, so the output is the same for any number of workers.  If the number of workers is less than one, there will be one worker for each cpu.  When there is only one worker, when processes can not be forked, as on Windows, or when the process is itself a daemon worker, as in a batch, the function is called in the calling process.
+
+"""
+
+from __future__ import absolute_import
+#Init has to be imported first because it has code to workaround the python bug where relative imports don't work if the module is imported as a main module.
+import __init__
+
+import multiprocessing
+import os
+
+
+__author__ = 'Enrique Perez (perez_enrique@yahoo.com)'
+__date__ = '$Date: 2008/21/04 $'
+__license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
+
+
+def getWorkerResults(function, arguments, numberOfWorkers):
+	'Get the results of the function for each argument in order, from a pool of forked worker processes if there is more than one worker.'
+	if numberOfWorkers < 1:
+		numberOfWorkers = multiprocessing.cpu_count()
+	numberOfWorkers = min(numberOfWorkers, len(arguments))
+	if numberOfWorkers < 2 or not hasattr(os, 'fork') or multiprocessing.current_process().daemon:
+		for argument in arguments:
+			yield function(argument)
+		return
+	pool = multiprocessing.Pool(numberOfWorkers)
+	try:
+		for result in pool.imap(function, arguments, max(1, len(arguments) / (4 * numberOfWorkers))):
+			yield result
+	finally:
+		pool.terminate()
+		pool.join()
@@ -3,6 +3,8 @@ The xml_simple_reader.py script is an xml parser that can parse a line separated
 
 This xml parser will read a line seperated xml text and produce a tree of the xml with a root element.  Each element can have an attribute table, children, a class name, parent, text and a link to the root element.
 
+To handle a large file one part at a time, getClosedXMLElementsIncrementally returns an iterator over the elements with some class names, for example the metadata and slice g elements of a carving, each handed out as soon as its end tag is parsed.
+
 This example gets an xml tree for the xml file boolean.xml.  This example is run in a terminal in the folder which contains boolean.xml and xml_simple_reader.py.
 
 
@@ -39,6 +41,7 @@ from fabmetheus_utilities import euclidean
 from fabmetheus_utilities import gcodec
 from fabmetheus_utilities import xml_simple_writer
 import cStringIO
+import re
 
 
 __author__ = 'Enrique Perez (perez_enrique@yahoo.com)'
@@ -62,13 +65,24 @@ def addXMLLine(line, xmlLines):
 				return
 	xmlLines.append(line)
 
-def getXMLLines(text):
-	'Get the all the xml lines of a text.'
+def getClosedXMLElementsIncrementally(classNames, fileName, xmlText):
+	'Get an iterator over the elements with the class names, each one handed out as soon as its end tag is parsed.'
+	xmlParser = XMLSimpleReader(fileName, None, '')
+	xmlParser.xmlText = xmlText
+	for xmlParser.lineIndex, line in enumerate(getXMLLineIterator(xmlText)):
+		if xmlParser.root == None:
+			xmlParser.lines.append(line)
+		closedXMLElement = xmlParser.parseLine(line)
+		if closedXMLElement != None:
+			if closedXMLElement.className in classNames:
+				yield closedXMLElement
+
+def getXMLLineIterator(text):
+	'Get an iterator over the xml lines of a text, without building a list of all the xml lines.'
 	accumulatedOutput = None
-	textLines = archive.getTextLines(text)
 	combinedLines = []
 	lastWord = '>'
-	for textLine in textLines:
+	for textLine in archive.getTextLines(text):
 		strippedLine = textLine.strip()
 		firstCharacter = None
 		lastCharacter = None
@@ -89,38 +103,40 @@ def getXMLLines(text):
 					addXMLLine( accumulatedOutput.getvalue(), combinedLines )
 					accumulatedOutput = None
 					lastWord = '>'
-	xmlLines = []
-	for combinedLine in combinedLines:
-		xmlLines += getXMLTagSplitLines(combinedLine)
-	return xmlLines
+		for combinedLine in combinedLines:
+			for xmlLine in getXMLTagSplitLines(combinedLine):
+				yield xmlLine
+		combinedLines = []
+
+def getXMLLines(text):
+	'Get the all the xml lines of a text.'
+	return list(getXMLLineIterator(text))
 
 def getXMLTagSplitLines(combinedLine):
 	'Get the xml lines split at a tag.'
-	characterIndex = 0
-	lastWord = None
 	splitIndexes = []
 	tagEnd = False
-	while characterIndex < len(combinedLine):
+	tagSplitMatch = globalTagSplitPattern.search(combinedLine)
+	while tagSplitMatch != None:
+		characterIndex = tagSplitMatch.start()
 		character = combinedLine[characterIndex]
+		lastWord = None
 		if character == '"' or character == "'":
 			lastWord = character
-		elif combinedLine[characterIndex : characterIndex + len('<!--')] == '<!--':
+		elif combinedLine.startswith('<!--', characterIndex):
 			lastWord = '-->'
-		elif combinedLine[characterIndex : characterIndex + len('<![CDATA[')] == '<![CDATA[':
+		elif combinedLine.startswith('<![CDATA[', characterIndex):
 			lastWord = ']]>'
 		if lastWord != None:
 			characterIndex = combinedLine.find(lastWord, characterIndex + 1)
 			if characterIndex == -1:
 				return [combinedLine]
-			character = None
-			lastWord = None
-		if character == '>':
+		elif character == '>':
 			tagEnd = True
-		elif character == '<':
-			if tagEnd:
-				if combinedLine[characterIndex : characterIndex + 2] != '</':
-					splitIndexes.append(characterIndex)
-		characterIndex += 1
+		elif tagEnd:
+			if not combinedLine.startswith('</', characterIndex):
+				splitIndexes.append(characterIndex)
+		tagSplitMatch = globalTagSplitPattern.search(combinedLine, characterIndex + 1)
 	if len(splitIndexes) < 1:
 		return [combinedLine]
 	xmlTagSplitLines = []
@@ -198,6 +214,14 @@ class XMLElement:
 		for child in self.children:
 			child.getCopy( idSuffix, parent )
 
+	def getCascadeBoolean(self, defaultBoolean, key):
+		'Get the cascade boolean.'
+		if key in self.attributeDictionary:
+			return evaluate.getEvaluatedBoolean(defaultBoolean, key, self)
+		if self.parent == None:
+			return defaultBoolean
+		return self.parent.getCascadeBoolean(defaultBoolean, key)
+
 	def getCascadeFloat(self, defaultFloat, key):
 		'Get the cascade float.'
 		if key in self.attributeDictionary:
@@ -291,25 +315,10 @@ class XMLElement:
 		self.className = lineStripped[1 : lineStripped.replace('/>', ' ').replace('>', ' ').replace('\n', ' ').find(' ')]
 		lastWord = lineStripped[-2 :]
 		lineAfterClassName = lineStripped[2 + len(self.className) : -1]
-		beforeQuote = ''
-		lastQuoteCharacter = None
-		withinQuote = ''
-		for characterIndex in xrange(len(lineAfterClassName)):
-			character = lineAfterClassName[characterIndex]
-			if lastQuoteCharacter == None:
-				if character == '"' or character == "'":
-					lastQuoteCharacter = character
-					character = ''
-			if character == lastQuoteCharacter:
-				self.addAttribute(beforeQuote, withinQuote)
-				beforeQuote = ''
-				lastQuoteCharacter = None
-				withinQuote = ''
-				character = ''
-			if lastQuoteCharacter == None:
-				beforeQuote += character
-			else:
-				withinQuote += character
+		attributeMatch = globalAttributePattern.match(lineAfterClassName)
+		while attributeMatch != None:
+			self.addAttribute(attributeMatch.group(1), attributeMatch.group(3))
+			attributeMatch = globalAttributePattern.match(lineAfterClassName, attributeMatch.end())
 		self.addToIdentifierDictionaryIFIdentifierExists()
 		if lastWord == '/>':
 			return parent
@@ -352,9 +361,10 @@ class XMLElement:
 
 	def getRoot(self):
 		'Get the root element.'
-		if self.parent == None:
-			return self
-		return self.parent.getRoot()
+		root = self
+		while root.parent != None:
+			root = root.parent
+		return root
 
 	def getSubChildWithID( self, idReference ):
 		'Get the child which has the idReference.'
@@ -533,7 +543,7 @@ class XMLSimpleReader:
 		return self.root
 
 	def parseLine(self, line):
-		'Parse an xml line and add it to the xml tree.'
+		'Parse an xml line, add it to the xml tree and return the element closed by the line, if any.'
 		lineStripped = line.strip()
 		if len( lineStripped ) < 1:
 			return
@@ -548,16 +558,22 @@ class XMLSimpleReader:
 				self.numberOfWarnings += 1
 			return
 		xmlElement = XMLElement()
+		oldParent = self.parent
 		self.parent = xmlElement.getParentParseReplacedLine( line, lineStripped, self.parent )
-		if self.root != None:
-			return
-		lowerClassName = xmlElement.className.lower()
-		if lowerClassName == 'comment' or lowerClassName == '!doctype':
-			return
-		self.root = xmlElement
-		self.root.parser = self
-		for line in self.lines[ : self.lineIndex ]:
-			self.beforeRoot += line + '\n'
+		if self.root == None:
+			lowerClassName = xmlElement.className.lower()
+			if lowerClassName != 'comment' and lowerClassName != '!doctype':
+				self.root = xmlElement
+				self.root.parser = self
+				for line in self.lines[ : self.lineIndex ]:
+					self.beforeRoot += line + '\n'
+		if lineStripped.startswith('</'):
+			return oldParent
+		if self.parent == xmlElement or xmlElement.className == 'comment':
+			return None
+		return xmlElement
 
 
+globalAttributePattern = re.compile('([^"\']*)(["\'])(.*?)\\2', re.DOTALL)
 globalGetAccessibleAttributeSet = set('getPaths getPreviousVertex getPreviousXMLElement getVertexes parent'.split())
+globalTagSplitPattern = re.compile('["\'<>]')
@@ -8,6 +8,8 @@ http://fabmetheus.crsndoo.com/wiki/index.php/Skeinforge_Statistic
 ==Operation==
 The default 'Activate Statistic' checkbox is on.  When it is on, the functions described below will work when called from the skeinforge toolchain, when it is off, the functions will not be called from the toolchain.  The functions will still be called, whether or not the 'Activate Statistic' checkbox is on, when statistic is run directly.
 
+The gcode is read a chunk at a time, so a large gcode file does not have to be loaded into memory.
+
 ==Settings==
 ===Extrusion Diameter over Thickness===
 Default is 1.25.
@@ -24,6 +26,11 @@ Default is off.
 
 When the 'Save Statistics' checkbox is on, the statistics will be saved as a .txt file.
 
+===Save Layer Statistics===
+Default is off.
+
+When the 'Save Layer Statistics' checkbox is on, the build time, distance extruded and distance traveled of each layer will be saved as a tab separated _layers.csv file, with one line for each layer.  Each layer starts at its layer comment.  When there are no layer comments, as when the file has been exported with the crafting comments deleted, which is the default, each layer starts at the first extrusion at a new height instead.  The moves before the first layer, like the homing moves, are only in the totals.
+
 ==Gcodes==
 An explanation of the gcodes is at:
 http://reprap.org/bin/view/Main/Arduino_GCode_Interpreter
@@ -66,34 +73,60 @@ __date__ = '$Date: 2008/21/04 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+globalChunkSize = 1048576
+
+
+def getDoubleOrDefault(defaultValue, word):
+	'Get the double value of the word after the first letter, or the default value if the word is not a number.'
+	try:
+		return float(word[1 :])
+	except ValueError:
+		return defaultValue
+
 def getNewRepository():
 	'Get new repository.'
 	return StatisticRepository()
 
-def getWindowAnalyzeFile(fileName):
-	"Write statistics for a gcode file."
-	return getWindowAnalyzeFileGivenText( fileName, archive.getFileText(fileName) )
-
-def getWindowAnalyzeFileGivenText( fileName, gcodeText, repository=None):
-	"Write statistics for a gcode file."
+def getWindowAnalyzeFile(fileName, repository=None):
+	"Write statistics for a gcode file, reading the file a chunk at a time."
+	try:
+		gcodeFile = open(fileName, 'r')
+	except IOError:
+		print('The file ' + fileName + ' does not exist.')
+		return None
+	try:
+		return getWindowAnalyzeFileGivenFile(fileName, gcodeFile, repository)
+	finally:
+		gcodeFile.close()
+
+def getWindowAnalyzeFileGivenFile(fileName, gcodeFile, repository=None):
+	"Write statistics for a gcode file object."
 	print('')
 	print('')
 	print('Statistics are being generated for the file ' + archive.getSummarizedFileName(fileName) )
 	if repository == None:
 		repository = settings.getReadRepository( StatisticRepository() )
 	skein = StatisticSkein()
-	statisticGcode = skein.getCraftedGcode(gcodeText, repository)
+	statisticGcode = skein.getCraftedGcodeFromFile(gcodeFile, repository)
 	if repository.printStatistics.value:
 		print( statisticGcode )
 	if repository.saveStatistics.value:
 		archive.writeFileMessageEnd('.txt', fileName, statisticGcode, 'The statistics file is saved as ')
+	if repository.saveLayerStatistics.value:
+		archive.writeFileMessageEnd('_layers.csv', fileName, skein.getLayerStatisticText(), 'The layer statistics file is saved as ')
+
+def getWindowAnalyzeFileGivenText( fileName, gcodeText, repository=None):
+	"Write statistics for a gcode file."
+	return getWindowAnalyzeFileGivenFile(fileName, cStringIO.StringIO(gcodeText), repository)
 
 def writeOutput( fileName, fileNameSuffix, gcodeText = ''):
 	"Write statistics for a skeinforge gcode file, if 'Write Statistics File for Skeinforge Chain' is selected."
 	repository = settings.getReadRepository( StatisticRepository() )
+	if not repository.activateStatistic.value:
+		return
 	if gcodeText == '':
-		gcodeText = archive.getFileText( fileNameSuffix )
-	if repository.activateStatistic.value:
+		getWindowAnalyzeFile(fileNameSuffix, repository)
+	else:
 		getWindowAnalyzeFileGivenText( fileNameSuffix, gcodeText, repository )
 
 
@@ -114,6 +147,7 @@ class StatisticRepository:
 		self.fileNameInput = settings.FileNameInput().getFromFileName( [ ('Gcode text files', '*.gcode') ], 'Open File to Generate Statistics for', self, '')
 		self.printStatistics = settings.BooleanSetting().getFromValue('Print Statistics', self, True )
 		self.saveStatistics = settings.BooleanSetting().getFromValue('Save Statistics', self, False )
+		self.saveLayerStatistics = settings.BooleanSetting().getFromValue('Save Layer Statistics', self, False )
 		self.executeTitle = 'Generate Statistics'
 
 	def execute(self):
@@ -127,29 +161,51 @@ class StatisticSkein:
 	"A class to get statistics for a gcode skein."
 	def __init__(self):
 		self.extrusionDiameter = None
+		self.layerBeginnings = []
 		self.oldLocation = None
 		self.operatingFeedRatePerSecond = None
 		self.output = cStringIO.StringIO()
 		self.profileName = None
 		self.version = None
+		self.zLayerBeginnings = []
 
 	def addLine(self, line):
 		"Add a line of text and a newline to the output."
 		self.output.write(line + '\n')
 
+	def addLayerBeginning(self, z):
+		"Add the totals at the beginning of a layer."
+		self.layerBeginnings.append((z, self.totalBuildTime, self.totalDistanceExtruded, self.totalDistanceTraveled))
+
 	def addToPath(self, location):
 		"Add a point to travel and maybe extrusion."
 		if self.oldLocation != None:
-			travel = location.distance( self.oldLocation )
-			if self.feedRateMinute > 0.0:
-				self.totalBuildTime += 60.0 * travel / self.feedRateMinute
-			self.totalDistanceTraveled += travel
-			if self.extruderActive:
-				self.totalDistanceExtruded += travel
-				self.cornerMaximum.maximize(location)
-				self.cornerMinimum.minimize(location)
+			self.addTravel(location, self.oldLocation)
 		self.oldLocation = location
 
+	def addTravel(self, location, oldLocation):
+		"Add the travel from the old location to the location, with the arithmetic of Vector3 distance, maximize and minimize inlined."
+		if self.extruderActive and location.z != self.extrusionZ:
+			self.extrusionZ = location.z
+			self.zLayerBeginnings.append((location.z, self.totalBuildTime, self.totalDistanceExtruded, self.totalDistanceTraveled))
+		separationX = location.x - oldLocation.x
+		separationY = location.y - oldLocation.y
+		separationZ = location.z - oldLocation.z
+		travel = math.sqrt(separationX * separationX + separationY * separationY + separationZ * separationZ)
+		if self.feedRateMinute > 0.0:
+			self.totalBuildTime += 60.0 * travel / self.feedRateMinute
+		self.totalDistanceTraveled += travel
+		if self.extruderActive:
+			self.totalDistanceExtruded += travel
+			cornerMaximum = self.cornerMaximum
+			cornerMaximum.x = max(location.x, cornerMaximum.x)
+			cornerMaximum.y = max(location.y, cornerMaximum.y)
+			cornerMaximum.z = max(location.z, cornerMaximum.z)
+			cornerMinimum = self.cornerMinimum
+			cornerMinimum.x = min(location.x, cornerMinimum.x)
+			cornerMinimum.y = min(location.y, cornerMinimum.y)
+			cornerMinimum.z = min(location.z, cornerMinimum.z)
+
 	def extruderSet( self, active ):
 		"Maybe increment the number of times the extruder was toggled."
 		if self.extruderActive != active:
@@ -158,6 +214,10 @@ class StatisticSkein:
 
 	def getCraftedGcode(self, gcodeText, repository):
 		"Parse gcode text and store the statistics."
+		return self.getCraftedGcodeFromFile(cStringIO.StringIO(gcodeText), repository)
+
+	def getCraftedGcodeFromFile(self, gcodeFile, repository):
+		"Parse a gcode file object a chunk at a time and store the statistics."
 		self.absolutePerimeterWidth = 0.4
 		self.characters = 0
 		self.cornerMaximum = Vector3(-987654321.0, -987654321.0, -987654321.0)
@@ -165,6 +225,7 @@ class StatisticSkein:
 		self.extruderActive = False
 		self.extruderSpeed = None
 		self.extruderToggled = 0
+		self.extrusionZ = None
 		self.feedRateMinute = 600.0
 		self.layerThickness = 0.4
 		self.numberOfLines = 0
@@ -173,9 +234,7 @@ class StatisticSkein:
 		self.totalBuildTime = 0.0
 		self.totalDistanceExtruded = 0.0
 		self.totalDistanceTraveled = 0.0
-		lines = archive.getTextLines(gcodeText)
-		for line in lines:
-			self.parseLine(line)
+		self.parseFile(gcodeFile)
 		averageFeedRate = self.totalDistanceTraveled / self.totalBuildTime
 		self.characters += self.numberOfLines
 		kilobytes = round( self.characters / 1024.0 )
@@ -248,12 +307,41 @@ class StatisticSkein:
 		self.addLine(' ')
 		return self.output.getvalue()
 
+	def getLayerStatisticText(self):
+		"Get the tab separated build time, distance extruded and distance traveled of each layer, with the layers starting at the extrusion heights if there are no layer comments."
+		layerBeginnings = self.layerBeginnings
+		if len(layerBeginnings) < 1:
+			layerBeginnings = self.zLayerBeginnings
+		output = cStringIO.StringIO()
+		output.write('Layer\tZ (mm)\tBuild Time (s)\tDistance Extruded (mm)\tDistance Traveled (mm)\n')
+		layerEnds = layerBeginnings[1 :] + [(None, self.totalBuildTime, self.totalDistanceExtruded, self.totalDistanceTraveled)]
+		for layerIndex, layerBeginning in enumerate(layerBeginnings):
+			z, beginBuildTime, beginDistanceExtruded, beginDistanceTraveled = layerBeginning
+			layerEnd = layerEnds[layerIndex]
+			output.write('%s\t%s\t%.3f\t%.3f\t%.3f\n' % (layerIndex, z, layerEnd[1] - beginBuildTime, layerEnd[2] - beginDistanceExtruded, layerEnd[3] - beginDistanceTraveled))
+		return output.getvalue()
+
 	def getLocationSetFeedRateToSplitLine( self, splitLine ):
-		"Get location ans set feed rate to the plsit line."
-		location = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
-		indexOfF = gcodec.getIndexOfStartingWithSecond( "F", splitLine )
-		if indexOfF > 0:
-			self.feedRateMinute = gcodec.getDoubleAfterFirstLetter( splitLine[indexOfF] )
+		"Get the location and set the feed rate from the split line, with one pass over the words."
+		location = Vector3()
+		if self.oldLocation != None:
+			location.setToVector3(self.oldLocation)
+		return self.getLocationSetFeedRateToWords(location, splitLine)
+
+	def getLocationSetFeedRateToWords(self, location, splitLine):
+		"Set the location and the feed rate from the words after the first, using the first occurence of each letter like gcodec."
+		letterWords = {}
+		for wordIndex in xrange(len(splitLine) - 1, 0, -1):
+			word = splitLine[wordIndex]
+			letterWords[word[0]] = word
+		if 'X' in letterWords:
+			location.x = getDoubleOrDefault(location.x, letterWords['X'])
+		if 'Y' in letterWords:
+			location.y = getDoubleOrDefault(location.y, letterWords['Y'])
+		if 'Z' in letterWords:
+			location.z = getDoubleOrDefault(location.z, letterWords['Z'])
+		if 'F' in letterWords:
+			self.feedRateMinute = gcodec.getDoubleAfterFirstLetter(letterWords['F'])
 		return location
 
 	def helicalMove( self, isCounterclockwise, splitLine ):
@@ -302,10 +390,46 @@ class StatisticSkein:
 		location = self.getLocationSetFeedRateToSplitLine(splitLine)
 		self.addToPath( location )
 
+	def parseFile(self, gcodeFile):
+		"Parse the gcode file a chunk at a time, counting the characters and lines like archive.getTextLines."
+		numberOfCharacters = 0
+		numberOfDoubleNewlines = 0
+		numberOfNewlines = 0
+		remainder = ''
+		while True:
+			chunk = gcodeFile.read(globalChunkSize)
+			text = (remainder + chunk).replace('\r', '\n')
+			remainder = ''
+			if chunk != '':
+				# the text is cut after the last newline which is followed by a character, so a run of newlines is never split between chunks
+				endIndex = text.rstrip('\n').rfind('\n') + 1
+				remainder = text[endIndex :]
+				text = text[: endIndex]
+			numberOfCharacters += len(text)
+			numberOfDoubleNewlines += text.count('\n\n')
+			numberOfNewlines += text.count('\n')
+			self.parseLines(text.split('\n'))
+			if chunk == '':
+				break
+		if numberOfCharacters > 0:
+			self.numberOfLines = 1 + numberOfNewlines - numberOfDoubleNewlines
+		self.characters = numberOfCharacters - numberOfNewlines
+
+	def parseLines(self, lines):
+		"Parse the gcode lines, with a fast path for the linear moves without a comment after the first move."
+		hasLocation = self.oldLocation != None
+		for line in lines:
+			if hasLocation and line[: 3] == 'G1 ' and ';' not in line and '(' not in line:
+				oldLocation = self.oldLocation
+				location = self.getLocationSetFeedRateToWords(Vector3(oldLocation.x, oldLocation.y, oldLocation.z), line.split())
+				self.addTravel(location, oldLocation)
+				self.oldLocation = location
+			else:
+				self.parseLine(line)
+				hasLocation = self.oldLocation != None
+
 	def parseLine(self, line):
 		"Parse a gcode line and add it to the statistics."
-		self.characters += len(line)
-		self.numberOfLines += 1
 		splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
 		if len(splitLine) < 1:
 			return
@@ -324,6 +448,8 @@ class StatisticSkein:
 			self.extruderSet( False )
 		elif firstWord == 'M108':
 			self.extruderSpeed = gcodec.getDoubleAfterFirstLetter(splitLine[1])
+		elif firstWord == '(<layer>':
+			self.addLayerBeginning(float(splitLine[1]))
 		elif firstWord == '(<layerThickness>':
 			self.layerThickness = float(splitLine[1])
 			self.extrusionDiameter = self.repository.extrusionDiameterOverThickness.value * self.layerThickness
@@ -50,6 +50,7 @@ from fabmetheus_utilities import archive
 from fabmetheus_utilities import euclidean
 from fabmetheus_utilities import gcodec
 from fabmetheus_utilities import settings
+from fabmetheus_utilities import slice_binary
 from fabmetheus_utilities import svg_writer
 from fabmetheus_utilities import xml_simple_writer
 from skeinforge_application.skeinforge_utilities import skeinforge_craft
@@ -142,7 +143,7 @@ class BottomSkein:
 			perimeterWidth)
 		commentElement = svg_writer.getCommentElement(svgReader.root)
 		procedureNameString = svgReader.sliceDictionary['procedureName'] + ',bottom'
-		return svgWriter.getReplacedSVGTemplate(fileName, procedureNameString, rotatedLoopLayers, commentElement)
+		return svgWriter.getSliceText(fileName, slice_binary.isSliceBinaryText(svgText), procedureNameString, rotatedLoopLayers, commentElement)
 
 
 def main():
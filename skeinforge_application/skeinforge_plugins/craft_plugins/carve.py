@@ -16,6 +16,11 @@ When selected, the layer template will be added to the svg output, which adds ja
 
 When off, no controls will be added, the svg output will only include the fabrication paths.  So 'Add Layer Template to SVG' should be deselected when the svg will be used by other software, like Inkscape.
 
+===Binary Slice Interchange===
+Default is off.
+
+When selected, the slices will be passed on to the next tool in the craft chain as binary slice text instead of svg text, which is smaller and quicker to write and read.  The binary slice text holds the z, rotation and loop points of each layer, rounded the same as in the svg text, so the gcode will be the same.  When the carve tool is run by itself, the output is still written as svg text, so that it can be viewed.
+
 ===Extra Decimal Places===
 Default is two.
 
@@ -58,11 +63,21 @@ When selected, the mesh will be accurately carved, and if a hole is found, carve
 ====Unproven Mesh====
 When selected, carve will use the gap spanning algorithm from the start.  The problem with the gap spanning algothm is that it will span gaps, even if there is not actually a gap in the model.
 
+===Number of Carve Workers===
+Default is one.
+
+Defines the number of worker processes which carve the layers of a triangle mesh at the same time.  After all the layers are carved, the bridge directions, which depend on the layer below, are found by the worker processes in a second pass, so the carving is the same for any number of workers.  If the 'Number of Carve Workers' is zero, there will be one worker for each cpu, and if it is one, the layers will be carved in the carve process itself.  Where processes can not be forked, as on Windows, the layers are always carved in the carve process.
+
 ===Perimeter Width over Thickness===
 Default is 1.8.
 
 Defines the ratio of the extrusion perimeter width to the layer thickness.  The higher the value the more the perimeter will be inset, the default is 1.8.  A ratio of one means the extrusion is a circle, a typical ratio of 1.8 means the extrusion is a wide oval.  These values should be measured from a test extrusion line.
 
+===Slice Cache Maximum Size===
+Default is 100 megabytes.
+
+Carve stores each carving in the cache folder of the .skeinforge folder, addressed by a hash of the input file and the carve settings which change the carving, so that re-crafting a mesh after changing only later settings reuses the carving instead of slicing the mesh again.  When the cached carvings add up to more than the 'Slice Cache Maximum Size', the least recently used carvings are deleted.  If the 'Slice Cache Maximum Size' is zero, carvings will not be cached.  Xml files are not cached, because they can import other files.
+
 ===SVG Viewer===
 Default is webbrowser.
 
@@ -98,6 +113,7 @@ from fabmetheus_utilities import euclidean
 from fabmetheus_utilities import gcodec
 from fabmetheus_utilities import settings
 from fabmetheus_utilities import svg_writer
+from skeinforge_application.skeinforge_utilities import skeinforge_cache
 from skeinforge_application.skeinforge_utilities import skeinforge_polyfile
 from skeinforge_application.skeinforge_utilities import skeinforge_profile
 import math
@@ -111,19 +127,34 @@ __date__ = '$Date: 2008/02/05 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+globalCacheExcludedNames = ['Number of Carve Workers (integer):', 'Slice Cache Maximum Size (megabytes):', 'SVG Viewer:']
+
+
 def getCraftedText( fileName, gcodeText = '', repository=None):
 	"Get carved text."
 	if fileName.endswith('.svg'):
 		gcodeText = archive.getTextIfEmpty(fileName, gcodeText)
 		if gcodec.isProcedureDoneOrFileIsEmpty( gcodeText, 'carve'):
 			return gcodeText
-	carving = svg_writer.getCarving(fileName)
-	if carving == None:
-		return ''
 	if repository == None:
 		repository = CarveRepository()
 		settings.getReadRepository(repository)
-	return CarveSkein().getCarvedSVG( carving, fileName, repository )
+	cacheKey = None
+	maximumSize = 1048576 * repository.sliceCacheMaximumSize.value
+	if maximumSize > 0 and not fileName.endswith('.xml'):
+		cacheKey = skeinforge_cache.getCacheKey(fileName, repository, globalCacheExcludedNames)
+	if cacheKey != None:
+		cachedText = skeinforge_cache.getCachedText(cacheKey, 'carve')
+		if cachedText != None:
+			print('The carving was read from the slice cache.')
+			return cachedText
+	carving = svg_writer.getCarving(fileName)
+	if carving == None:
+		return ''
+	carvedText = CarveSkein().getCarvedSVG( carving, fileName, repository )
+	if cacheKey != None and carvedText != '':
+		skeinforge_cache.writeCachedText(cacheKey, maximumSize, 'carve', carvedText)
+	return carvedText
 
 def getNewRepository():
 	'Get new repository.'
@@ -139,7 +170,7 @@ def writeOutput(fileName, shouldAnalyze=True):
 	if carveGcode == '':
 		return
 	suffixFileName = archive.getFilePathWithUnderscoredBasename(fileName, '_carve.svg')
-	archive.writeFileText(suffixFileName, carveGcode)
+	archive.writeFileText(suffixFileName, svg_writer.getSVGTextIfSliceBinary(fileName, carveGcode))
 	print('The carved file is saved as ' + archive.getSummarizedFileName(suffixFileName))
 	print('It took %s to carve the file.' % euclidean.getDurationString(time.time() - startTime))
 	if shouldAnalyze:
@@ -154,6 +185,7 @@ class CarveRepository:
 		self.fileNameInput = settings.FileNameInput().getFromFileName( fabmetheus_interpret.getTranslatorFileTypeTuples(), 'Open File for Carve', self, '')
 		self.openWikiManualHelpPage = settings.HelpPage().getOpenFromAbsolute('http://fabmetheus.crsndoo.com/wiki/index.php/Skeinforge_Carve')
 		self.addLayerTemplateToSVG = settings.BooleanSetting().getFromValue('Add Layer Template to SVG', self, True)
+		self.binarySliceInterchange = settings.BooleanSetting().getFromValue('Binary Slice Interchange', self, False)
 		self.extraDecimalPlaces = settings.FloatSpin().getFromValue(0.0, 'Extra Decimal Places (float):', self, 3.0, 2.0)
 		self.importCoarseness = settings.FloatSpin().getFromValue( 0.5, 'Import Coarseness (ratio):', self, 2.0, 1.0 )
 		self.infillInDirectionOfBridge = settings.BooleanSetting().getFromValue('Infill in Direction of Bridge', self, True )
@@ -167,7 +199,9 @@ class CarveRepository:
 		importLatentStringVar = settings.LatentStringVar()
 		self.correctMesh = settings.Radio().getFromRadio( importLatentStringVar, 'Correct Mesh', self, True )
 		self.unprovenMesh = settings.Radio().getFromRadio( importLatentStringVar, 'Unproven Mesh', self, False )
+		self.numberOfCarveWorkers = settings.IntSpin().getFromValue(0, 'Number of Carve Workers (integer):', self, 16, 1)
 		self.perimeterWidthOverThickness = settings.FloatSpin().getFromValue( 1.4, 'Perimeter Width over Thickness (ratio):', self, 2.2, 1.8 )
+		self.sliceCacheMaximumSize = settings.IntSpin().getFromValue(0, 'Slice Cache Maximum Size (megabytes):', self, 1000, 100)
 		self.svgViewer = settings.StringSetting().getFromValue('SVG Viewer:', self, 'webbrowser')
 		settings.LabelSeparator().getFromRepository(self)
 		self.executeTitle = 'Carve'
@@ -190,6 +224,7 @@ class CarveSkein:
 		importRadius = 0.5 * repository.importCoarseness.value * abs(perimeterWidth)
 		carving.setCarveImportRadius(max(importRadius, 0.01 * layerThickness))
 		carving.setCarveIsCorrectMesh(repository.correctMesh.value)
+		carving.setCarveNumberOfWorkers(repository.numberOfCarveWorkers.value)
 		rotatedLoopLayers = carving.getCarveRotatedBoundaryLayers()
 		if len(rotatedLoopLayers) < 1:
 			print('Warning, there are no slices for the model, this could be because the model is too small for the Layer Thickness.')
@@ -205,8 +240,8 @@ class CarveSkein:
 			carving.getCarveLayerThickness(),
 			perimeterWidth)
 		truncatedRotatedBoundaryLayers = svg_writer.getTruncatedRotatedBoundaryLayers(repository, rotatedLoopLayers)
-		return svgWriter.getReplacedSVGTemplate(
-			fileName, 'carve', truncatedRotatedBoundaryLayers, carving.getFabmetheusXML())
+		return svgWriter.getSliceText(
+			fileName, repository.binarySliceInterchange.value, 'carve', truncatedRotatedBoundaryLayers, carving.getFabmetheusXML())
 
 
 def main():
@@ -190,11 +190,11 @@ class ChamberSkein:
 	def getCraftedGcode(self, gcodeText, repository):
 		"Parse gcode text and store the chamber gcode."
 		self.repository = repository
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.parseInitialization()
 		for line in self.lines[self.lineIndex :]:
 			self.parseLine(line)
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def parseInitialization(self):
 		'Parse gcode initialization and store the parameters.'
@@ -10,6 +10,11 @@ When selected, the layer template will be added to the svg output, which adds ja
 
 When off, no controls will be added, the svg output will only include the fabrication paths.  So 'Add Layer Template to SVG' should be deselected when the svg will be used by other software, like Inkscape.
 
+===Binary Slice Interchange===
+Default is off.
+
+When selected, the slices will be passed on to the next tool in the craft chain as binary slice text instead of svg text, which is smaller and quicker to write and read.  The binary slice text holds the z, rotation and loop points of each layer, rounded the same as in the svg text, so the gcode will be the same.  When the cleave tool is run by itself, the output is still written as svg text, so that it can be viewed.
+
 ===Extra Decimal Places===
 Default is two.
 
@@ -131,7 +136,7 @@ def writeOutput(fileName, shouldAnalyze=True):
 	suffixDirectoryName = os.path.dirname(suffixFileName)
 	suffixReplacedBaseName = os.path.basename(suffixFileName).replace(' ', '_')
 	suffixFileName = os.path.join( suffixDirectoryName, suffixReplacedBaseName )
-	archive.writeFileText( suffixFileName, cleaveGcode )
+	archive.writeFileText(suffixFileName, svg_writer.getSVGTextIfSliceBinary(fileName, cleaveGcode))
 	print('The cleaved file is saved as ' + archive.getSummarizedFileName(suffixFileName) )
 	print('It took %s to cleave the file.' % euclidean.getDurationString( time.time() - startTime ) )
 	if shouldAnalyze:
@@ -145,6 +150,7 @@ class CleaveRepository:
 		skeinforge_profile.addListsToCraftTypeRepository('skeinforge_application.skeinforge_plugins.craft_plugins.cleave.html', self )
 		self.fileNameInput = settings.FileNameInput().getFromFileName( fabmetheus_interpret.getTranslatorFileTypeTuples(), 'Open File to be Cleaved', self, '')
 		self.addLayerTemplateToSVG = settings.BooleanSetting().getFromValue('Add Layer Template to SVG', self, True)
+		self.binarySliceInterchange = settings.BooleanSetting().getFromValue('Binary Slice Interchange', self, False)
 		self.extraDecimalPlaces = settings.FloatSpin().getFromValue(0.0, 'Extra Decimal Places (float):', self, 3.0, 2.0)
 		self.importCoarseness = settings.FloatSpin().getFromValue( 0.5, 'Import Coarseness (ratio):', self, 2.0, 1.0 )
 		self.layerThickness = settings.FloatSpin().getFromValue( 0.1, 'Layer Thickness (mm):', self, 1.0, 0.4 )
@@ -190,7 +196,7 @@ class CleaveSkein:
 			carving.getCarveLayerThickness(),
 			perimeterWidth)
 		truncatedRotatedBoundaryLayers = svg_writer.getTruncatedRotatedBoundaryLayers(repository, rotatedLoopLayers)
-		return svgWriter.getReplacedSVGTemplate( fileName, 'cleave', truncatedRotatedBoundaryLayers, carving.getFabmetheusXML())
+		return svgWriter.getSliceText(fileName, repository.binarySliceInterchange.value, 'cleave', truncatedRotatedBoundaryLayers, carving.getFabmetheusXML())
 
 
 def main():
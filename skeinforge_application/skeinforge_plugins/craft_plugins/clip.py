@@ -199,12 +199,12 @@ class ClipSkein:
 
 	def getCraftedGcode( self, clipRepository, gcodeText ):
 		"Parse gcode text and store the clip gcode."
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.parseInitialization( clipRepository )
 		for self.lineIndex in xrange( self.lineIndex, len(self.lines) ):
 			line = self.lines[self.lineIndex]
 			self.parseLine(line)
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def getNextThreadIsACloseLoop( self, path ):
 		"Determine if the next thread is a loop."
@@ -176,13 +176,13 @@ class CoilSkein:
 	def getCraftedGcode(self, gcodeText, repository):
 		"Parse gcode text and store the coil gcode."
 		self.repository = repository
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.parseInitialization()
 		self.parseBoundaries()
 		self.parseUntilLayer()
 		self.addCoilLayers()
 		self.distanceFeedRate.addLines( self.shutdownLines )
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def parseBoundaries(self):
 		"Parse the boundaries and add them to the boundary layers."
@@ -203,7 +203,7 @@ class CombSkein:
 	def getCraftedGcode( self, combRepository, gcodeText ):
 		"Parse gcode text and store the comb gcode."
 		self.combRepository = combRepository
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.parseInitialization( combRepository )
 		for lineIndex in xrange( self.lineIndex, len(self.lines) ):
 			line = self.lines[lineIndex]
@@ -211,7 +211,7 @@ class CombSkein:
 		for lineIndex in xrange( self.lineIndex, len(self.lines) ):
 			line = self.lines[lineIndex]
 			self.parseLine(line)
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def getIsAsFarAndNotIntersecting( self, begin, end ):
 		"Determine if the point on the line is at least as far from the loop as the center point."
@@ -287,7 +287,7 @@ class CombSkein:
 			boundary = boundaries[ boundaryIndex ]
 			boundaryRotated = euclidean.getPointsRoundZAxis(segmentYMirror, boundary)
 			euclidean.addXIntersectionIndexesFromLoopY(boundaryRotated, boundaryIndex, switchX, y)
-		switchX.sort()
+		switchX.sort(key=euclidean.getXOfXIntersectionIndex)
 		maximumX = max(beginRotated.real, endRotated.real)
 		minimumX = min(beginRotated.real, endRotated.real)
 		for xIntersection in switchX:
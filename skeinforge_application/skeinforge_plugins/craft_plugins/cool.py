@@ -179,6 +179,7 @@ class CoolSkein:
 		self.oldFlowRateString = None
 		self.oldLocation = None
 		self.oldTemperature = None
+		self.threadIndex = None
 
 	def addCoolOrbits(self, remainingOrbitTime):
 		'Add the minimum radius cool orbits.'
@@ -254,7 +255,8 @@ class CoolSkein:
 		self.coolEndLines = settings.getLinesInAlterationsOrGivenDirectory(repository.nameOfCoolEndFile.value)
 		self.coolStartLines = settings.getLinesInAlterationsOrGivenDirectory(repository.nameOfCoolStartFile.value)
 		self.halfCorner = complex(repository.minimumOrbitalRadius.value, repository.minimumOrbitalRadius.value)
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
+		self.threadIndex = gcodec.ThreadIndex(self.lines, self.feedRateMinute)
 		self.minimumArea = 4.0 * repository.minimumOrbitalRadius.value * repository.minimumOrbitalRadius.value
 		self.parseInitialization()
 		self.boundingRectangle = gcodec.BoundingRectangle().getFromGcodeLines(
@@ -268,29 +270,16 @@ class CoolSkein:
 			self.parseLine(line)
 		if repository.turnFanOffAtEnding.value:
 			self.distanceFeedRate.addLine('M107')
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def getLayerTime(self):
 		'Get the time the extruder spends on the layer.'
-		feedRateMinute = self.feedRateMinute
-		layerTime = 0.0
-		lastThreadLocation = self.oldLocation
-		for lineIndex in xrange(self.lineIndex, len(self.lines)):
-			line = self.lines[lineIndex]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'G1':
-				location = gcodec.getLocationFromSplitLine(lastThreadLocation, splitLine)
-				feedRateMinute = gcodec.getFeedRateMinute(feedRateMinute, splitLine)
-				if lastThreadLocation != None:
-					feedRateSecond = feedRateMinute / 60.0
-					layerTime += location.distance(lastThreadLocation) / feedRateSecond
-				lastThreadLocation = location
-			elif firstWord == '(<bridgeRotation>':
-				self.isBridgeLayer = True
-			elif firstWord == '(</layer>)':
-				return layerTime
-		return layerTime
+		layerEndIndex = self.threadIndex.getNextIndex('(</layer>)', self.lineIndex - 1)
+		if layerEndIndex == None:
+			layerEndIndex = len(self.lines)
+		if self.threadIndex.isFirstWordBetween('(<bridgeRotation>', self.lineIndex - 1, layerEndIndex):
+			self.isBridgeLayer = True
+		return self.threadIndex.getPathTime(self.lineIndex - 1, min(layerEndIndex, len(self.lines) - 1))
 
 	def parseInitialization(self):
 		'Parse gcode initialization and store the parameters.'
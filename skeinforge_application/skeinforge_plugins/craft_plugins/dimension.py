@@ -169,7 +169,7 @@ class DimensionSkein:
 		self.repository = repository
 		filamentRadius = 0.5 * repository.filamentDiameter.value
 		filamentPackingArea = math.pi * filamentRadius * filamentRadius * repository.filamentPackingDensity.value
- 		self.lines = archive.getTextLines(gcodeText)
+ 		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.parseInitialization()
 		self.flowScaleSixty = 60.0 * self.layerThickness * self.perimeterWidth / filamentPackingArea
 		if self.operatingFlowRate == None:
@@ -179,7 +179,7 @@ class DimensionSkein:
 		self.extruderRetractionSpeedMinuteString = self.distanceFeedRate.getRounded( 60.0 * self.repository.extruderRetractionSpeed.value )
 		for lineIndex in xrange( self.lineIndex, len(self.lines) ):
 			self.parseLine( lineIndex )
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def getDimensionedArcMovement(self, line, splitLine):
 		"Get a dimensioned arc movement."
@@ -159,14 +159,14 @@ class DrillSkein:
 
 	def getCraftedGcode(self, gcodeText, repository):
 		"Parse gcode text and store the drill gcode."
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.repository = repository
 		self.parseInitialization()
 		for line in self.lines[self.lineIndex :]:
 			self.parseSurroundingLoop(line)
 		for line in self.lines[self.lineIndex :]:
 			self.parseLine(line)
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def getDrillingCenterDepth( self, drillingCenterDepth, drillPoint ):
 		"Get the drilling center depth."
@@ -122,12 +122,16 @@ def getReplaceableExportGcode(nameOfReplaceFile, replaceableExportGcode):
 	replaceLines = settings.getLinesInAlterationsOrGivenDirectory(nameOfReplaceFile)
 	if len(replaceLines) < 1:
 		return replaceableExportGcode
+	return getReplacedText(replaceLines, replaceableExportGcode)
+
+def getReplacedText(replaceLines, text):
+	'Get text with strings replaced according to the tab separated replace lines, without the empty lines.'
 	for replaceLine in replaceLines:
 		splitLine = replaceLine.replace('\\n', '\t').split('\t')
 		if len(splitLine) > 0:
-			replaceableExportGcode = replaceableExportGcode.replace(splitLine[0], '\n'.join(splitLine[1 :]))
+			text = text.replace(splitLine[0], '\n'.join(splitLine[1 :]))
 	output = cStringIO.StringIO()
-	gcodec.addLinesToCString(output, archive.getTextLines(replaceableExportGcode))
+	gcodec.addLinesToCString(output, archive.getTextLines(text))
 	return output.getvalue()
 
 def getSelectedPluginModule( plugins ):
@@ -147,6 +151,23 @@ def sendOutputTo(text, toValue):
 		return
 	archive.writeFileText(toValue, text)
 
+def writeCraftedFileFromText(fileName, gcodeText, repository):
+	'Export a gcode linear move text, writing each exported line to the file as it is made instead of building the whole export text.'
+	try:
+		exportFile = open(fileName, 'w+')
+	except IOError:
+		print('The file ' + fileName + ' can not be written to.')
+		return False
+	replaceOutput = ReplaceOutput(exportFile, settings.getLinesInAlterationsOrGivenDirectory(repository.nameOfReplaceFile.value))
+	try:
+		if gcodec.isProcedureDoneOrFileIsEmpty(gcodeText, 'export') or not repository.activateExport.value:
+			replaceOutput.write(gcodeText)
+		else:
+			ExportSkein().writeCraftedGcode(replaceOutput, repository, gcodeText)
+	finally:
+		exportFile.close()
+	return True
+
 def writeOutput(fileName, shouldAnalyze=True):
 	'Export a gcode linear move file.'
 	if fileName == '':
@@ -168,12 +189,23 @@ def writeOutput(fileName, shouldAnalyze=True):
 		penultimateFileName = fileName[: fileName.rfind('.')] + '_penultimate.gcode'
 		archive.writeFileText(penultimateFileName, gcodeText)
 		print('The penultimate file is saved as ' + archive.getSummarizedFileName(penultimateFileName))
+	selectedPluginModule = getSelectedPluginModule(repository.exportPlugins)
+	if selectedPluginModule == None and repository.alsoSendOutputTo.value == '':
+		isWritten = writeCraftedFileFromText(fileNameSuffix, gcodeText, repository)
+		if isWritten:
+			skeinforge_craft.addWrittenFileName(fileNameSuffix)
+		window = None
+		if shouldAnalyze:
+			window = skeinforge_analyze.writeOutput(fileName, fileNameSuffix, gcodeText)
+		if isWritten:
+			print('The exported file is saved as ' + archive.getSummarizedFileName(fileNameSuffix))
+		print('It took %s to export the file.' % euclidean.getDurationString(time.time() - startTime))
+		return window
 	exportGcode = getCraftedTextFromText(gcodeText, repository)
 	window = None
 	if shouldAnalyze:
 		window = skeinforge_analyze.writeOutput(fileName, fileNameSuffix, gcodeText)
 	replaceableExportGcode = None
-	selectedPluginModule = getSelectedPluginModule(repository.exportPlugins)
 	if selectedPluginModule == None:
 		replaceableExportGcode = exportGcode
 	else:
@@ -181,9 +213,11 @@ def writeOutput(fileName, shouldAnalyze=True):
 			replaceableExportGcode = selectedPluginModule.getOutput(exportGcode)
 		else:
 			selectedPluginModule.writeOutput(fileNameSuffix, exportGcode)
+			skeinforge_craft.addWrittenFileName(fileNameSuffix)
 	if replaceableExportGcode != None:
 		replaceableExportGcode = getReplaceableExportGcode(repository.nameOfReplaceFile.value, replaceableExportGcode)
 		archive.writeFileText( fileNameSuffix, replaceableExportGcode )
+		skeinforge_craft.addWrittenFileName(fileNameSuffix)
 		print('The exported file is saved as ' + archive.getSummarizedFileName(fileNameSuffix))
 	if repository.alsoSendOutputTo.value != '':
 		if replaceableExportGcode == None:
@@ -253,10 +287,7 @@ class ExportSkein:
 
 	def getCraftedGcode( self, repository, gcodeText ):
 		'Parse gcode text and store the export gcode.'
-		self.repository = repository
-		lines = archive.getTextLines(gcodeText)
-		for line in lines:
-			self.parseLine(line)
+		self.writeCraftedGcode(self.output, repository, gcodeText)
 		return self.output.getvalue()
 
 	def getLineWithTruncatedNumber(self, character, line, splitLine):
@@ -295,6 +326,28 @@ class ExportSkein:
 		line = self.getLineWithTruncatedNumber('R', line, splitLine)
 		self.addLine(line)
 
+	def writeCraftedGcode(self, output, repository, gcodeText):
+		'Parse gcode text and write the export gcode to the output, which can be a file.'
+		self.output = output
+		self.repository = repository
+		for line in archive.getTextLinesWithoutEmpty(gcodeText):
+			self.parseLine(line)
+
+
+class ReplaceOutput:
+	'A class to replace strings in the text according to the replace lines, then write it to an output.'
+	def __init__(self, output, replaceLines):
+		'Initialize.'
+		self.output = output
+		self.replaceLines = replaceLines
+
+	def write(self, text):
+		'Write the replaced text to the output.'
+		if len(self.replaceLines) < 1:
+			self.output.write(text)
+		else:
+			self.output.write(getReplacedText(self.replaceLines, text))
+
 
 def main():
 	'Display the export dialog.'
@@ -118,11 +118,11 @@ class FeedSkein:
 		self.repository = repository
 		self.feedRatePerSecond = repository.feedRatePerSecond.value
 		self.travelFeedRateMinute = 60.0 * self.repository.travelFeedRatePerSecond.value
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.parseInitialization()
 		for line in self.lines[self.lineIndex :]:
 			self.parseLine(line)
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def getFeededLine(self, line, splitLine):
 		"Get gcode line with feed rate."
@@ -118,6 +118,11 @@ Default is 1.5.
 
 Defines the ratio of the infill width over the layer thickness.  The higher the value the wider apart the infill will be and therefore the sparser the infill will be.
 
+===Number of Fill Workers===
+Default is one.
+
+Defines the number of worker processes which fill the layers at the same time.  The threads are added in layer order, so the output is the same for any number of workers.  If the 'Number of Fill Workers' is zero, there will be one worker for each cpu, and if it is one, the layers will be filled in the fill process itself.  Where processes can not be forked, as on Windows, the layers are always filled in the fill process.
+
 ===Solid Surface Thickness===
 Default is three.
 
@@ -179,6 +184,7 @@ from fabmetheus_utilities import euclidean
 from fabmetheus_utilities import gcodec
 from fabmetheus_utilities import intercircle
 from fabmetheus_utilities import settings
+from fabmetheus_utilities import worker_pool
 from skeinforge_application.skeinforge_utilities import skeinforge_craft
 from skeinforge_application.skeinforge_utilities import skeinforge_polyfile
 from skeinforge_application.skeinforge_utilities import skeinforge_profile
@@ -191,6 +197,8 @@ __date__ = '$Date: 2008/28/04 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+globalFillSkein = None
+
 
 def addAroundGridPoint( arounds, gridPoint, gridPointInsetX, gridPointInsetY, gridPoints, gridSearchRadius, isBothOrNone, isDoubleJunction, isJunctionWide, paths, pixelTable, width ):
 	'Add the path around the grid point.'
@@ -429,6 +437,11 @@ def getExtraFillLoops(loops, radius):
 				extraFillLoops.append(inset)
 	return extraFillLoops
 
+def getFilledNestedRingsByWorker(layerIndexExtraShells):
+	'Get the filled nested rings of a layer of the global fill skein, in a worker process.'
+	layerIndex, extraShells = layerIndexExtraShells
+	return globalFillSkein.getFilledNestedRings(layerIndex, extraShells)
+
 def getKeyIsInPixelTableAddValue( key, pathIndexTable, pixelTable ):
 	'Determine if the key is in the pixel table, and if it is and if the value is not None add it to the path index table.'
 	if key in pixelTable:
@@ -810,6 +823,7 @@ class FillRepository:
 		self.infillSolidity = settings.FloatSpin().getFromValue( 0.04, 'Infill Solidity (ratio):', self, 0.3, 0.2 )
 		self.infillWidthOverThickness = settings.FloatSpin().getFromValue( 1.3, 'Infill Width over Thickness (ratio):', self, 1.7, 1.5 )
 		settings.LabelSeparator().getFromRepository(self)
+		self.numberOfFillWorkers = settings.IntSpin().getFromValue(0, 'Number of Fill Workers (integer):', self, 16, 1)
 		self.solidSurfaceThickness = settings.IntSpin().getFromValue( 0, 'Solid Surface Thickness (layers):', self, 5, 3 )
 		self.startFromChoice = settings.MenuButtonDisplay().getFromName('Start From Choice:', self)
 		self.startFromLowerLeft = settings.MenuRadio().getFromMenuButtonDisplay(self.startFromChoice, 'Lower Left', self, True)
@@ -849,11 +863,24 @@ class FillSkein:
 		self.nestedRing = None
 		self.thread = None
 
-	def addFill(self, layerIndex):
-		'Add fill to the carve layer.'
-#		if layerIndex > 2:
-#			return
-		settings.printProgressByNumber(layerIndex, len(self.rotatedLayers), 'fill')
+	def addFills(self):
+		'Fill the carve layers, in worker processes if there is more than one worker, and add them in layer order.'
+		global globalFillSkein
+		layerIndexExtraShellsList = []
+		for layerIndex in xrange(len(self.rotatedLayers)):
+			self.lastExtraShells = self.getExtraShells(layerIndex, self.lastExtraShells)
+			layerIndexExtraShellsList.append((layerIndex, self.lastExtraShells))
+		globalFillSkein = self
+		try:
+			filledNestedRingsIterator = worker_pool.getWorkerResults(getFilledNestedRingsByWorker, layerIndexExtraShellsList, self.repository.numberOfFillWorkers.value)
+			for layerIndex, filledNestedRings in enumerate(filledNestedRingsIterator):
+				settings.printProgressByNumber(layerIndex, len(self.rotatedLayers), 'fill')
+				self.addThreadsBridgeLayer(layerIndex, filledNestedRings)
+		finally:
+			globalFillSkein = None
+
+	def getFilledNestedRings(self, layerIndex, extraShells):
+		'Get the ordered nested rings of the carve layer with their extra loops and infill paths.'
 		alreadyFilledArounds = []
 		pixelTable = {}
 		arounds = []
@@ -861,29 +888,17 @@ class FillSkein:
 		self.layerExtrusionWidth = self.infillWidth
 		layerFillInset = self.fillInset
 		rotatedLayer = self.rotatedLayers[layerIndex]
-		self.distanceFeedRate.addLine('(<layer> %s )' % rotatedLayer.z)
 		layerRotation = self.getLayerRotation(layerIndex)
 		reverseRotation = complex(layerRotation.real, - layerRotation.imag)
 		surroundingCarves = []
-		layerRemainder = layerIndex % int(round(self.repository.diaphragmPeriod.value))
-		if layerRemainder >= int(round(self.repository.diaphragmThickness.value)) and rotatedLayer.rotation == None:
-			for surroundingIndex in xrange(1, self.solidSurfaceThickness + 1):
-				self.addRotatedCarve(layerIndex, -surroundingIndex, reverseRotation, surroundingCarves)
-				self.addRotatedCarve(layerIndex, surroundingIndex, reverseRotation, surroundingCarves)
-		extraShells = self.repository.extraShellsSparseLayer.value
-		if len(surroundingCarves) < self.doubleSolidSurfaceThickness:
-			extraShells = self.repository.extraShellsAlternatingSolidLayer.value
-			if self.lastExtraShells != self.repository.extraShellsBase.value:
-				extraShells = self.repository.extraShellsBase.value
+		for layerDelta in self.getSurroundingLayerDeltas(layerIndex):
+			self.addRotatedCarve(layerIndex, layerDelta, reverseRotation, surroundingCarves)
 		if rotatedLayer.rotation != None:
-			extraShells = 0
 			betweenWidth *= self.bridgeWidthMultiplier
 			self.layerExtrusionWidth *= self.bridgeWidthMultiplier
 			layerFillInset *= self.bridgeWidthMultiplier
-			self.distanceFeedRate.addLine('(<bridgeRotation> %s )' % rotatedLayer.rotation)
 		aroundInset = 0.25 * self.layerExtrusionWidth
 		aroundWidth = 0.25 * self.layerExtrusionWidth
-		self.lastExtraShells = extraShells
 		gridPointInsetX = 0.5 * layerFillInset
 		doubleExtrusionWidth = 2.0 * self.layerExtrusionWidth
 		endpoints = []
@@ -927,8 +942,7 @@ class FillSkein:
 						arounds.append(around)
 						euclidean.addLoopToPixelTable(around, pixelTable, aroundWidth)
 		if len(arounds) < 1:
-			self.addThreadsBridgeLayer(layerIndex, nestedRings, rotatedLayer)
-			return
+			return nestedRings
 		back = euclidean.getBackOfLoops(arounds)
 		front = euclidean.getFrontOfLoops(arounds)
 		front = math.ceil(front / self.layerExtrusionWidth) * self.layerExtrusionWidth
@@ -944,12 +958,13 @@ class FillSkein:
 			if self.repository.infillPatternGridCircular.value and self.repository.infillSolidity.value > 0.0:
 				gridCircular = True
 				layerInfillSolidity = 0.0
-			xIntersectionIndexLists = []
-			self.frontOverWidth = euclidean.getFrontOverWidthAddXListYList(front, surroundingCarves, numberOfLines, xIntersectionIndexLists, self.layerExtrusionWidth, self.yList)
+			surroundingScanLines = euclidean.HorizontalScanLines(front, numberOfLines, self.layerExtrusionWidth)
+			surroundingScanLines.addLoopLists(surroundingCarves)
+			self.frontOverWidth = surroundingScanLines.frontOverWidth
+			self.yList = surroundingScanLines.yList
+			self.surroundingXIntersectionLists = surroundingScanLines.getIntersectionLists(self.doubleSolidSurfaceThickness)
 			for fillLine in xrange(len(self.horizontalSegmentLists)):
-				xIntersectionIndexList = xIntersectionIndexLists[fillLine]
-				surroundingXIntersections = euclidean.getIntersectionOfXIntersectionIndexes(self.doubleSolidSurfaceThickness, xIntersectionIndexList)
-				self.surroundingXIntersectionLists.append(surroundingXIntersections)
+				surroundingXIntersections = self.surroundingXIntersectionLists[fillLine]
 				addSparseEndpoints(doubleExtrusionWidth, endpoints, fillLine, self.horizontalSegmentLists, layerInfillSolidity, removedEndpoints, self.solidSurfaceThickness, surroundingXIntersections)
 		else:
 			for fillLine in xrange(len(self.horizontalSegmentLists)):
@@ -971,7 +986,7 @@ class FillSkein:
 		for path in paths:
 			addPath(self.layerExtrusionWidth, infillPaths, path, layerRotation)
 		euclidean.transferPathsToSurroundingLoops(nestedRings, infillPaths)
-		self.addThreadsBridgeLayer(layerIndex, nestedRings, rotatedLayer)
+		return nestedRings
 
 	def addGcodeFromThreadZ( self, thread, z ):
 		'Add a gcode thread to the output.'
@@ -1101,8 +1116,14 @@ class FillSkein:
 		rotatedCarve = intercircle.getInsetSeparateLoopsFromLoops(-outsetRadius, rotatedCarve)
 		surroundingCarves.append(rotatedCarve)
 
-	def addThreadsBridgeLayer(self, layerIndex, nestedRings, rotatedLayer):
-		'Add the threads, add the bridge end & the layer end tag.'
+	def addThreadsBridgeLayer(self, layerIndex, nestedRings):
+		'Add the layer tag, the bridge tag, the threads, the bridge end & the layer end tag.'
+		rotatedLayer = self.rotatedLayers[layerIndex]
+		self.distanceFeedRate.addLine('(<layer> %s )' % rotatedLayer.z)
+		self.layerExtrusionWidth = self.infillWidth
+		if rotatedLayer.rotation != None:
+			self.layerExtrusionWidth *= self.bridgeWidthMultiplier
+			self.distanceFeedRate.addLine('(<bridgeRotation> %s )' % rotatedLayer.rotation)
 		if self.oldOrderedLocation == None or self.repository.startFromLowerLeft.value:
 			self.oldOrderedLocation = getLowerLeftCorner(nestedRings)
 		extrusionHalfWidth = 0.5 * self.layerExtrusionWidth
@@ -1129,7 +1150,7 @@ class FillSkein:
 	def getCraftedGcode( self, repository, gcodeText ):
 		'Parse gcode text and store the bevel gcode.'
 		self.repository = repository
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.threadSequence = None
 		if repository.threadSequenceInfillLoops.value:
 			self.threadSequence = ['infill', 'loops', 'perimeter']
@@ -1164,10 +1185,19 @@ class FillSkein:
 		self.doubleSolidSurfaceThickness = self.solidSurfaceThickness + self.solidSurfaceThickness
 		for lineIndex in xrange( self.lineIndex, len(self.lines) ):
 			self.parseLine( lineIndex )
-		for layerIndex in xrange(len(self.rotatedLayers)):
-			self.addFill(layerIndex)
+		self.addFills()
 		self.distanceFeedRate.addLines( self.lines[ self.shutdownLineIndex : ] )
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
+
+	def getExtraShells(self, layerIndex, lastExtraShells):
+		'Get the number of extra shells of the carve layer, given the number of extra shells of the layer below.'
+		if self.rotatedLayers[layerIndex].rotation != None:
+			return 0
+		if len(self.getSurroundingLayerDeltas(layerIndex)) >= self.doubleSolidSurfaceThickness:
+			return self.repository.extraShellsSparseLayer.value
+		if lastExtraShells != self.repository.extraShellsBase.value:
+			return self.repository.extraShellsBase.value
+		return self.repository.extraShellsAlternatingSolidLayer.value
 
 	def getGridPoints(self, fillLoops, reverseRotation):
 		'Get the grid points.'
@@ -1223,6 +1253,19 @@ class FillSkein:
 				gridXStep += 1
 		return gridXStep
 
+	def getSurroundingLayerDeltas(self, layerIndex):
+		'Get the layer deltas of the carves which surround the carve layer.'
+		surroundingLayerDeltas = []
+		layerRemainder = layerIndex % int(round(self.repository.diaphragmPeriod.value))
+		if layerRemainder < int(round(self.repository.diaphragmThickness.value)) or self.rotatedLayers[layerIndex].rotation != None:
+			return surroundingLayerDeltas
+		for surroundingIndex in xrange(1, self.solidSurfaceThickness + 1):
+			for layerDelta in [-surroundingIndex, surroundingIndex]:
+				surroundingLayerIndex = layerIndex + layerDelta
+				if surroundingLayerIndex >= 0 and surroundingLayerIndex < len(self.rotatedLayers):
+					surroundingLayerDeltas.append(layerDelta)
+		return surroundingLayerDeltas
+
 	def isGridToBeExtruded(self):
 		'Determine if the grid is to be extruded.'
 		if self.repository.infillPatternLine.value:
@@ -105,11 +105,11 @@ class FlowSkein:
 	def getCraftedGcode( self, gcodeText, flowRepository ):
 		"Parse gcode text and store the flow gcode."
 		self.flowRepository = flowRepository
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.parseInitialization()
 		for line in self.lines[self.lineIndex :]:
 			self.parseLine(line)
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def parseInitialization(self):
 		'Parse gcode initialization and store the parameters.'
@@ -144,12 +144,12 @@ class HomeSkein:
 		self.homingLines = settings.getLinesInAlterationsOrGivenDirectory(repository.nameOfHomingFile.value)
 		if len(self.homingLines) < 1:
 			return gcodeText
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.parseInitialization( repository )
 		for self.lineIndex in xrange( self.lineIndex, len(self.lines) ):
 			line = self.lines[self.lineIndex]
 			self.parseLine(line)
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def parseInitialization( self, repository ):
 		'Parse gcode initialization and store the parameters.'
@@ -210,12 +210,15 @@ def isCloseToLast( paths, point, radius ):
 def isIntersectingItself( loop, width ):
 	"Determine if the loop is intersecting itself."
 	outlines = []
+	outlineGrid = euclidean.SegmentGrid(euclidean.getSegmentGridCellWidth([loop]))
 	for pointIndex in xrange(len(loop)):
 		pointBegin = loop[pointIndex]
 		pointEnd = loop[(pointIndex + 1) % len(loop)]
-		if euclidean.isLineIntersectingLoops( outlines, pointBegin, pointEnd ):
+		if outlineGrid.isLineIntersecting(pointBegin, pointEnd):
 			return True
+		numberOfOutlines = len(outlines)
 		addSegmentOutline( False, outlines, pointBegin, pointEnd, width )
+		outlineGrid.addLoops(outlines[numberOfOutlines :])
 	return False
 
 def isIntersectingWithinLists( loop, loopLists ):
@@ -266,6 +269,7 @@ class InsetSkein:
 		"Add the perimeter paths to the output."
 		segments = []
 		outlines = []
+		outlineGrid = euclidean.SegmentGrid(euclidean.getSegmentGridCellWidth([loop]))
 		thickOutlines = []
 		allLoopLists = loopLists[:] + [ thickOutlines ]
 		aroundLists = loopLists
@@ -273,11 +277,13 @@ class InsetSkein:
 			pointBegin = loop[pointIndex]
 			pointEnd = loop[(pointIndex + 1) % len(loop)]
 			if isIntersectingSelf:
-				if euclidean.isLineIntersectingLoops( outlines, pointBegin, pointEnd ):
+				if outlineGrid.isLineIntersecting(pointBegin, pointEnd):
 					segments += getSegmentsFromLoopListsPoints( allLoopLists, pointBegin, pointEnd )
 				else:
 					segments += getSegmentsFromLoopListsPoints( loopLists, pointBegin, pointEnd )
+				numberOfOutlines = len(outlines)
 				addSegmentOutline( False, outlines, pointBegin, pointEnd, self.overlapRemovalWidth )
+				outlineGrid.addLoops(outlines[numberOfOutlines :])
 				addSegmentOutline( True, thickOutlines, pointBegin, pointEnd, self.overlapRemovalWidth )
 			else:
 				segments += getSegmentsFromLoopListsPoints( loopLists, pointBegin, pointEnd )
@@ -342,11 +348,11 @@ class InsetSkein:
 	def getCraftedGcode(self, gcodeText, repository):
 		"Parse gcode text and store the bevel gcode."
 		self.repository = repository
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.parseInitialization()
 		for line in self.lines[self.lineIndex :]:
 			self.parseLine(line)
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def parseInitialization(self):
 		'Parse gcode initialization and store the parameters.'
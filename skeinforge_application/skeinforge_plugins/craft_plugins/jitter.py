@@ -174,11 +174,11 @@ class JitterSkein:
 		if jitterRepository.jitterOverPerimeterWidth.value == 0.0:
 			print('Warning, Jitter Over Perimeter Width is zero so thing will be done.')
 			return gcodeText
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.parseInitialization(jitterRepository)
 		for self.lineIndex in xrange(self.lineIndex, len(self.lines)):
 			self.parseLine(self.lines[self.lineIndex])
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def parseInitialization( self, jitterRepository ):
 		'Parse gcode initialization and store the parameters.'
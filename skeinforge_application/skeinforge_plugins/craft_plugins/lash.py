@@ -111,7 +111,7 @@ class LashSkein:
 
 	def getCraftedGcode( self, gcodeText, lashRepository ):
 		"Parse gcode text and store the lash gcode."
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.lashRepository = lashRepository
 		self.xBacklash = lashRepository.xBacklash.value
 		self.yBacklash = lashRepository.yBacklash.value
@@ -119,7 +119,7 @@ class LashSkein:
 		for self.lineIndex in xrange( self.lineIndex, len(self.lines) ):
 			line = self.lines[self.lineIndex]
 			self.parseLash(line)
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def getLashedLine( self, line, location, splitLine ):
 		"Get lashed gcode line."
@@ -113,7 +113,7 @@ class LiftSkein:
 	def getCraftedGcode( self, liftRepository, gcodeText ):
 		"Parse gcode text and store the lift gcode."
 		self.liftRepository = liftRepository
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.parseInitialization()
 		self.oldLocation = None
 		if self.layerStep == None:
@@ -123,7 +123,7 @@ class LiftSkein:
 		self.travelZ = self.maximumZ + 0.5 * self.layerStep + liftRepository.clearanceAboveTop.value
 		for line in self.lines[self.lineIndex :]:
 			self.parseLine(line)
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def getLinearMove( self, line, location, splitLine ):
 		"Get the linear move."
@@ -114,11 +114,11 @@ class LimitSkein:
 		self.maximumZTravelFeedRatePerSecond = repository.maximumZFeedRatePerSecond.value
 		self.maximumZFeedRatePerSecond = self.maximumZTravelFeedRatePerSecond
 		self.repository = repository
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.parseInitialization()
 		for lineIndex in xrange( self.lineIndex, len(self.lines) ):
 			self.parseLine( lineIndex )
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def getLimitedInitialMovement(self, line, splitLine):
 		'Get a limited linear movement.'
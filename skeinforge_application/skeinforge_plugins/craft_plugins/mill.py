@@ -244,12 +244,12 @@ class MillSkein:
 	def getCraftedGcode(self, gcodeText, repository):
 		'Parse gcode text and store the mill gcode.'
 		self.repository = repository
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.parseInitialization()
 		self.parseBoundaries()
 		for line in self.lines[self.lineIndex :]:
 			self.parseLine(line)
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def getHorizontalSegmentTableForXIntersectionsTable( self, xIntersectionsTable ):
 		'Get the horizontal segment table from the xIntersectionsTable.'
@@ -191,12 +191,12 @@ class MultiplySkein:
 		self.repository = repository
 		self.numberOfColumns = repository.numberOfColumns.value
 		self.numberOfRows = repository.numberOfRows.value
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.parseInitialization()
 		self.setCorners()
 		for line in self.lines[self.lineIndex :]:
 			self.parseLine(line)
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def getMovedLocationSetOldLocation(self, offset, splitLine):
 		'Get the moved location and set the old location.'
@@ -153,6 +153,7 @@ class OozebaneSkein:
 		self.operatingFeedRateMinute = 959.0
 		self.shutdownStepIndex = 999999999
 		self.startupStepIndex = 999999999
+		self.threadIndex = None
 
 	def addAfterStartupLine( self, splitLine ):
 		"Add the after startup lines."
@@ -175,18 +176,16 @@ class OozebaneSkein:
 
 	def getActiveFeedRateRatio(self):
 		"Get the feed rate of the first active move over the operating feed rate."
-		isSearchExtruderActive = self.isExtruderActive
-		for afterIndex in xrange( self.lineIndex, len(self.lines) ):
-			line = self.lines[ afterIndex ]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'G1':
-				if isSearchExtruderActive:
-					return gcodec.getFeedRateMinute( self.feedRateMinute, splitLine ) / self.operatingFeedRateMinute
-			elif firstWord == 'M101':
-				isSearchExtruderActive = True
-		print('active feed rate ratio was not found in oozebane.')
-		return 1.0
+		moveIndex = self.lineIndex - 1
+		if not self.isExtruderActive:
+			moveIndex = self.threadIndex.getNextIndex('M101', moveIndex)
+		if moveIndex != None:
+			moveIndex = self.threadIndex.getNextIndex('G1', moveIndex)
+		if moveIndex == None:
+			print('active feed rate ratio was not found in oozebane.')
+			return 1.0
+		splitLine = gcodec.getSplitLineBeforeBracketSemicolon(self.lines[moveIndex])
+		return gcodec.getFeedRateMinute( self.feedRateMinute, splitLine ) / self.operatingFeedRateMinute
 
 	def getAddAfterStartupLines(self, line):
 		"Get and / or add after the startup lines."
@@ -268,103 +267,58 @@ class OozebaneSkein:
 
 	def getCraftedGcode( self, gcodeText, oozebaneRepository ):
 		"Parse gcode text and store the oozebane gcode."
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.oozebaneRepository = oozebaneRepository
+		self.threadIndex = gcodec.ThreadIndex(self.lines)
 		self.parseInitialization( oozebaneRepository )
 		for self.lineIndex in xrange( self.lineIndex, len(self.lines) ):
 			line = self.lines[self.lineIndex]
 			self.parseLine(line)
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def getDistanceAfterThreadBeginning(self):
 		"Get the distance after the beginning of the thread."
-		line = self.lines[self.lineIndex]
-		splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-		lastThreadLocation = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
-		totalDistance = 0.0
-		extruderOnReached = False
-		for beforeIndex in xrange( self.lineIndex - 1, 3, - 1 ):
-			line = self.lines[ beforeIndex ]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'G1':
-				location = gcodec.getLocationFromSplitLine( lastThreadLocation, splitLine )
-				totalDistance += location.distance( lastThreadLocation )
-				lastThreadLocation = location
-				if extruderOnReached:
-					return totalDistance
-			elif firstWord == 'M101':
-				extruderOnReached = True
-		return None
+		extruderOnIndex = self.threadIndex.getPreviousIndex('M101', self.lineIndex)
+		if extruderOnIndex == None or extruderOnIndex < 4:
+			return None
+		moveIndex = self.threadIndex.getPreviousIndex('G1', extruderOnIndex)
+		if moveIndex == None or moveIndex < 4:
+			return None
+		return self.threadIndex.getPathLength(moveIndex, self.lineIndex)
 
 	def getDistanceToExtruderOffCommand( self, remainingDistance ):
 		"Get the distance to the word."
-		line = self.lines[self.lineIndex]
-		splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-		lastThreadLocation = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
-		totalDistance = 0.0
-		for afterIndex in xrange( self.lineIndex + 1, len(self.lines) ):
-			line = self.lines[ afterIndex ]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'G1':
-				location = gcodec.getLocationFromSplitLine( lastThreadLocation, splitLine )
-				totalDistance += location.distance( lastThreadLocation )
-				lastThreadLocation = location
-				if totalDistance >= remainingDistance:
-					return None
-			elif firstWord == 'M103':
-				return totalDistance
-		return None
+		return self.getDistanceToFirstWord('M103', remainingDistance)
+
+	def getDistanceToFirstWord( self, firstWord, remainingDistance ):
+		"Get the distance to the next line starting with the first word, or None if the remaining distance is reached before it."
+		firstWordIndex = self.threadIndex.getNextIndex(firstWord, self.lineIndex)
+		if firstWordIndex == None:
+			return None
+		totalDistance = self.threadIndex.getPathLength(self.lineIndex, firstWordIndex)
+		if totalDistance >= remainingDistance and self.threadIndex.isFirstWordBetween('G1', self.lineIndex, firstWordIndex):
+			return None
+		return totalDistance
 
 	def getDistanceToThreadBeginning(self):
 		"Get the distance to the beginning of the thread."
 		if self.earlyStartupDistance == None:
 			return None
-		line = self.lines[self.lineIndex]
-		splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-		lastThreadLocation = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
-		totalDistance = 0.0
-		for afterIndex in xrange( self.lineIndex + 1, len(self.lines) ):
-			line = self.lines[ afterIndex ]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'G1':
-				location = gcodec.getLocationFromSplitLine( lastThreadLocation, splitLine )
-				totalDistance += location.distance( lastThreadLocation )
-				lastThreadLocation = location
-				if totalDistance >= self.earlyStartupDistance:
-					return None
-			elif firstWord == 'M101':
-				return totalDistance
-		return None
+		return self.getDistanceToFirstWord('M101', self.earlyStartupDistance)
 
 	def getDistanceToThreadBeginningAfterThreadEnd( self, remainingDistance ):
 		"Get the distance to the thread beginning after the end of this thread."
-		extruderOnReached = False
-		line = self.lines[self.lineIndex]
-		splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-		lastThreadLocation = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
-		threadEndReached = False
-		totalDistance = 0.0
-		for afterIndex in xrange( self.lineIndex + 1, len(self.lines) ):
-			line = self.lines[ afterIndex ]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'G1':
-				location = gcodec.getLocationFromSplitLine( lastThreadLocation, splitLine )
-				if threadEndReached:
-					totalDistance += location.distance( lastThreadLocation )
-					if totalDistance >= remainingDistance:
-						return None
-					if extruderOnReached:
-						return totalDistance
-				lastThreadLocation = location
-			elif firstWord == 'M101':
-				extruderOnReached = True
-			elif firstWord == 'M103':
-				threadEndReached = True
-		return None
+		extruderOffIndex = self.threadIndex.getNextIndex('M103', self.lineIndex)
+		extruderOnIndex = self.threadIndex.getNextIndex('M101', self.lineIndex)
+		if extruderOffIndex == None or extruderOnIndex == None:
+			return None
+		moveIndex = self.threadIndex.getNextIndex('G1', max(extruderOffIndex, extruderOnIndex))
+		if moveIndex == None:
+			return None
+		totalDistance = self.threadIndex.getPathLength(extruderOffIndex, moveIndex)
+		if totalDistance >= remainingDistance:
+			return None
+		return totalDistance
 
 	def getDistanceToThreadEnd(self):
 		"Get the distance to the end of the thread."
@@ -510,26 +464,17 @@ class OozebaneSkein:
 		"Set the early startup distance."
 		if self.earlyStartupDistance != None:
 			return
-		self.distanceFromThreadEndToThreadBeginning = 0.0
-		lastThreadLocation = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
-		if self.oldLocation != None:
-			self.distanceFromThreadEndToThreadBeginning = lastThreadLocation.distance( self.oldLocation )
-		for afterIndex in xrange( self.lineIndex + 1, len(self.lines) ):
-			line = self.lines[ afterIndex ]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'G1':
-				location = gcodec.getLocationFromSplitLine( lastThreadLocation, splitLine )
-				self.distanceFromThreadEndToThreadBeginning += location.distance( lastThreadLocation )
-				lastThreadLocation = location
-			elif firstWord == 'M101':
-				distanceConstantRatio = self.distanceFromThreadEndToThreadBeginning / self.earlyStartupDistanceConstant
-				earlyStartupOperatingDistance = self.earlyStartupMaximumDistance * ( 1.0 - math.exp( - distanceConstantRatio ) )
-				if self.isFirstExtrusion:
-					earlyStartupOperatingDistance = self.oozebaneRepository.firstEarlyStartupDistance.value
-					self.isFirstExtrusion = False
-				self.earlyStartupDistance = earlyStartupOperatingDistance * self.getActiveFeedRateRatio()
-				return
+		extruderOnIndex = self.threadIndex.getNextIndex('M101', self.lineIndex)
+		if extruderOnIndex == None:
+			self.distanceFromThreadEndToThreadBeginning = self.threadIndex.getPathLength(self.lineIndex - 1, len(self.lines) - 1)
+			return
+		self.distanceFromThreadEndToThreadBeginning = self.threadIndex.getPathLength(self.lineIndex - 1, extruderOnIndex)
+		distanceConstantRatio = self.distanceFromThreadEndToThreadBeginning / self.earlyStartupDistanceConstant
+		earlyStartupOperatingDistance = self.earlyStartupMaximumDistance * ( 1.0 - math.exp( - distanceConstantRatio ) )
+		if self.isFirstExtrusion:
+			earlyStartupOperatingDistance = self.oozebaneRepository.firstEarlyStartupDistance.value
+			self.isFirstExtrusion = False
+		self.earlyStartupDistance = earlyStartupOperatingDistance * self.getActiveFeedRateRatio()
 
 	def setExtrusionWidth( self, oozebaneRepository ):
 		"Set the extrusion width."
@@ -113,11 +113,11 @@ class OutsetSkein:
 	def getCraftedGcode(self, gcodeText, repository):
 		'Parse gcode text and store the bevel gcode.'
 		self.repository = repository
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.parseInitialization()
 		for lineIndex in xrange( self.lineIndex, len(self.lines) ):
 			self.parseLine( lineIndex )
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def parseInitialization(self):
 		'Parse gcode initialization and store the parameters.'
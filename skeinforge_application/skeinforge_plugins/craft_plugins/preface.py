@@ -209,17 +209,17 @@ class PrefaceSkein:
 	def getCraftedGcode( self, repository, gcodeText ):
 		"Parse gcode text and store the bevel gcode."
 		self.repository = repository
-		self.svgReader.parseSVG('', gcodeText)
+		rotatedLoopLayers = self.svgReader.getRotatedLoopLayersIncrementally('', gcodeText)
 		if self.svgReader.sliceDictionary == None:
 			print('Warning, nothing will be done because the sliceDictionary could not be found getCraftedGcode in preface.')
 			return ''
 		self.distanceFeedRate.decimalPlacesCarried = int(self.svgReader.sliceDictionary['decimalPlacesCarried'])
 		self.addInitializationToOutput()
-		for rotatedLoopLayerIndex, rotatedLoopLayer in enumerate(self.svgReader.rotatedLoopLayers):
-			settings.printProgressByNumber(rotatedLoopLayerIndex, len(self.svgReader.rotatedLoopLayers), 'preface')
+		for rotatedLoopLayerIndex, rotatedLoopLayer in enumerate(rotatedLoopLayers):
+			settings.printProgress(rotatedLoopLayerIndex, 'preface')
 			self.addPreface( rotatedLoopLayer )
 		self.addShutdownToOutput()
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 
 def main():
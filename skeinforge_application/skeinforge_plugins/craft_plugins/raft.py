@@ -291,10 +291,30 @@ def getLoopsBySegmentsDictionary(segmentsDictionary, width):
 		points.append(endpoint.point)
 	return triangle_mesh.getDescendingAreaOrientedLoops(points, points, width + width)
 
+def getLoopsKey(loops):
+	'Get a hashable key of the loops, which is the same for identical loops.'
+	loopsKey = []
+	for loop in loops:
+		loopsKey.append(tuple(loop))
+	return tuple(loopsKey)
+
 def getNewRepository():
 	'Get new repository.'
 	return RaftRepository()
 
+def getOrbitInsetLoops(loops, inset):
+	'Get the inset loops for the orbits, which might overlap.'
+	return intercircle.getInsetLoopsFromLoops(inset, loops)
+
+def getOutsetSeparateLoops(loops, outset):
+	'Get the separate outset loops.'
+	return intercircle.getInsetSeparateLoopsFromLoops(-outset, loops)
+
+def getSupportLoops(loops, supportOutset):
+	'Get the separate support loops.'
+	# thresholdRadius of 0.8 is needed to avoid the ripple inset bug http://hydraraptor.blogspot.com/2010/12/crackers.html
+	return intercircle.getInsetSeparateLoopsFromLoops(-supportOutset, loops, 0.8)
+
 def getVerticalEndpoints(horizontalSegmentsTable, horizontalStep, verticalOverhang, verticalStep):
 	'Get vertical endpoints.'
 	interfaceSegmentsTableKeys = horizontalSegmentsTable.keys()
@@ -437,6 +457,7 @@ class RaftSkein:
 		self.baseTemperature = None
 		self.beginLoop = None
 		self.boundaryLayers = []
+		self.cachedLoopsTable = {}
 		self.coolingRate = None
 		self.distanceFeedRate = gcodec.DistanceFeedRate()
 		self.extrusionStart = True
@@ -713,7 +734,7 @@ class RaftSkein:
 			return
 		boundaryLayer = self.boundaryLayers[layerIndex]
 		rise = aboveLayer.z - boundaryLayer.z
-		outsetSupportLoops = intercircle.getInsetSeparateLoopsFromLoops( - self.minimumSupportRatio * rise, boundaryLayer.loops )
+		outsetSupportLoops = self.getCachedLoops(boundaryLayer.loops, getOutsetSeparateLoops, self.minimumSupportRatio * rise)
 		numberOfSubSteps = 4
 		subStepSize = self.interfaceStep / float( numberOfSubSteps )
 		aboveIntersectionsTable = {}
@@ -723,11 +744,11 @@ class RaftSkein:
 		euclidean.subtractXIntersectionsTable( aboveIntersectionsTable, outsetIntersectionsTable )
 		for aboveIntersectionsTableKey in aboveIntersectionsTable.keys():
 			supportIntersectionsTableKey = int( round( float( aboveIntersectionsTableKey ) / numberOfSubSteps ) )
-			xIntersectionIndexList = []
+			supportXIntersections = []
 			if supportIntersectionsTableKey in supportLayer.xIntersectionsTable:
-				euclidean.addXIntersectionIndexesFromXIntersections( 0, xIntersectionIndexList, supportLayer.xIntersectionsTable[ supportIntersectionsTableKey ] )
-			euclidean.addXIntersectionIndexesFromXIntersections( 1, xIntersectionIndexList, aboveIntersectionsTable[ aboveIntersectionsTableKey ] )
-			supportLayer.xIntersectionsTable[ supportIntersectionsTableKey ] = euclidean.getJoinOfXIntersectionIndexes( xIntersectionIndexList )
+				supportXIntersections = supportLayer.xIntersectionsTable[ supportIntersectionsTableKey ]
+			aboveXIntersections = aboveIntersectionsTable[ aboveIntersectionsTableKey ]
+			supportLayer.xIntersectionsTable[ supportIntersectionsTableKey ] = euclidean.getJoinOfXIntersections( supportXIntersections, aboveXIntersections )
 
 	def addSupportLayerTemperature(self, endpoints, z):
 		'Add support layer and temperature before the object layer.'
@@ -738,7 +759,7 @@ class RaftSkein:
 		aroundWidth = 0.25 * self.interfaceStep
 		boundaryLoops = self.boundaryLayers[self.layerIndex].loops
 		halfSupportOutset = 0.5 * self.supportOutset
-		aroundBoundaryLoops = intercircle.getAroundsFromLoops(boundaryLoops, halfSupportOutset)
+		aroundBoundaryLoops = self.getCachedLoops(boundaryLoops, intercircle.getAroundsFromLoops, halfSupportOutset)
 		for aroundBoundaryLoop in aroundBoundaryLoops:
 			euclidean.addLoopToPixelTable(aroundBoundaryLoop, aroundPixelTable, aroundWidth)
 		paths = euclidean.getPathsFromEndpoints(endpoints, 1.5 * self.interfaceStep, aroundPixelTable, aroundWidth)
@@ -783,7 +804,7 @@ class RaftSkein:
 			intercircle.addOrbitsIfLarge( self.distanceFeedRate, squareLoop, self.orbitalFeedRatePerSecond, temperatureTimeChange, z )
 			return
 		perimeterInset = 0.4 * self.perimeterWidth
-		insetBoundaryLoops = intercircle.getInsetLoopsFromLoops( perimeterInset, boundaryLoops )
+		insetBoundaryLoops = self.getCachedLoops(boundaryLoops, getOrbitInsetLoops, perimeterInset)
 		if len( insetBoundaryLoops ) < 1:
 			insetBoundaryLoops = boundaryLoops
 		largestLoop = euclidean.getLargestLoop( insetBoundaryLoops )
@@ -816,13 +837,24 @@ class RaftSkein:
 			else:
 				del xIntersectionsTable[ xIntersectionsTableKey ]
 
+	def getCachedLoops(self, boundaryLoops, loopsFunction, radius):
+		'Get the loops made by the loops function, reusing them if the boundary loops and radius are the same as in the last call of the loops function, as they are in the straight walls of a tall part.'
+		loopsKey = (radius, getLoopsKey(boundaryLoops))
+		if loopsFunction in self.cachedLoopsTable:
+			cachedLoopsKey, cachedLoops = self.cachedLoopsTable[loopsFunction]
+			if cachedLoopsKey == loopsKey:
+				return cachedLoops
+		loops = loopsFunction(boundaryLoops, radius)
+		self.cachedLoopsTable[loopsFunction] = (loopsKey, loops)
+		return loops
+
 	def getCraftedGcode(self, gcodeText, repository):
 		'Parse gcode text and store the raft gcode.'
 		self.repository = repository
 		self.minimumSupportRatio = math.tan( math.radians( repository.supportMinimumAngle.value ) )
 		self.supportEndLines = settings.getLinesInAlterationsOrGivenDirectory(repository.nameOfSupportEndFile.value)
 		self.supportStartLines = settings.getLinesInAlterationsOrGivenDirectory(repository.nameOfSupportStartFile.value)
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.parseInitialization()
 		self.temperatureChangeTimeBeforeRaft = 0.0
 		if self.repository.initialCircling.value:
@@ -834,7 +866,7 @@ class RaftSkein:
 		self.addTemperatureLineIfDifferent( self.objectFirstLayerPerimeterTemperature )
 		for line in self.lines[self.lineIndex :]:
 			self.parseLine(line)
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def getElevatedBoundaryLine( self, splitLine ):
 		'Get elevated boundary gcode line.'
@@ -1037,8 +1069,7 @@ class RaftSkein:
 			self.addSegmentTablesToSupportLayers()
 			return
 		for boundaryLayer in self.boundaryLayers:
-			# thresholdRadius of 0.8 is needed to avoid the ripple inset bug http://hydraraptor.blogspot.com/2010/12/crackers.html
-			supportLoops = intercircle.getInsetSeparateLoopsFromLoops(-self.supportOutset, boundaryLayer.loops, 0.8)
+			supportLoops = self.getCachedLoops(boundaryLayer.loops, getSupportLoops, self.supportOutset)
 			supportLayer = SupportLayer(supportLoops)
 			self.supportLayers.append(supportLayer)
 		for supportLayerIndex in xrange(len(self.supportLayers) - 1):
@@ -52,6 +52,7 @@ from fabmetheus_utilities import archive
 from fabmetheus_utilities import euclidean
 from fabmetheus_utilities import gcodec
 from fabmetheus_utilities import settings
+from fabmetheus_utilities import slice_binary
 from fabmetheus_utilities import svg_writer
 from fabmetheus_utilities import xml_simple_writer
 from skeinforge_application.skeinforge_utilities import skeinforge_craft
@@ -146,7 +147,7 @@ class ScaleSkein:
 			perimeterWidth)
 		commentElement = svg_writer.getCommentElement(svgReader.root)
 		procedureNameString = svgReader.sliceDictionary['procedureName'] + ',scale'
-		return svgWriter.getReplacedSVGTemplate(fileName, procedureNameString, rotatedLoopLayers, commentElement)
+		return svgWriter.getSliceText(fileName, slice_binary.isSliceBinaryText(svgText), procedureNameString, rotatedLoopLayers, commentElement)
 
 
 def main():
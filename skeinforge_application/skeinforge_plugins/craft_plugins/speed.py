@@ -197,12 +197,12 @@ class SpeedSkein:
 		self.repository = repository
 		self.feedRatePerSecond = repository.feedRatePerSecond.value
 		self.travelFeedRateMinute = 60.0 * self.repository.travelFeedRatePerSecond.value
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.parseInitialization()
 		for line in self.lines[self.lineIndex :]:
 			self.parseLine(line)
 		self.addParameterString('M113', self.repository.dutyCycleAtEnding.value ) # Set duty cycle .
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def getFlowRateString(self):
 		"Get the flow rate string."
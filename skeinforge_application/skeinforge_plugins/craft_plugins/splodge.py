@@ -166,7 +166,7 @@ class SplodgeSkein:
 
 	def getCraftedGcode( self, gcodeText, splodgeRepository ):
 		"Parse gcode text and store the splodge gcode."
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.setRotations()
 		self.splodgeRepository = splodgeRepository
 		self.parseInitialization( splodgeRepository )
@@ -178,7 +178,7 @@ class SplodgeSkein:
 		for self.lineIndex in xrange( self.lineIndex, len(self.lines) ):
 			line = self.lines[self.lineIndex]
 			self.parseLine(line)
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def getInitialSplodgeLine( self, line, location ):
 		"Add the initial splodge line."
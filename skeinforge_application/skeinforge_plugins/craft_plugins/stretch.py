@@ -100,20 +100,17 @@ def writeOutput(fileName, shouldAnalyze=True):
 
 class LineIteratorBackward:
 	"Backward line iterator class."
-	def __init__( self, isLoop, lineIndex, lines ):
+	def __init__( self, isLoop, lineIndex, threadIndex ):
 		self.firstLineIndex = None
 		self.isLoop = isLoop
 		self.lineIndex = lineIndex
-		self.lines = lines
+		self.threadIndex = threadIndex
 
 	def getIndexBeforeNextDeactivate(self):
 		"Get index two lines before the deactivate command."
-		for lineIndex in xrange( self.lineIndex + 1, len(self.lines) ):
-			line = self.lines[lineIndex]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'M103':
-				return lineIndex - 2
+		deactivateIndex = self.threadIndex.getNextIndex('M103', self.lineIndex)
+		if deactivateIndex != None:
+			return deactivateIndex - 2
 		print('This should never happen in stretch, no deactivate command was found for this thread.')
 		raise StopIteration, "You've reached the end of the line."
 
@@ -125,9 +122,7 @@ class LineIteratorBackward:
 			if self.firstLineIndex == None:
 				self.firstLineIndex = self.lineIndex
 			nextLineIndex = self.lineIndex - 1
-			line = self.lines[self.lineIndex]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
+			firstWord = self.threadIndex.firstWords[self.lineIndex]
 			if firstWord == 'M103':
 				if self.isLoop:
 					nextLineIndex = self.getIndexBeforeNextDeactivate()
@@ -140,6 +135,7 @@ class LineIteratorBackward:
 					else:
 						raise StopIteration, "You've reached the end of the line."
 				else:
+					line = self.threadIndex.lines[self.lineIndex]
 					self.lineIndex = nextLineIndex
 					return line
 			self.lineIndex = nextLineIndex
@@ -147,51 +143,43 @@ class LineIteratorBackward:
 
 	def isBeforeExtrusion(self):
 		"Determine if index is two or more before activate command."
-		linearMoves = 0
-		for lineIndex in xrange( self.lineIndex + 1, len(self.lines) ):
-			line = self.lines[lineIndex]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'G1':
-				linearMoves += 1
-			if firstWord == 'M101':
-				return linearMoves > 0
-			if firstWord == 'M103':
-				return False
-		print('This should never happen in isBeforeExtrusion in stretch, no activate command was found for this thread.')
-		return False
+		activateIndex = self.threadIndex.getNextIndex('M101', self.lineIndex)
+		deactivateIndex = self.threadIndex.getNextIndex('M103', self.lineIndex)
+		if activateIndex == None:
+			if deactivateIndex == None:
+				print('This should never happen in isBeforeExtrusion in stretch, no activate command was found for this thread.')
+			return False
+		if deactivateIndex != None and deactivateIndex < activateIndex:
+			return False
+		return self.threadIndex.isFirstWordBetween('G1', self.lineIndex, activateIndex)
 
 
 class LineIteratorForward:
 	"Forward line iterator class."
-	def __init__( self, isLoop, lineIndex, lines ):
+	def __init__( self, isLoop, lineIndex, threadIndex ):
 		self.firstLineIndex = None
 		self.isLoop = isLoop
 		self.lineIndex = lineIndex
-		self.lines = lines
+		self.threadIndex = threadIndex
 
 	def getIndexJustAfterActivate(self):
 		"Get index just after the activate command."
-		for lineIndex in xrange( self.lineIndex - 1, 3, - 1 ):
-			line = self.lines[lineIndex]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'M101':
-				return lineIndex + 1
+		activateIndex = self.threadIndex.getPreviousIndex('M101', self.lineIndex)
+		if activateIndex != None and activateIndex > 3:
+			return activateIndex + 1
 		print('This should never happen in stretch, no activate command was found for this thread.')
 		raise StopIteration, "You've reached the end of the line."
 
 	def getNext(self):
 		"Get next line or raise exception."
-		while self.lineIndex < len(self.lines):
+		while self.lineIndex < len(self.threadIndex.lines):
 			if self.lineIndex == self.firstLineIndex:
 				raise StopIteration, "You've reached the end of the line."
 			if self.firstLineIndex == None:
 				self.firstLineIndex = self.lineIndex
 			nextLineIndex = self.lineIndex + 1
-			line = self.lines[self.lineIndex]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
+			line = self.threadIndex.lines[self.lineIndex]
+			firstWord = self.threadIndex.firstWords[self.lineIndex]
 			if firstWord == 'M103':
 				if self.isLoop:
 					nextLineIndex = self.getIndexJustAfterActivate()
@@ -240,16 +228,18 @@ class StretchSkein:
 		self.lines = None
 		self.oldLocation = None
 		self.perimeterWidth = 0.4
+		self.threadIndex = None
 
 	def getCraftedGcode( self, gcodeText, stretchRepository ):
 		"Parse gcode text and store the stretch gcode."
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.stretchRepository = stretchRepository
+		self.threadIndex = gcodec.ThreadIndex(self.lines)
 		self.parseInitialization()
 		for self.lineIndex in xrange( self.lineIndex, len(self.lines) ):
 			line = self.lines[self.lineIndex]
 			self.parseStretch(line)
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def getCrossLimitedStretch( self, crossLimitedStretch, crossLineIterator, locationComplex ):
 		"Get cross limited relative stretch for a location."
@@ -314,10 +304,10 @@ class StretchSkein:
 
 	def getStretchedLineFromIndexLocation( self, indexPreviousStart, indexNextStart, location ):
 		"Get stretched gcode line from line index and location."
-		crossIteratorForward = LineIteratorForward( self.isLoop, indexNextStart, self.lines )
-		crossIteratorBackward = LineIteratorBackward( self.isLoop, indexPreviousStart, self.lines )
-		iteratorForward = LineIteratorForward( self.isLoop, indexNextStart, self.lines )
-		iteratorBackward = LineIteratorBackward( self.isLoop, indexPreviousStart, self.lines )
+		crossIteratorForward = LineIteratorForward( self.isLoop, indexNextStart, self.threadIndex )
+		crossIteratorBackward = LineIteratorBackward( self.isLoop, indexPreviousStart, self.threadIndex )
+		iteratorForward = LineIteratorForward( self.isLoop, indexNextStart, self.threadIndex )
+		iteratorBackward = LineIteratorBackward( self.isLoop, indexPreviousStart, self.threadIndex )
 		locationComplex = location.dropAxis()
 		relativeStretch = self.getRelativeStretch( locationComplex, iteratorForward ) + self.getRelativeStretch( locationComplex, iteratorBackward )
 		relativeStretch *= 0.8
@@ -335,16 +325,12 @@ class StretchSkein:
 
 	def isJustBeforeExtrusion(self):
 		"Determine if activate command is before linear move command."
-		for lineIndex in xrange( self.lineIndex + 1, len(self.lines) ):
-			line = self.lines[lineIndex]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'G1' or firstWord == 'M103':
-				return False
-			if firstWord == 'M101':
-				return True
-#		print('This should never happen in isJustBeforeExtrusion in stretch, no activate or deactivate command was found for this thread.')
-		return False
+		activateIndex = self.threadIndex.getNextIndex('M101', self.lineIndex)
+		if activateIndex == None:
+			return False
+		if self.threadIndex.isFirstWordBetween('G1', self.lineIndex, activateIndex):
+			return False
+		return not self.threadIndex.isFirstWordBetween('M103', self.lineIndex, activateIndex)
 
 	def parseInitialization(self):
 		'Parse gcode initialization and store the parameters.'
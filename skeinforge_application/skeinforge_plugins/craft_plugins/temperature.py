@@ -155,7 +155,7 @@ class TemperatureSkein:
 	def getCraftedGcode(self, gcodeText, repository):
 		"Parse gcode text and store the temperature gcode."
 		self.repository = repository
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		if self.repository.coolingRate.value < 0.1:
 			print('The cooling rate should be more than 0.1, any cooling rate less than 0.1 will be treated as 0.1.')
 			self.repository.coolingRate.value = 0.1
@@ -164,7 +164,7 @@ class TemperatureSkein:
 			self.repository.heatingRate.value = 0.1
 		self.parseInitialization()
 		self.distanceFeedRate.addLines( self.lines[self.lineIndex :] )
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def parseInitialization(self):
 		'Parse gcode initialization and store the parameters.'
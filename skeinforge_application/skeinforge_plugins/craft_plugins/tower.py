@@ -222,7 +222,7 @@ class TowerSkein:
 
 	def getCraftedGcode( self, gcodeText, towerRepository ):
 		"Parse gcode text and store the tower gcode."
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.towerRepository = towerRepository
 		self.parseInitialization()
 		self.parseIfWordUntilWord('(<operatingLayerEnd>')
@@ -235,7 +235,7 @@ class TowerSkein:
 		self.threadLayers = self.threadLayers[ concatenateEndIndex : ]
 		self.addTowers()
 		self.distanceFeedRate.addLines( self.lines[ self.shutdownLineIndex : ] )
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def getRemovedIslandAddLayerLinesIfDifferent( self, islands, layerIndex ):
 		"Add gcode lines for the layer if it is different than the old bottom layer index."
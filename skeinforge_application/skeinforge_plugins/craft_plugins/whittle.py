@@ -98,11 +98,11 @@ class WhittleSkein:
 	def getCraftedGcode( self, whittleRepository, gcodeText ):
 		"Parse gcode text and store the whittle gcode."
 		self.whittleRepository = whittleRepository
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.parseInitialization()
 		for line in self.lines[self.lineIndex :]:
 			self.parseLine(line)
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def getLinearMove( self, line, splitLine ):
 		"Get the linear move."
@@ -204,7 +204,7 @@ class WipeSkein:
 
 	def getCraftedGcode( self, gcodeText, wipeRepository ):
 		"Parse gcode text and store the wipe gcode."
-		self.lines = archive.getTextLines(gcodeText)
+		self.lines = gcodec.getGcodeTextLines(gcodeText)
 		self.wipePeriod = wipeRepository.wipePeriod.value
 		self.parseInitialization( wipeRepository )
 		self.locationArrival = Vector3( wipeRepository.locationArrivalX.value, wipeRepository.locationArrivalY.value, wipeRepository.locationArrivalZ.value )
@@ -213,7 +213,7 @@ class WipeSkein:
 		for self.lineIndex in xrange( self.lineIndex, len(self.lines) ):
 			line = self.lines[self.lineIndex]
 			self.parseLine(line)
-		return self.distanceFeedRate.output.getvalue()
+		return self.distanceFeedRate.getCraftedGcode()
 
 	def getLinearMoveWithFeedRate( self, feedRate, location ):
 		"Get a linear move line with the feedRate."
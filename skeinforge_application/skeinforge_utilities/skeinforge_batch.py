@@ -0,0 +1,29 @@
+"""
+Batch is a script to craft files and the unmodified files in directories, each in its own worker process.
+
+The number of worker processes and the time each file is allowed to take are set in polyfile.  When the batch is done, a summary report of the time each file and each procedure took is printed and written to skeinforge_batch_report.txt in the directory of the first file.
+
+Batch crafting the models directory from the command line, for example:
+python skeinforge_application/skeinforge_utilities/skeinforge_batch.py models
+
+"""
+
+from __future__ import absolute_import
+#Init has to be imported first because it has code to workaround the python bug where relative imports don't work if the module is imported as a main module.
+import __init__
+
+from skeinforge_application.skeinforge_utilities import skeinforge_craft
+import sys
+
+
+__author__ = 'Enrique Perez (perez_enrique@yahoo.com)'
+__date__ = '$Date: 2008/21/04 $'
+__license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
+
+
+def main():
+	"Batch craft the files and directories in the arguments."
+	skeinforge_craft.writeBatchOutput(skeinforge_craft.getBatchFileNames(sys.argv[1 :]))
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,258 @@
+"""
+Benchmark is a script to craft the bundled models with a fixed profile and record how long each procedure took and how much memory it used, so that performance regressions show up.
+
+The models are copied to a temporary directory, so the xml models which write files do not change the originals, and each model is crafted in its own worker process, one at a time.  The settings directory is also temporary, so every setting has its default value, unless a profile directory is given, in which case it is copied into the temporary settings directory without its cache folder.  Neither the slice cache nor the checkpoints are used, so every procedure is run for every model, including the second run of a model with support.
+
+The default profile has no support material, so the models named in globalSupportFileNames, Screw Holder.gts and support_test_box.xml, are crafted a second time with the raft activated and the support material everywhere.  Their reports are saved under the model name followed by ' with support'.
+
+For each model and for each procedure of each model, the wall time, the cpu time including the time of the worker processes of the procedure, and the peak resident memory of the model process so far are recorded.  The peak resident memory is not available on Windows.  The results are written to a json file, by default skeinforge_benchmark.json in the current directory.  When a baseline json file is given, the models and procedures which took longer or used more memory than the baseline by more than the tolerance are printed, and the script exits with a status of one.
+
+Benchmarking the bundled models and comparing them to a baseline, for example:
+python skeinforge_application/skeinforge_utilities/skeinforge_benchmark.py -o new.json -b baseline.json
+
+Benchmarking some of the models with a profile:
+python skeinforge_application/skeinforge_utilities/skeinforge_benchmark.py -p ~/.skeinforge models/box.obj models/xml_models/solids
+
+"""
+
+from __future__ import absolute_import
+#Init has to be imported first because it has code to workaround the python bug where relative imports don't work if the module is imported as a main module.
+import __init__
+
+from fabmetheus_utilities.fabmetheus_tools import fabmetheus_interpret
+from fabmetheus_utilities import archive
+from fabmetheus_utilities import gcodec
+from fabmetheus_utilities import settings
+from optparse import OptionParser
+from skeinforge_application.skeinforge_utilities import skeinforge_craft
+import cStringIO
+import json
+import multiprocessing
+import os
+import Queue
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+
+
+__author__ = 'Enrique Perez (perez_enrique@yahoo.com)'
+__date__ = '$Date: 2008/21/04 $'
+__license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
+
+
+globalMinimumSecondsIncrease = 0.1
+globalNames = ['wallSeconds', 'cpuSeconds', 'peakKilobytes']
+globalSupportFileNames = ['Screw Holder.gts', 'support_test_box.xml']
+globalSupportOverrides = [('Activate Raft', 'True'), ('Everywhere', 'True'), ('None', 'False')]
+
+
+def addModelReport(benchmark, fileName, isSupported, name, settingsDirectory, timeout):
+	'Craft the model in a worker process and add its report to the benchmark dictionary.'
+	print('Benchmarking ' + name)
+	modelReport = getModelReport(fileName, isSupported, settingsDirectory, timeout)
+	benchmark['models'][name] = modelReport
+	print('%s, %.2f seconds.' % (modelReport['status'], modelReport.get('wallSeconds', 0.0)))
+
+def addUsage(startUsage, usageDictionary):
+	'Add the wall time and cpu time since the start usage, and the peak memory, to the usage dictionary.'
+	usage = getUsage()
+	usageDictionary['wallSeconds'] = usage[0] - startUsage[0]
+	usageDictionary['cpuSeconds'] = usage[1] - startUsage[1]
+	usageDictionary['peakKilobytes'] = usage[2]
+
+def copyModels(paths, temporaryDirectory):
+	'Copy the files and directories to the temporary directory and get the relative names and the paths of the copied models.'
+	fileTypes = fabmetheus_interpret.getImportPluginFileNames()
+	words = ['_%s.' % pluginFileName for pluginFileName in archive.getPluginFileNamesFromDirectoryPath(skeinforge_craft.getPluginsDirectoryPath())]
+	namePaths = []
+	for pathIndex, path in enumerate(paths):
+		path = os.path.abspath(path)
+		copyPath = os.path.join(temporaryDirectory, 'models', str(pathIndex), os.path.basename(path))
+		if os.path.isdir(path):
+			shutil.copytree(path, copyPath)
+			copyFileNames = archive.getFilesWithFileTypesWithoutWordsRecursively(fileTypes, words, os.path.join(copyPath, '__init__.py'))
+			for copyFileName in copyFileNames:
+				name = os.path.join(os.path.basename(path), os.path.relpath(copyFileName, copyPath))
+				namePaths.append((name.replace(os.sep, '/'), copyFileName))
+		elif os.path.isfile(path):
+			os.makedirs(os.path.dirname(copyPath))
+			shutil.copy(path, copyPath)
+			namePaths.append((os.path.basename(path), copyPath))
+		else:
+			print('Warning, the following path does not exist so it will not be benchmarked in copyModels in skeinforge_benchmark:')
+			print(path)
+	return namePaths
+
+def craftModel(fileName, modelReport):
+	'Craft the model through the whole craft sequence, adding the usage of each procedure to the model report.'
+	startUsage = getUsage()
+	text = ''
+	if fileName.endswith('.gcode') or fileName.endswith('.svg'):
+		text = archive.getFileText(fileName)
+	for procedure in skeinforge_craft.getProcedures('export', text):
+		craftModule = skeinforge_craft.getCraftModule(procedure)
+		if craftModule != None:
+			procedureStartUsage = getUsage()
+			if procedure == 'export':
+				text = craftModule.getCraftedTextFromText(gcodec.getGcodeText(text))
+			else:
+				text = craftModule.getCraftedText(fileName, text)
+			procedureReport = {'procedure' : procedure}
+			addUsage(procedureStartUsage, procedureReport)
+			modelReport['procedures'].append(procedureReport)
+			if text == '':
+				modelReport['status'] = 'no text after %s' % procedure
+				break
+	addUsage(startUsage, modelReport)
+
+def getBenchmark(namePaths, settingsDirectory, timeout):
+	'Craft each model in its own worker process and get the benchmark dictionary.'
+	benchmark = {
+		'models' : {},
+		'platform' : sys.platform,
+		'python' : sys.version.split()[0],
+		'version' : archive.getFileText(archive.getVersionFileName(), False).strip()}
+	for name, fileName in namePaths:
+		addModelReport(benchmark, fileName, False, name, settingsDirectory, timeout)
+		if os.path.basename(fileName) in globalSupportFileNames:
+			addModelReport(benchmark, fileName, True, name + ' with support', settingsDirectory, timeout)
+	return benchmark
+
+def getModelReport(fileName, isSupported, settingsDirectory, timeout):
+	'Craft the model in a worker process and get its report, or a report of why the worker did not finish.'
+	queue = multiprocessing.Queue()
+	process = multiprocessing.Process(target=writeModelReportToQueue, args=(fileName, isSupported, queue, settingsDirectory))
+	process.start()
+	startTime = time.time()
+	modelReport = None
+	while modelReport == None:
+		try:
+			modelReport = queue.get(True, 1.0)
+		except Queue.Empty:
+			if time.time() - startTime > timeout:
+				process.terminate()
+				modelReport = {'procedures' : [], 'status' : 'timed out after %s seconds' % timeout}
+			elif not process.is_alive():
+				try:
+					modelReport = queue.get(True, 0.1)
+				except Queue.Empty:
+					modelReport = {'procedures' : [], 'status' : 'worker exited with code %s' % process.exitcode}
+	process.join()
+	return modelReport
+
+def getPeakKilobytes():
+	'Get the peak resident memory of this process in kilobytes, or None if it is not available.'
+	try:
+		import resource
+	except ImportError:
+		return None
+	peakKilobytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	if sys.platform == 'darwin':
+		return peakKilobytes / 1024
+	return peakKilobytes
+
+def getRegressions(baseline, benchmark, tolerance):
+	'Get the descriptions of the models and procedures which took longer or used more memory than the baseline by more than the tolerance.'
+	regressions = []
+	baselineModels = baseline['models']
+	for name in sorted(benchmark['models'].keys()):
+		if name not in baselineModels:
+			continue
+		baselineReport = baselineModels[name]
+		modelReport = benchmark['models'][name]
+		if baselineReport['status'] != modelReport['status']:
+			regressions.append('%s: the status changed from %s to %s.' % (name, baselineReport['status'], modelReport['status']))
+			continue
+		regressions += getUsageRegressions(baselineReport, name, modelReport, tolerance)
+		baselineProcedureReports = {}
+		for baselineProcedureReport in baselineReport['procedures']:
+			baselineProcedureReports[baselineProcedureReport['procedure']] = baselineProcedureReport
+		for procedureReport in modelReport['procedures']:
+			procedure = procedureReport['procedure']
+			if procedure in baselineProcedureReports:
+				regressions += getUsageRegressions(baselineProcedureReports[procedure], '%s %s' % (name, procedure), procedureReport, tolerance)
+	return regressions
+
+def getUsage():
+	'Get the wall time, the cpu time of this process and its finished child processes and the peak resident memory.'
+	times = os.times()
+	return (time.time(), times[0] + times[1] + times[2] + times[3], getPeakKilobytes())
+
+def getUsageRegressions(baselineUsage, label, usage, tolerance):
+	'Get the descriptions of the usages which are greater than the baseline usages by more than the tolerance.'
+	regressions = []
+	for name in globalNames:
+		baselineValue = baselineUsage.get(name)
+		value = usage.get(name)
+		if baselineValue == None or value == None:
+			continue
+		if name.endswith('Seconds') and value - baselineValue < globalMinimumSecondsIncrease:
+			continue
+		if value > baselineValue * (1.0 + tolerance):
+			regressions.append('%s: %s went from %s to %s.' % (label, name, baselineValue, value))
+	return regressions
+
+def writeBenchmark(options, paths):
+	'Benchmark the models, write the json file and compare it to the baseline.'
+	temporaryDirectory = tempfile.mkdtemp()
+	try:
+		settingsDirectory = os.path.join(temporaryDirectory, 'settings')
+		if options.preferencesDirectory:
+			shutil.copytree(options.preferencesDirectory, settingsDirectory, ignore=shutil.ignore_patterns('cache'))
+		else:
+			os.mkdir(settingsDirectory)
+		benchmark = getBenchmark(copyModels(paths, temporaryDirectory), settingsDirectory, options.timeout)
+	finally:
+		shutil.rmtree(temporaryDirectory, True)
+	archive.writeFileText(options.output, json.dumps(benchmark, indent=1, sort_keys=True) + '\n')
+	print('The benchmark is saved as ' + archive.getSummarizedFileName(options.output))
+	if not options.baseline:
+		return True
+	regressions = getRegressions(json.loads(archive.getFileText(options.baseline)), benchmark, options.tolerance)
+	if len(regressions) == 0:
+		print('There are no regressions compared to ' + archive.getSummarizedFileName(options.baseline))
+		return True
+	print('The regressions compared to %s are:' % archive.getSummarizedFileName(options.baseline))
+	for regression in regressions:
+		print(regression)
+	return False
+
+def writeModelReportToQueue(fileName, isSupported, queue, settingsDirectory):
+	'Craft the model with its output captured, with support material if it is supported, and put its report in the queue.'
+	archive.globalTemporarySettingsPath = settingsDirectory
+	modelReport = {'procedures' : [], 'status' : 'crafted'}
+	sys.stdout = cStringIO.StringIO()
+	settings.temporaryAddPreferenceOverride('carve.csv', 'Slice Cache Maximum Size (megabytes):', '0')
+	if isSupported:
+		for name, value in globalSupportOverrides:
+			settings.temporaryAddPreferenceOverride('raft.csv', name, value)
+	try:
+		craftModel(fileName, modelReport)
+	except:
+		modelReport['status'] = 'failed, %s' % traceback.format_exc().strip().split('\n')[-1]
+	queue.put(modelReport)
+
+
+def main():
+	'Benchmark the files and directories in the arguments, or the bundled models if there are none.'
+	parser = OptionParser(usage='usage: %prog [options] [files and directories]')
+	parser.add_option(
+		'-b', '--baseline', help='compare to the baseline json file', action='store', type='string', dest='baseline')
+	parser.add_option(
+		'-o', '--output', help='write the benchmark to the json file', action='store', type='string', dest='output', default='skeinforge_benchmark.json')
+	parser.add_option(
+		'-p', '--prefdir', help='copy the profile from the preference directory', action='store', type='string', dest='preferencesDirectory')
+	parser.add_option(
+		'-t', '--tolerance', help='set the fraction over the baseline which is a regression', action='store', type='float', dest='tolerance', default=0.2)
+	parser.add_option(
+		'--timeout', help='set the seconds each model is allowed to take', action='store', type='float', dest='timeout', default=600.0)
+	(options, args) = parser.parse_args()
+	if len(args) == 0:
+		args = [archive.getFabmetheusPath('models')]
+	if not writeBenchmark(options, args):
+		sys.exit(1)
+
+if __name__ == "__main__":
+	main()
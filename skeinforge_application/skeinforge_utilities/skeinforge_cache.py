@@ -0,0 +1,130 @@
+"""
+Cache is a script to store crafted text on disk, addressed by a hash of the input file and the settings which produced it.
+
+The cached files are in the cache folder of the .skeinforge folder in the home directory, with one subfolder for each kind of text.  When the files in a subfolder add up to more than the maximum size, the least recently used files are deleted until the subfolder fits.  Each file is written under a temporary name and then renamed, so a process reading the cache never gets a partly written file from another process.  A cached binary slice text is memory mapped rather than read, so the layers are only loaded when preface reads them.
+
+"""
+
+from __future__ import absolute_import
+#Init has to be imported first because it has code to workaround the python bug where relative imports don't work if the module is imported as a main module.
+import __init__
+
+from fabmetheus_utilities import archive
+from fabmetheus_utilities import settings
+from fabmetheus_utilities import slice_binary
+import hashlib
+import os
+import tempfile
+
+
+__author__ = 'Enrique Perez (perez_enrique@yahoo.com)'
+__date__ = '$Date: 2008/21/04 $'
+__license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
+
+
+globalFileReadSize = 1048576
+
+
+def getCacheDirectory(subName=''):
+	'Get the cache directory path, which is the settings directory joined with cache.'
+	return archive.getJoinedPath(archive.getSettingsPath('cache'), subName)
+
+def getCachedText(cacheKey, subName):
+	'Get the cached text for the key, or None if it is not in the cache.  A binary slice text is memory mapped instead of read.'
+	cachePath = os.path.join(getCacheDirectory(subName), cacheKey)
+	if not os.path.isfile(cachePath):
+		return None
+	try:
+		cachedText = slice_binary.getSliceBinaryTextFromFile(cachePath)
+	except EnvironmentError:
+		cachedText = None
+	if cachedText == None:
+		cachedText = archive.getFileText(cachePath, False, 'rb')
+	if cachedText == '':
+		return None
+	try:
+		os.utime(cachePath, None)
+	except OSError:
+		pass
+	return cachedText
+
+def getCacheKey(fileName, repository, excludedNames):
+	'Get the cache key from the contents and basename of the file, the version and the repository settings which are not excluded.'
+	cacheHash = getInputHash(fileName)
+	if cacheHash == None:
+		return None
+	updateHashByRepository(cacheHash, repository, excludedNames)
+	return cacheHash.hexdigest()
+
+def getInputHash(fileName, text=''):
+	'Get the hash of the basename of the file, the version and the text, or the contents of the file if the text is empty.'
+	cacheHash = hashlib.sha1()
+	cacheHash.update(os.path.basename(fileName))
+	cacheHash.update(archive.getFileText(archive.getVersionFileName(), False))
+	if text != '':
+		cacheHash.update(text)
+		return cacheHash
+	try:
+		fileHandle = open(fileName, 'rb')
+	except IOError:
+		return None
+	fileData = fileHandle.read(globalFileReadSize)
+	while fileData != '':
+		cacheHash.update(fileData)
+		fileData = fileHandle.read(globalFileReadSize)
+	fileHandle.close()
+	return cacheHash
+
+def removeLeastRecentlyUsedFiles(directory, maximumSize):
+	'Remove the least recently used files in the directory until the files add up to no more than the maximum size.'
+	timeSizePaths = []
+	totalSize = 0
+	for fileName in os.listdir(directory):
+		filePath = os.path.join(directory, fileName)
+		try:
+			fileStat = os.stat(filePath)
+		except OSError:
+			continue
+		timeSizePaths.append((fileStat.st_mtime, fileStat.st_size, filePath))
+		totalSize += fileStat.st_size
+	timeSizePaths.sort()
+	for timeSizePath in timeSizePaths:
+		if totalSize <= maximumSize:
+			return
+		try:
+			os.remove(timeSizePath[2])
+			totalSize -= timeSizePath[1]
+		except OSError:
+			pass
+
+def updateHashByRepository(cacheHash, repository, excludedNames):
+	'Update the hash with the names and values of the repository settings which are not excluded, and with the alteration files they name.'
+	for setting in repository.preferences:
+		if setting.name in excludedNames or isinstance(setting, settings.FileNameInput) or isinstance(setting, settings.WindowPosition):
+			continue
+		cacheHash.update('%s\t%s\n' % (setting.name, setting.value))
+		if setting.name.startswith('Name of '):
+			cacheHash.update(settings.getFileInAlterationsOrGivenDirectory(setting.value))
+
+def writeCachedText(cacheKey, maximumSize, subName, text):
+	'Write the text to a temporary file, rename it to the cache file so that no other process can read it partly written, and remove the least recently used files if the cache is over the maximum size.'
+	if maximumSize <= 0 or len(text) > maximumSize:
+		return
+	directory = getCacheDirectory(subName)
+	archive.makeDirectory(directory)
+	try:
+		fileDescriptor, temporaryPath = tempfile.mkstemp('.tmp', cacheKey, directory)
+	except OSError:
+		print('The cache file %s can not be written to.' % cacheKey)
+		return
+	try:
+		temporaryFile = os.fdopen(fileDescriptor, 'wb')
+		temporaryFile.write(text)
+		temporaryFile.close()
+		os.rename(temporaryPath, os.path.join(directory, cacheKey))
+	except (IOError, OSError):
+		try:
+			os.remove(temporaryPath)
+		except OSError:
+			pass
+	removeLeastRecentlyUsedFiles(directory, maximumSize)
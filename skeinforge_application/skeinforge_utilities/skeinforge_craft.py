@@ -3,6 +3,10 @@ Craft is a script to access the plugins which craft a gcode file.
 
 The plugin buttons which are commonly used are bolded and the ones which are rarely used have normal font weight.
 
+When 'Execute All Unmodified Files in a Directory' is selected in polyfile, the unmodified files in the directory are crafted in a batch of worker processes, and a summary report of the time each file and each procedure took is printed and written to skeinforge_batch_report.txt in the directory.  The number of worker processes and the time each file is allowed to take are also set in polyfile.  A batch can be crafted from the command line with skeinforge_batch.py.  A file is reported as failed if crafting it raises an error or writes no file, as when the file can not be read.  Each worker crafts with one carve worker and one fill worker, so that the batch does not fork a pool of processes inside each worker, and a worker which times out leaves no processes behind.
+
+After each procedure, the crafted text is kept as a checkpoint in the cache folder of the .skeinforge folder, addressed by a hash of the input and the settings of that procedure and all the procedures before it.  When a file is crafted again, the chain restarts after the last procedure whose checkpoint is still valid, so changing a setting only reruns the procedures from the one with the changed setting onward.  A procedure which leaves the text unchanged, like an inactive one, does not write a checkpoint, because the checkpoint of the procedure before it already holds the same text.  The settings which only change how quickly the text is crafted, like the number of worker processes, are not part of the hash.  When the checkpoints add up to more than the 'Checkpoint Cache Maximum Size', the least recently used checkpoints are deleted.  If the 'Checkpoint Cache Maximum Size' is zero, no checkpoints will be kept.
+
 """
 
 from __future__ import absolute_import
@@ -14,12 +18,18 @@ from fabmetheus_utilities import archive
 from fabmetheus_utilities import euclidean
 from fabmetheus_utilities import gcodec
 from fabmetheus_utilities import settings
+from fabmetheus_utilities import svg_writer
 from skeinforge_application.skeinforge_utilities import skeinforge_analyze
+from skeinforge_application.skeinforge_utilities import skeinforge_cache
 from skeinforge_application.skeinforge_utilities import skeinforge_polyfile
 from skeinforge_application.skeinforge_utilities import skeinforge_profile
+import cStringIO
+import multiprocessing
 import os
+import Queue
 import sys
 import time
+import traceback
 
 
 __author__ = 'Enrique Perez (perez_enrique@yahoo.com)'
@@ -27,6 +37,87 @@ __date__ = '$Date: 2008/21/04 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+globalCheckpointExcludedNames = ['Number of Carve Workers (integer):', 'Number of Fill Workers (integer):', 'Slice Cache Maximum Size (megabytes):', 'SVG Viewer:']
+globalProcedureDurations = []
+globalWrittenFileNames = []
+
+
+def addWrittenFileName(fileName):
+	'Add the file name to the written file names, so that a batch worker can tell whether the file was crafted.'
+	globalWrittenFileNames.append(fileName)
+
+def getBatchFileNames(paths):
+	'Get the unmodified files to craft from the file and directory paths.'
+	fileNames = []
+	fileTypes = fabmetheus_interpret.getImportPluginFileNames()
+	words = ['_%s.' % pluginFileName for pluginFileName in archive.getPluginFileNamesFromDirectoryPath(getPluginsDirectoryPath())]
+	for path in paths:
+		if os.path.isdir(path):
+			fileNames += archive.getFilesWithFileTypesWithoutWords(fileTypes, words, os.path.join(path, '__init__.py'))
+		elif os.path.isfile(path):
+			fileNames.append(path)
+		else:
+			print('Warning, the following path does not exist so it will not be crafted in getBatchFileNames in skeinforge_craft:')
+			print(path)
+	return fileNames
+
+def getBatchFileReports(fileNames, numberOfWorkers, timeout):
+	'Craft the files in worker processes and get the file reports in the order of the file names.'
+	fileReportDictionary = {}
+	pendingFileNames = fileNames[:]
+	queue = multiprocessing.Queue()
+	runningDictionary = {}
+	while len(pendingFileNames) > 0 or len(runningDictionary) > 0:
+		while len(pendingFileNames) > 0 and len(runningDictionary) < numberOfWorkers:
+			fileName = pendingFileNames.pop(0)
+			process = multiprocessing.Process(target=writeFileReportToQueue, args=(fileName, queue))
+			process.start()
+			runningDictionary[fileName] = (process, time.time())
+		try:
+			fileReport = queue.get(True, 0.1)
+			fileReportDictionary[fileReport.fileName] = fileReport
+		except Queue.Empty:
+			pass
+		for fileName in runningDictionary.keys():
+			process, startTime = runningDictionary[fileName]
+			if fileName in fileReportDictionary:
+				process.join()
+				del runningDictionary[fileName]
+			elif time.time() - startTime > timeout:
+				process.terminate()
+				process.join()
+				fileReportDictionary[fileName] = FileReport(fileName, 'timed out after %s' % euclidean.getDurationString(timeout), time.time() - startTime)
+				del runningDictionary[fileName]
+			elif not process.is_alive():
+				try:
+					fileReport = queue.get(True, 0.1)
+					fileReportDictionary[fileReport.fileName] = fileReport
+				except Queue.Empty:
+					process.join()
+					fileReportDictionary[fileName] = FileReport(fileName, 'worker exited with code %s' % process.exitcode, time.time() - startTime)
+					del runningDictionary[fileName]
+	return [fileReportDictionary[fileName] for fileName in fileNames]
+
+def getBatchReportText(fileReports):
+	'Get the summary report text of the file reports.'
+	output = cStringIO.StringIO()
+	procedureSecondsDictionary = {}
+	procedures = []
+	output.write('File\tStatus\tSeconds\n')
+	for fileReport in fileReports:
+		output.write('%s\t%s\t%.2f\n' % (os.path.basename(fileReport.fileName), fileReport.status, fileReport.seconds))
+		for procedure, seconds in fileReport.procedureDurations:
+			if procedure not in procedureSecondsDictionary:
+				procedureSecondsDictionary[procedure] = 0.0
+				procedures.append(procedure)
+			procedureSecondsDictionary[procedure] += seconds
+	output.write('\nProcedure\tSeconds\n')
+	for procedure in procedures:
+		output.write('%s\t%.2f\n' % (procedure, procedureSecondsDictionary[procedure]))
+	numberOfFailures = len([fileReport for fileReport in fileReports if fileReport.status != 'crafted'])
+	output.write('\n%s crafted, %s failed.\n' % (len(fileReports) - numberOfFailures, numberOfFailures))
+	return output.getvalue()
+
 def getChainText( fileName, procedure ):
 	"Get a crafted shape file."
 	text=''
@@ -38,18 +129,54 @@ def getChainText( fileName, procedure ):
 def getChainTextFromProcedures(fileName, procedures, text):
 	'Get a crafted shape file from a list of procedures.'
 	lastProcedureTime = time.time()
-	for procedure in procedures:
+	maximumSize = 1048576 * settings.getReadRepository(CraftRepository()).checkpointCacheMaximumSize.value
+	checkpointKeys = None
+	if maximumSize > 0:
+		checkpointKeys = getCheckpointKeys(fileName, procedures, text)
+	procedureIndexStart = 0
+	if checkpointKeys != None:
+		for procedureIndex in xrange(len(procedures) - 1, -1, -1):
+			checkpointText = skeinforge_cache.getCachedText(checkpointKeys[procedureIndex], 'checkpoint')
+			if checkpointText != None:
+				print('The %s checkpoint was read from the cache.' % procedures[procedureIndex])
+				text = checkpointText
+				procedureIndexStart = procedureIndex + 1
+				break
+	for procedureIndex in xrange(procedureIndexStart, len(procedures)):
+		procedure = procedures[procedureIndex]
 		craftModule = getCraftModule(procedure)
 		if craftModule != None:
+			previousText = text
 			text = craftModule.getCraftedText(fileName, text)
 			if text == '':
 				print('Warning, the text was not recognized in getChainTextFromProcedures in skeinforge_craft for')
 				print(fileName)
 				return ''
+			if checkpointKeys != None and text is not previousText and text != previousText:
+				skeinforge_cache.writeCachedText(checkpointKeys[procedureIndex], maximumSize, 'checkpoint', gcodec.getGcodeText(text))
 			if gcodec.isProcedureDone( text, procedure ):
+				globalProcedureDurations.append((procedure, time.time() - lastProcedureTime))
 				print('%s procedure took %s.' % (procedure.capitalize(), euclidean.getDurationString(time.time() - lastProcedureTime)))
 				lastProcedureTime = time.time()
-	return text
+	return gcodec.getGcodeText(text)
+
+def getCheckpointKeys(fileName, procedures, text):
+	'Get the checkpoint keys, each from the input, the profile and the cumulative settings of the procedures up to and including its procedure.'
+	if fileName.endswith('.xml'):
+		return None
+	cacheHash = skeinforge_cache.getInputHash(fileName, text)
+	if cacheHash == None:
+		return None
+	cacheHash.update(skeinforge_profile.getProfileDirectory())
+	checkpointKeys = []
+	for procedure in procedures:
+		cacheHash.update(procedure)
+		craftModule = getCraftModule(procedure)
+		if craftModule != None:
+			repository = settings.getReadRepository(craftModule.getNewRepository())
+			skeinforge_cache.updateHashByRepository(cacheHash, repository, globalCheckpointExcludedNames)
+		checkpointKeys.append(cacheHash.hexdigest())
+	return checkpointKeys
 
 def getCraftModule(fileName):
 	"Get craft module."
@@ -103,6 +230,24 @@ def getSequenceIndexPlusOneFromText(fileText):
 			return craftSequenceIndex + 1
 	return 0
 
+def writeBatchOutput(fileNames):
+	'Craft the files in worker processes, then print and write the summary report.'
+	if len(fileNames) < 1:
+		print('There are no files to batch craft.')
+		return
+	repository = settings.getReadRepository(skeinforge_polyfile.PolyfileRepository())
+	numberOfWorkers = repository.numberOfBatchWorkers.value
+	if numberOfWorkers < 1:
+		numberOfWorkers = multiprocessing.cpu_count()
+	print('Batch crafting %s files with %s worker processes.' % (len(fileNames), numberOfWorkers))
+	startTime = time.time()
+	reportText = getBatchReportText(getBatchFileReports(fileNames, numberOfWorkers, repository.batchFileTimeout.value))
+	print(reportText)
+	reportFileName = os.path.join(os.path.dirname(os.path.abspath(fileNames[0])), 'skeinforge_batch_report.txt')
+	archive.writeFileText(reportFileName, reportText)
+	print('The batch report is saved as ' + archive.getSummarizedFileName(reportFileName))
+	print('It took %s to batch craft the files.' % euclidean.getDurationString(time.time() - startTime))
+
 def writeChainTextWithNounMessage(fileName, procedure, shouldAnalyze=True):
 	'Get and write a crafted shape file.'
 	print('')
@@ -117,6 +262,7 @@ def writeChainTextWithNounMessage(fileName, procedure, shouldAnalyze=True):
 		print(fileName)
 		return
 	archive.writeFileText(fileNameSuffix, craftText)
+	addWrittenFileName(fileNameSuffix)
 	window = None
 	if shouldAnalyze:
 		window = skeinforge_analyze.writeOutput(fileName, fileNameSuffix, craftText)
@@ -127,6 +273,27 @@ def writeChainTextWithNounMessage(fileName, procedure, shouldAnalyze=True):
 	print('It took %s to craft the file.' % euclidean.getDurationString(time.time() - startTime))
 	return window
 
+def writeFileReportToQueue(fileName, queue):
+	'Craft the file with its output captured and put its file report in the queue.'
+	global globalProcedureDurations
+	global globalWrittenFileNames
+	globalProcedureDurations = []
+	globalWrittenFileNames = []
+	startTime = time.time()
+	sys.stdout = cStringIO.StringIO()
+	settings.temporaryAddPreferenceOverride('carve.csv', 'Number of Carve Workers (integer):', '1')
+	settings.temporaryAddPreferenceOverride('fill.csv', 'Number of Fill Workers (integer):', '1')
+	try:
+		writeOutput(fileName, False)
+		if len(globalWrittenFileNames) > 0:
+			fileReport = FileReport(fileName, 'crafted', time.time() - startTime)
+		else:
+			fileReport = FileReport(fileName, 'failed, no file was written', time.time() - startTime)
+	except:
+		fileReport = FileReport(fileName, 'failed, %s' % traceback.format_exc().strip().split('\n')[-1], time.time() - startTime)
+	fileReport.procedureDurations = globalProcedureDurations
+	queue.put(fileReport)
+
 def writeOutput(fileName, shouldAnalyze=True):
 	"Craft a gcode file with the last module."
 	pluginModule = getLastModule()
@@ -144,7 +311,8 @@ def writeSVGTextWithNounMessage(fileName, repository, shouldAnalyze=True):
 	craftText = getChainText(fileName, repository.lowerName)
 	if craftText == '':
 		return
-	archive.writeFileText(fileNameSuffix, craftText)
+	archive.writeFileText(fileNameSuffix, svg_writer.getSVGTextIfSliceBinary(fileName, craftText))
+	addWrittenFileName(fileNameSuffix)
 	print('')
 	print('The %s tool has created the file:' % repository.lowerName)
 	print(fileNameSuffix)
@@ -205,6 +373,7 @@ class CraftRepository:
 		"Set the default settings, execute title & settings fileName."
 		skeinforge_profile.addListsToCraftTypeRepository('skeinforge_application.skeinforge_utilities.skeinforge_craft.html', self)
 		self.fileNameInput = settings.FileNameInput().getFromFileName( fabmetheus_interpret.getGNUTranslatorGcodeFileTypeTuples(), 'Open File for Craft', self, '')
+		self.checkpointCacheMaximumSize = settings.IntSpin().getFromValue(0, 'Checkpoint Cache Maximum Size (megabytes):', self, 2000, 200)
 		self.importantFileNames = ['carve', 'chop', 'feed', 'flow', 'lift', 'raft', 'speed']
 		allCraftNames = archive.getPluginFileNamesFromDirectoryPath(getPluginsDirectoryPath())
 		self.radioPlugins = settings.getRadioPluginsAddPluginFrame(getPluginsDirectoryPath(), self.importantFileNames, allCraftNames, self)
@@ -213,11 +382,28 @@ class CraftRepository:
 
 	def execute(self):
 		"Craft button has been clicked."
+		if skeinforge_polyfile.isDirectorySetting() and not skeinforge_polyfile.isEmptyOrCancelled(self.fileNameInput.value, self.fileNameInput.wasCancelled):
+			writeBatchOutput(getBatchFileNames([os.path.dirname(os.path.abspath(self.fileNameInput.value))]))
+			return
 		fileNames = skeinforge_polyfile.getFileOrDirectoryTypesUnmodifiedGcode( self.fileNameInput.value, [], self.fileNameInput.wasCancelled )
 		for fileName in fileNames:
 			writeOutput(fileName)
 
 
+class FileReport:
+	'A class to hold the status and durations of a crafted file.'
+	def __init__(self, fileName, status, seconds):
+		'Initialize.'
+		self.fileName = fileName
+		self.procedureDurations = []
+		self.seconds = seconds
+		self.status = status
+
+	def __repr__(self):
+		'Get the string representation of this FileReport.'
+		return '%s %s %s' % (self.fileName, self.status, self.seconds)
+
+
 def main():
 	"Write craft output."
 	writeOutput(' '.join(sys.argv[1 :]), False)
@@ -68,3 +68,7 @@ class PolyfileRepository:
 		directoryLatentStringVar = settings.LatentStringVar()
 		self.directorySetting = settings.Radio().getFromRadio( directoryLatentStringVar, 'Execute All Unmodified Files in a Directory', self, False )
 		self.fileSetting = settings.Radio().getFromRadio( directoryLatentStringVar, 'Execute File', self, True )
+		settings.LabelSeparator().getFromRepository(self)
+		settings.LabelDisplay().getFromName('- Batch -', self )
+		self.batchFileTimeout = settings.IntSpin().getFromValue(60, 'Batch File Timeout (seconds):', self, 36000, 3600)
+		self.numberOfBatchWorkers = settings.IntSpin().getFromValue(0, 'Number of Batch Workers (integer):', self, 16, 0)